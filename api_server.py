@@ -0,0 +1,339 @@
+# api_server.py
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+import bulk_import
+import database
+from cache import DEFAULT_MAX_QUERIES, DEFAULT_MAX_RECORDS, ReservationCache
+from seat_inventory import SeatUnavailableError
+from service import ConnectionPool, PoolTimeoutError, ReservationService
+from write_queue import WriteQueue
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_POOL_SIZE = 4
+LATENCY_SAMPLES = 2048
+MAX_BODY_BYTES = 1024 * 1024
+MAX_LIMIT = 1000
+
+STATUS_TEXT = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+               503: "Service Unavailable"}
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class RouteMetrics:
+    # Request count, error count and the latest LATENCY_SAMPLES latencies of
+    # one route; percentiles are computed from the samples on demand.
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, elapsed_ms, status):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if status >= 500:
+            self.errors += 1
+        self.samples.append(elapsed_ms)
+
+    def snapshot(self):
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": round(percentile(ordered, 0.50), 3) if ordered else None,
+            "p95_ms": round(percentile(ordered, 0.95), 3) if ordered else None,
+            "p99_ms": round(percentile(ordered, 0.99), 3) if ordered else None,
+            "max_ms": round(ordered[-1], 3) if ordered else None,
+        }
+
+def reservation_to_json(row):
+    return dict(zip(database.RESERVATION_COLUMNS, row))
+
+def parse_int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"'{name}' must be an integer")
+
+def parse_limit(value):
+    limit = parse_int(value, "limit")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise HttpError(400, f"'limit' must be between 1 and {MAX_LIMIT}")
+    return limit
+
+class ApiServer:
+    # Each connection is handled by its own coroutine; the blocking service
+    # calls run on a thread pool the same size as the connection pool, so the
+    # event loop never waits on SQLite and requests beyond the pool queue up.
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_POOL_SIZE):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.threads = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+        self.metrics = {}
+        self.started = time.time()
+        self.server = None
+        self.routes = [
+            ("GET", ("reservations",), self.list_reservations),
+            ("POST", ("reservations",), self.create_reservation),
+            ("GET", ("reservations", None), self.get_reservation),
+            ("PUT", ("reservations", None), self.update_reservation),
+            ("DELETE", ("reservations", None), self.delete_reservation),
+            ("GET", ("search",), self.search),
+            ("GET", ("changes",), self.changes),
+            ("GET", ("metrics",), self.get_metrics),
+            ("GET", ("health",), self.health),
+        ]
+
+    async def call(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.threads, fn, *args)
+
+    def match(self, method, path):
+        parts = tuple(part for part in path.split("/") if part)
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            if len(pattern) != len(parts):
+                continue
+            if any(expected is not None and expected != part for expected, part in zip(pattern, parts)):
+                continue
+            path_matched = True
+            if route_method == method:
+                params = [part for expected, part in zip(pattern, parts) if expected is None]
+                name = "/" + "/".join(expected or "{id}" for expected in pattern)
+                return f"{method} {name}", handler, params
+        if path_matched:
+            raise HttpError(405, f"Method {method} not allowed on {path}")
+        raise HttpError(404, f"No route for {path}")
+
+    # --- Handlers: (query, body, *path params) -> (status, payload) ---
+
+    async def list_reservations(self, query, body):
+        page_size = parse_limit(query.get("limit", database.DEFAULT_PAGE_SIZE))
+        cursor = parse_int(query["after"], "after") if "after" in query else None
+        version, rows, next_cursor = await self.call(self.service.list_reservations, page_size, cursor)
+        return 200, {"version": version, "next_cursor": next_cursor,
+                     "reservations": [reservation_to_json(row) for row in rows]}
+
+    async def get_reservation(self, query, body, reservation_id):
+        reservation_id = parse_int(reservation_id, "id")
+        row = await self.call(self.service.get_reservation, reservation_id)
+        if row is None:
+            raise HttpError(404, f"Reservation {reservation_id} not found")
+        return 200, reservation_to_json(row)
+
+    def reservation_details(self, body):
+        if not isinstance(body, dict):
+            raise HttpError(400, "Expected a JSON object")
+        details, error = bulk_import.validate_record(body)
+        if error:
+            raise HttpError(400, error)
+        return details
+
+    async def create_reservation(self, query, body):
+        details = self.reservation_details(body)
+        reservation_id = await self.call(self.service.add_reservation, details)
+        row = await self.call(self.service.get_reservation, reservation_id)
+        return 201, reservation_to_json(row)
+
+    async def update_reservation(self, query, body, reservation_id):
+        reservation_id = parse_int(reservation_id, "id")
+        details = self.reservation_details(body)
+        if await self.call(self.service.get_reservation, reservation_id) is None:
+            raise HttpError(404, f"Reservation {reservation_id} not found")
+        await self.call(self.service.update_reservation, reservation_id, details)
+        row = await self.call(self.service.get_reservation, reservation_id)
+        return 200, reservation_to_json(row)
+
+    async def delete_reservation(self, query, body, reservation_id):
+        reservation_id = parse_int(reservation_id, "id")
+        if await self.call(self.service.get_reservation, reservation_id) is None:
+            raise HttpError(404, f"Reservation {reservation_id} not found")
+        if not await self.call(self.service.delete_reservation, reservation_id):
+            raise HttpError(500, f"Could not delete reservation {reservation_id}")
+        return 200, {"deleted": reservation_id}
+
+    async def search(self, query, body):
+        text = query.get("q", "").strip()
+        if not text:
+            raise HttpError(400, "Missing search text 'q'")
+        limit = parse_limit(query.get("limit", database.SEARCH_RESULT_LIMIT))
+        version, rows = await self.call(self.service.search_reservations, text, limit)
+        return 200, {"version": version, "reservations": [reservation_to_json(row) for row in rows]}
+
+    async def changes(self, query, body):
+        since = parse_int(query.get("since"), "since")
+        result = await self.call(self.service.get_changes_since, since)
+        if result is None:
+            # Too many changes, or the log was pruned past `since`: reload.
+            return 200, {"reload": True}
+        version, changes = result
+        return 200, {"reload": False, "version": version,
+                     "changed": [reservation_to_json(row) for row in changes.values() if row is not None],
+                     "deleted": [reservation_id for reservation_id, row in changes.items() if row is None]}
+
+    async def get_metrics(self, query, body):
+        return 200, {"uptime_s": round(time.time() - self.started, 1),
+                     "cache": self.service.cache.stats(),
+                     "routes": {name: metrics.snapshot() for name, metrics in sorted(self.metrics.items())}}
+
+    async def health(self, query, body):
+        version, total = await self.call(self.service.count_reservations)
+        return 200, {"status": "ok", "reservations": total, "version": version}
+
+    # --- HTTP plumbing ---
+
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = parse_int(headers.get("content-length", 0), "Content-Length")
+        if length < 0:
+            raise HttpError(400, "'Content-Length' must not be negative")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Request body too large")
+        raw_body = await reader.readexactly(length) if length else b""
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        return method.upper(), target, raw_body, keep_alive
+
+    def dispatch(self, method, target):
+        url = urlsplit(target)
+        route, handler, params = self.match(method, url.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return route, handler, query, params
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HttpError as e:
+                    await self.respond(writer, e.status, {"error": e.message}, False)
+                    break
+                if request is None:
+                    break
+                method, target, raw_body, keep_alive = request
+
+                started = time.perf_counter()
+                route = f"{method} ?"
+                try:
+                    route, handler, query, params = self.dispatch(method, target)
+                    body = None
+                    if raw_body:
+                        try:
+                            body = json.loads(raw_body)
+                        except ValueError:
+                            raise HttpError(400, "Request body is not valid JSON")
+                    status, payload = await handler(query, body, *params)
+                except HttpError as e:
+                    status, payload = e.status, {"error": e.message}
+                except SeatUnavailableError as e:
+                    status, payload = 409, {"error": str(e)}
+                except PoolTimeoutError as e:
+                    status, payload = 503, {"error": str(e)}
+                except Exception as e:
+                    if isinstance(e, database.Error) and database.is_busy_error(e):
+                        # Still locked after database.run_write's retries.
+                        status, payload = 503, {"error": f"Database busy, try again: {e}"}
+                    else:
+                        print(f"Error handling {method} {target}: {e}")
+                        status, payload = 500, {"error": "Internal server error"}
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self.metrics.setdefault(route, RouteMetrics()).record(elapsed_ms, status)
+
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Reservation API listening on http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.threads.shutdown(wait=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the reservation service as a local HTTP/JSON API.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                        help=f"Database connections and worker threads (default: {DEFAULT_POOL_SIZE})")
+    parser.add_argument("--cache-records", type=int, default=DEFAULT_MAX_RECORDS,
+                        help=f"Reservations kept in the read cache, 0 to disable (default: {DEFAULT_MAX_RECORDS})")
+    parser.add_argument("--cache-queries", type=int, default=DEFAULT_MAX_QUERIES,
+                        help=f"Page/search results kept in the read cache (default: {DEFAULT_MAX_QUERIES})")
+    parser.add_argument("--database", help=f"Database file (default: {database.DATABASE_NAME})")
+    parser.add_argument("--group-commit", action="store_true",
+                        help="Write through one writer thread that commits concurrent writes together")
+    args = parser.parse_args(argv)
+
+    config = database.DatabaseConfig(path=args.database)
+    database.initialize_database(config)
+    service = ReservationService(ConnectionPool(size=args.pool_size, config=config),
+                                 ReservationCache(args.cache_records, args.cache_queries),
+                                 write_queue=WriteQueue(config) if args.group_commit else None)
+    server = ApiServer(service, args.host, args.port, workers=args.pool_size)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("Shutting down.")
+    finally:
+        server.close()
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
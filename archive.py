@@ -0,0 +1,425 @@
+# archive.py
+import argparse
+import datetime
+import heapq
+import itertools
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import database
+import validation
+from database import Error
+
+GRANULARITIES = ("year", "month")
+DEFAULT_GRANULARITY = "year"
+DEFAULT_KEEP_DAYS = 365
+ARCHIVE_BATCH_SIZE = 2000
+# Pause between batches, so booking terminals get the write lock in between.
+BATCH_PAUSE_S = 0.02
+# FLIGHT_APP_ARCHIVE_DAYS=365 makes the app archive flights older than a
+# year in the background at startup.
+ENV_VARIABLE = "FLIGHT_APP_ARCHIVE_DAYS"
+
+ARCHIVE_TABLE = "archived_reservations"
+ARCHIVE_COLUMNS = database.RESERVATION_COLUMNS + ("day",)
+PARTITION_ALIAS = "archive_partition"
+# In the live database: bookings being moved right now, or left half-moved
+# by an interrupted run. Their archived copies are not shown.
+PENDING_TABLE = "archive_pending"
+PARTITION_FILE = re.compile(r"^flights_(\d{4})(?:_(\d{2}))?\.db$")
+
+# Partitions keep whole reservation rows (names, not lookup ids), so each
+# file can be copied away, opened on its own or deleted without the others.
+ARCHIVE_SCHEMA = (
+    f"""CREATE TABLE IF NOT EXISTS {PARTITION_ALIAS}.{ARCHIVE_TABLE} (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        flight_number TEXT NOT NULL,
+        departure TEXT NOT NULL,
+        destination TEXT NOT NULL,
+        date TEXT NOT NULL,
+        seat_number TEXT NOT NULL,
+        day INTEGER NOT NULL
+    )""",
+    f"CREATE INDEX IF NOT EXISTS {PARTITION_ALIAS}.idx_archived_day ON {ARCHIVE_TABLE}(day, id)",
+    f"CREATE INDEX IF NOT EXISTS {PARTITION_ALIAS}.idx_archived_flight_day "
+    f"ON {ARCHIVE_TABLE}(flight_number, day, seat_number)",
+)
+
+def cutoff_for(keep_days, today=None):
+    return ((today or datetime.date.today()) - datetime.timedelta(days=keep_days)).isoformat()
+
+def keep_days_from_environment():
+    value = os.environ.get(ENV_VARIABLE, "").strip()
+    try:
+        keep_days = int(value)
+    except ValueError:
+        return None
+    return keep_days if keep_days > 0 else None
+
+class Archive:
+    # Archive databases for flights that already departed, one file per year
+    # or per month of flight dates (archive/flights_2024.db,
+    # archive/flights_2024_03.db) next to the live database. Bookings older
+    # than a cutoff are moved there by archive_reservations; the live tables
+    # keep only current flights, so every list view and lookup stays small.
+    def __init__(self, directory=None, granularity=DEFAULT_GRANULARITY, database_path=None):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown archive granularity: {granularity}")
+        database_path = database_path or database.DATABASE_NAME
+        self.directory = directory or os.path.join(os.path.dirname(os.path.abspath(database_path)), "archive")
+        self.granularity = granularity
+
+    def partition_key(self, day):
+        date = datetime.date.fromordinal(day)
+        return f"{date.year}" if self.granularity == "year" else f"{date.year}_{date.month:02d}"
+
+    def partition_path(self, key):
+        return os.path.join(self.directory, f"flights_{key}.db")
+
+    def partitions(self):
+        # [(first day, last day, path)] of the partition files on disk, oldest
+        # first. Files of either granularity count, so changing it later
+        # does not hide what was archived before.
+        found = []
+        if not os.path.isdir(self.directory):
+            return found
+        for file_name in os.listdir(self.directory):
+            match = PARTITION_FILE.match(file_name)
+            if not match:
+                continue
+            year, month = int(match.group(1)), match.group(2)
+            if month is None:
+                first, last = datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+            else:
+                first = datetime.date(year, int(month), 1)
+                last = (first + datetime.timedelta(days=31)).replace(day=1) - datetime.timedelta(days=1)
+            found.append((first.toordinal(), last.toordinal(), os.path.join(self.directory, file_name)))
+        return sorted(found)
+
+    def partitions_between(self, low, high):
+        return [partition for partition in self.partitions() if partition[0] <= high and partition[1] >= low]
+
+    def stream_archived(self, low, high, flight_number=None, batch_size=database.DEFAULT_BATCH_SIZE):
+        # Archived rows with low <= day <= high, oldest partition first and in
+        # the order database.stream_reservations gives a date range. Read
+        # through a private in-memory connection that ATTACHes one partition
+        # at a time, so any number of partitions can be read and the
+        # caller's connection is never touched.
+        conditions = "day BETWEEN ? AND ?"
+        params = [low, high]
+        order_by = "day, id"
+        if flight_number:
+            conditions += " AND flight_number = ?"
+            params.append(flight_number)
+            order_by = "day, seat_number"
+        columns = ", ".join(database.RESERVATION_COLUMNS)
+        reader = sqlite3.connect(":memory:")
+        try:
+            for _, _, path in self.partitions_between(low, high):
+                reader.execute(f"ATTACH DATABASE ? AS {PARTITION_ALIAS}", (path,))
+                cursor = reader.cursor()
+                try:
+                    cursor.execute(f"SELECT {columns} FROM {PARTITION_ALIAS}.{ARCHIVE_TABLE} "
+                                   f"WHERE {conditions} ORDER BY {order_by}", params)
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        yield from rows
+                finally:
+                    cursor.close()
+                    reader.execute(f"DETACH DATABASE {PARTITION_ALIAS}")
+        finally:
+            reader.close()
+
+    def stream_reservations(self, conn, date_from=None, date_to=None, flight_number=None,
+                            batch_size=database.DEFAULT_BATCH_SIZE):
+        # database.stream_reservations, plus archived rows when the date range
+        # reaches back into an archive partition; otherwise exactly the live
+        # query. Without any date bound only live rows are returned. Errors
+        # are raised, as by database.stream_reservations.
+        low, high = database.date_range_days(date_from, date_to)
+        high = high or datetime.date.max.toordinal()
+        live = database.stream_reservations(conn, date_from, date_to, flight_number, batch_size)
+        if not (date_from or date_to) or not self.partitions_between(low, high):
+            yield from live
+            return
+        archived = self.not_live(conn, self.stream_archived(low, high, flight_number, batch_size), batch_size)
+        if flight_number:
+            archived = in_seat_order(archived)
+            order = seat_order
+        else:
+            order = lambda row: (row[5], row[0])
+        try:
+            yield from heapq.merge(live, archived, key=order)
+        finally:
+            live.close()
+            archived.close()
+
+    def not_live(self, conn, rows, batch_size):
+        # Drops archived rows whose booking is still in the live database or
+        # marked pending there (caught mid-move): only the live row counts.
+        check = "SELECT id FROM bookings WHERE id IN ({0})"
+        if has_pending_table(conn):
+            check += f" UNION ALL SELECT id FROM {PENDING_TABLE} WHERE id IN ({{0}})"
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) < batch_size:
+                continue
+            yield from self.drop_live(conn, check, batch)
+            batch = []
+        yield from self.drop_live(conn, check, batch)
+
+    def drop_live(self, conn, check, rows):
+        hidden = set()
+        for chunk, placeholders in database.id_chunks(row[0] for row in rows):
+            hidden.update(row[0] for row in conn.execute(check.format(placeholders), chunk * check.count("{0}")))
+        return [row for row in rows if row[0] not in hidden]
+
+    def status(self):
+        # [(path, rows, first date, last date, bytes)] per partition.
+        result = []
+        for _, _, path in self.partitions():
+            reader = sqlite3.connect(path)
+            try:
+                rows, first, last = reader.execute(
+                    f"SELECT COUNT(*), MIN(date), MAX(date) FROM {ARCHIVE_TABLE}").fetchone()
+            except Error as e:
+                print(f"Error reading archive partition {path}: {e}")
+                continue
+            finally:
+                reader.close()
+            result.append((path, rows, first, last, os.path.getsize(path)))
+        return result
+
+def seat_order(row):
+    # One flight's rows as database.stream_reservations orders them: by date,
+    # then packed seat, with seats that do not parse first.
+    code = validation.seat_code(row[6])
+    return row[5], -1 if code is None else code
+
+def in_seat_order(rows):
+    # Partitions keep seats as text; each day of one flight is at most a
+    # plane-load, so it is sorted here rather than stored a second way.
+    for _, day_rows in itertools.groupby(rows, key=lambda row: row[5]):
+        yield from sorted(day_rows, key=seat_order)
+
+def attach_partition(conn, path):
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute(f"ATTACH DATABASE ? AS {PARTITION_ALIAS}", (path,))
+    for statement in ARCHIVE_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+def detach_partition(conn):
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute(f"DETACH DATABASE {PARTITION_ALIAS}")
+
+def has_pending_table(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                        (PENDING_TABLE,)).fetchone() is not None
+
+def mark_pending(cursor, reservation_ids):
+    cursor.executemany(f"INSERT OR IGNORE INTO {PENDING_TABLE}(id) VALUES (?)",
+                       [(reservation_id,) for reservation_id in reservation_ids])
+
+def clear_pending(cursor, reservation_ids):
+    for chunk, placeholders in database.id_chunks(reservation_ids):
+        cursor.execute(f"DELETE FROM {PENDING_TABLE} WHERE id IN ({placeholders})", chunk)
+
+def copy_batch(cursor, reservation_ids, cutoff):
+    # Copies the rows that are still live and still before the cutoff into
+    # the attached partition, replacing any older copy.
+    select = database.reservation_select(fields=database.RESERVATION_FIELDS + ", b.day")
+    for chunk, placeholders in database.id_chunks(reservation_ids):
+        cursor.execute(f"INSERT OR REPLACE INTO {PARTITION_ALIAS}.{ARCHIVE_TABLE}({', '.join(ARCHIVE_COLUMNS)}) "
+                       f"{select} WHERE b.id IN ({placeholders}) AND b.day > 0 AND b.day < ?", chunk + [cutoff])
+
+def move_batch(cursor, reservation_ids):
+    # Deletes the live rows whose archived copy matches them, and their
+    # pending marks, in one transaction on the live database only. Returns
+    # (moved ids, the rest): rows edited or deleted since the copy.
+    columns = ", ".join(database.RESERVATION_COLUMNS)
+    live, archived = {}, {}
+    for chunk, placeholders in database.id_chunks(reservation_ids):
+        cursor.execute(f"{database.RESERVATION_SELECT} WHERE b.id IN ({placeholders})", chunk)
+        live.update((row[0], row) for row in cursor.fetchall())
+        cursor.execute(f"SELECT {columns} FROM {PARTITION_ALIAS}.{ARCHIVE_TABLE} WHERE id IN ({placeholders})", chunk)
+        archived.update((row[0], row) for row in cursor.fetchall())
+    moved = [reservation_id for reservation_id, row in live.items() if archived.get(reservation_id) == row]
+    database.delete_bookings(cursor, moved)
+    clear_pending(cursor, moved)
+    moved_ids = set(moved)
+    return moved, [reservation_id for reservation_id in reservation_ids if reservation_id not in moved_ids]
+
+def drop_copies(cursor, reservation_ids):
+    for chunk, placeholders in database.id_chunks(reservation_ids):
+        cursor.execute(f"DELETE FROM {PARTITION_ALIAS}.{ARCHIVE_TABLE} WHERE id IN ({placeholders})", chunk)
+
+def recover_pending(conn, archive):
+    # Rows still marked pending were not moved by an interrupted run: their
+    # copies are dropped from every partition before the marks are cleared.
+    # Rows that are still live are picked up again by the normal pass.
+    pending = [row[0] for row in conn.execute(f"SELECT id FROM {PENDING_TABLE}")]
+    if not pending:
+        return
+    for _, _, path in archive.partitions():
+        attach_partition(conn, path)
+        try:
+            database.run_write(conn, drop_copies, pending)
+        finally:
+            detach_partition(conn)
+    database.run_write(conn, clear_pending, pending)
+
+def archive_reservations(conn, archive, cutoff_date, batch_size=ARCHIVE_BATCH_SIZE, pause_s=BATCH_PAUSE_S,
+                         progress_callback=None):
+    # Moves every booking dated before cutoff_date (YYYY-MM-DD) into its
+    # archive partition, oldest first, batch_size rows at a time with a short
+    # pause in between, so it can run while terminals keep booking. With WAL
+    # a transaction over two attached files is not atomic, so each batch is
+    # marked pending in the live database, copied, and then deleted together
+    # with its marks in a live-only transaction; whatever an interruption
+    # leaves pending is undone by the next run. Legacy dates that are not
+    # YYYY-MM-DD stay live. Returns the number moved, or None on error.
+    cutoff = database.date_to_day(cutoff_date)
+    if cutoff is None:
+        print(f"Error: invalid archive cutoff date {cutoff_date!r}")
+        return None
+    moved = 0
+    current_key = None
+    try:
+        os.makedirs(archive.directory, exist_ok=True)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {PENDING_TABLE} (id INTEGER PRIMARY KEY)")
+        conn.commit()
+        recover_pending(conn, archive)
+        while True:
+            rows = conn.execute("SELECT id, day FROM bookings WHERE day > 0 AND day < ? ORDER BY day LIMIT ?",
+                                (cutoff, batch_size)).fetchall()
+            if not rows:
+                break
+            batches = {}
+            for reservation_id, day in rows:
+                batches.setdefault(archive.partition_key(day), []).append(reservation_id)
+            batch_moved = 0
+            for key, reservation_ids in batches.items():
+                if key != current_key:
+                    if current_key is not None:
+                        detach_partition(conn)
+                        current_key = None
+                    attach_partition(conn, archive.partition_path(key))
+                    current_key = key
+                database.run_write(conn, mark_pending, reservation_ids)
+                database.run_write(conn, copy_batch, reservation_ids, cutoff)
+                batch, rest = database.run_write(conn, move_batch, reservation_ids)
+                if rest:
+                    database.run_write(conn, drop_copies, rest)
+                    database.run_write(conn, clear_pending, rest)
+                batch_moved += len(batch)
+            if not batch_moved:
+                # Every row changed under us; try again on the next run.
+                break
+            moved += batch_moved
+            if progress_callback:
+                progress_callback(moved)
+            time.sleep(pause_s)
+        return moved
+    except (Error, OSError) as e:
+        print(f"Error archiving reservations: {e}")
+        return None
+    finally:
+        if current_key is not None:
+            try:
+                detach_partition(conn)
+            except Error as e:
+                print(f"Error detaching archive partition: {e}")
+
+def start_background_archiving(config, archive, keep_days):
+    # Archives flights older than keep_days on a daemon thread with its own
+    # connection. Stopping the app mid-way is safe: the batch in progress is
+    # rolled back and the next run carries on.
+    def run():
+        conn = database.create_connection(config)
+        if conn is None:
+            return
+        try:
+            started = time.perf_counter()
+            moved = archive_reservations(conn, archive, cutoff_for(keep_days))
+            if moved:
+                print(f"Archived {moved} reservations in {time.perf_counter() - started:.1f}s.")
+        finally:
+            conn.close()
+
+    thread = threading.Thread(target=run, name="archiver", daemon=True)
+    thread.start()
+    return thread
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Move reservations for past flights into per-year or per-month archive databases.")
+    parser.add_argument("database", nargs="?", default=database.DATABASE_NAME,
+                        help=f"Database file (default: {database.DATABASE_NAME})")
+    parser.add_argument("--before", help="Archive flights dated before this date (YYYY-MM-DD)")
+    parser.add_argument("--keep-days", type=int,
+                        help=f"Archive flights older than this many days (default: {DEFAULT_KEEP_DAYS})")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default=DEFAULT_GRANULARITY,
+                        help=f"One archive file per year or per month (default: {DEFAULT_GRANULARITY})")
+    parser.add_argument("--dir", dest="directory", help="Archive directory (default: archive/ next to the database)")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE,
+                        help=f"Bookings moved per transaction (default: {ARCHIVE_BATCH_SIZE})")
+    parser.add_argument("--status", action="store_true", help="Only list the archive partitions")
+    parser.add_argument("--query", nargs=2, metavar=("FROM", "TO"),
+                        help="Print the reservations in a date range, live and archived")
+    parser.add_argument("--flight", dest="flight_number", help="With --query: only this flight number")
+    args = parser.parse_args(argv)
+
+    if args.before and args.keep_days is not None:
+        parser.error("use either --before or --keep-days")
+    cutoff = args.before or cutoff_for(args.keep_days if args.keep_days is not None else DEFAULT_KEEP_DAYS)
+    if database.date_to_day(cutoff) is None:
+        parser.error("--before must be a date in YYYY-MM-DD format")
+    archive = Archive(args.directory, args.granularity, args.database)
+
+    if args.status:
+        for path, rows, first, last, size in archive.status():
+            print(f"{path}: {rows} reservations, {first} - {last}, {size / 1024 / 1024:.1f} MiB")
+        return 0
+
+    conn = database.create_connection(database.DatabaseConfig(path=args.database))
+    if conn is None:
+        print("Error! Cannot create the database connection.")
+        return 2
+    try:
+        database.create_table(conn)
+        if args.query:
+            count = 0
+            try:
+                for row in archive.stream_reservations(conn, args.query[0], args.query[1], args.flight_number):
+                    print(" | ".join(str(value) for value in row))
+                    count += 1
+            except (Error, ValueError) as e:
+                print(f"Error reading reservations: {e}")
+                return 1
+            print(f"{count} reservations.")
+            return 0
+
+        print(f"Archiving reservations before {cutoff} into {archive.directory}...")
+        started = time.perf_counter()
+        moved = archive_reservations(conn, archive, cutoff, args.batch_size,
+                                     progress_callback=lambda moved: print(f"  {moved} moved", flush=True))
+        if moved is None:
+            return 1
+        print(f"Archived {moved} reservations in {time.perf_counter() - started:.1f}s; "
+              f"{database.count_reservations(conn)} remain live.")
+        return 0
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+# benchmark.py
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import database
+import datagen
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+DEFAULT_OPERATIONS = 500
+DEFAULT_OUTPUT = "benchmark_results.json"
+UI_REPEATS = 20
+# A p50 or p95 this many times slower than the baseline counts as a regression.
+REGRESSION_THRESHOLD = 1.25
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(latencies, total_s):
+    ordered = sorted(latencies)
+    return {
+        "ops": len(ordered),
+        "total_s": round(total_s, 4),
+        "throughput_ops_s": round(len(ordered) / total_s, 1) if total_s else None,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+def time_calls(fn, calls):
+    latencies = []
+    started = time.perf_counter()
+    for args in calls:
+        call_started = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+def full_scan_repeats(size):
+    if size <= 10000:
+        return 5
+    if size <= 100000:
+        return 3
+    return 1
+
+def benchmark_database(conn, generator, size, operations, seed):
+    # The write benchmarks touch disjoint ids so each one measures real work:
+    # updates and lookups use random existing rows, deletes a separate sample,
+    # and inserts continue the generator past the seeded rows.
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, size + 1), min(size, operations * 2))
+    update_ids, delete_ids = ids[:len(ids) // 2], ids[len(ids) // 2:]
+    lookup_ids = [rng.randint(1, size) for _ in range(operations)]
+    page_cursors = [rng.randint(0, size) for _ in range(operations)]
+
+    results = {}
+    results["add_reservation"] = time_calls(
+        database.add_reservation, [(conn, generator.reservation(size + i)) for i in range(operations)])
+    results["get_reservation_by_id"] = time_calls(
+        database.get_reservation_by_id, [(conn, reservation_id) for reservation_id in lookup_ids])
+    results["get_reservations_page"] = time_calls(
+        database.get_reservations_page, [(conn, database.DEFAULT_PAGE_SIZE, cursor) for cursor in page_cursors])
+
+    updates = []
+    for reservation_id in update_ids:
+        row = database.get_reservation_by_id(conn, reservation_id)
+        updates.append((conn, reservation_id, (row[1] + " Jr",) + tuple(row[2:])))
+    results["update_reservation"] = time_calls(database.update_reservation, updates)
+    results["delete_reservation"] = time_calls(
+        database.delete_reservation, [(conn, reservation_id) for reservation_id in delete_ids])
+    results["get_all_reservations"] = time_calls(
+        database.get_all_reservations, [(conn,)] * full_scan_repeats(size))
+    return results
+
+def wait_until_idle(root, executor, owner):
+    while executor.is_busy(owner):
+        root.update()
+    root.update_idletasks()
+
+def benchmark_ui(config, repeats=UI_REPEATS):
+    # Times ReservationsPage.load_reservations from the call until the rows
+    # are in the Treeview, in both paged and virtual-scrolling mode. Needs a
+    # display (use xvfb-run on a headless machine); skipped otherwise.
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {"skipped": f"Tk is not available: {e}"}
+    root.withdraw()
+
+    from data_access import DataAccess
+    from reservations import ReservationsPage
+    from workers import DatabaseExecutor
+
+    data_access = DataAccess(config)
+    executor = DatabaseExecutor(root, poll_interval_ms=1)
+    page = ReservationsPage(root, lambda: None, lambda reservation_id: None, data_access, executor)
+    page.pack(fill="both", expand=True)
+    results = {}
+    try:
+        for mode, virtual in (("paged", False), ("virtual", True)):
+            page.virtual_mode.set(virtual)
+            page.toggle_virtual_mode()
+            wait_until_idle(root, executor, page)
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(repeats):
+                call_started = time.perf_counter()
+                page.load_reservations()
+                wait_until_idle(root, executor, page)
+                latencies.append(time.perf_counter() - call_started)
+            results[f"ui_load_reservations_{mode}"] = summarize(latencies, time.perf_counter() - started)
+    finally:
+        executor.shutdown()
+        data_access.close()
+        root.destroy()
+    return results
+
+def run_size(workdir, size, operations, seed, include_ui):
+    path = os.path.join(workdir, f"benchmark_{size}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    config = database.DatabaseConfig(path=path)
+    conn = database.create_connection(config)
+    if conn is None:
+        raise RuntimeError(f"Cannot create the benchmark database {path}")
+    try:
+        database.create_table(conn)
+        print(f"Seeding {size} reservations...", flush=True)
+        started = time.perf_counter()
+        generator = datagen.seed_database(conn, size, seed)
+        seed_s = time.perf_counter() - started
+        print(f"  seeded in {seed_s:.1f}s", flush=True)
+
+        result = {"seed_s": round(seed_s, 2), "operations": benchmark_database(conn, generator, size, operations, seed)}
+    finally:
+        conn.close()
+    if include_ui:
+        result["ui"] = benchmark_ui(config)
+    return result
+
+def print_results(results):
+    for size, result in results.items():
+        print(f"\n{size} rows (seeded in {result['seed_s']}s)")
+        print(f"  {'operation':34}{'ops':>6}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        operations = dict(result["operations"])
+        ui = result.get("ui", {})
+        if "skipped" in ui:
+            print(f"  UI benchmarks skipped: {ui['skipped']}")
+        else:
+            operations.update(ui)
+        for name, stats in operations.items():
+            print(f"  {name:34}{stats['ops']:>6}{stats['throughput_ops_s']:>12}"
+                  f"{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD):
+    # Returns (size, operation, metric, baseline ms, current ms) for every
+    # latency that got slower than `threshold` times the baseline.
+    regressions = []
+    for size, result in current["results"].items():
+        old = baseline.get("results", {}).get(size)
+        if old is None:
+            continue
+        old_operations = dict(old["operations"], **{k: v for k, v in old.get("ui", {}).items() if k != "skipped"})
+        new_operations = dict(result["operations"], **{k: v for k, v in result.get("ui", {}).items() if k != "skipped"})
+        for name, stats in new_operations.items():
+            if name not in old_operations:
+                continue
+            for metric in ("p50_ms", "p95_ms"):
+                before, after = old_operations[name][metric], stats[metric]
+                if before and after > before * threshold:
+                    regressions.append((size, name, metric, before, after))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the database layer on synthetic data.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated table sizes to seed (default: 10000,100000,1000000)")
+    parser.add_argument("--operations", type=int, default=DEFAULT_OPERATIONS,
+                        help=f"Calls per timed operation (default: {DEFAULT_OPERATIONS})")
+    parser.add_argument("--seed", type=int, default=datagen.DEFAULT_SEED, help="Random seed for data and ids")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"Results file (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--compare", help="Earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help=f"Slowdown factor reported as a regression (default: {REGRESSION_THRESHOLD})")
+    parser.add_argument("--no-ui", action="store_true", help="Skip the Tk ReservationsPage benchmarks")
+    parser.add_argument("--workdir", help="Directory for the benchmark databases (default: a temporary one)")
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    except ValueError:
+        parser.error("--sizes must be a comma-separated list of integers")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="flight-benchmark-")
+    os.makedirs(workdir, exist_ok=True)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "operations": args.operations,
+        },
+        "results": {},
+    }
+    try:
+        for size in sizes:
+            report["results"][str(size)] = run_size(workdir, size, args.operations, args.seed, not args.no_ui)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as file_obj:
+        json.dump(report, file_obj, indent=2)
+    print_results(report["results"])
+    print(f"\nResults saved to {args.output}.")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file_obj:
+            baseline = json.load(file_obj)
+        regressions = compare_results(baseline, report, args.threshold)
+        if not regressions:
+            print(f"No regressions against {args.compare}.")
+            return 0
+        print(f"Regressions against {args.compare}:")
+        for size, name, metric, before, after in regressions:
+            print(f"  {size} rows  {name} {metric}: {before:.3f} -> {after:.3f} ms ({after / before:.2f}x)")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
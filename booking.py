@@ -2,13 +2,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import database
+import seat_inventory
+import validation
+from data_access import DataAccess
+from workers import DatabaseExecutor, LoadingIndicator
 
 class BookingPage(tk.Frame):
-    def __init__(self, master, show_home_page_callback, db_connection):
+    def __init__(self, master, show_home_page_callback, data_access, executor):
         super().__init__(master)
         self.master = master
         self.show_home_page = show_home_page_callback
-        self.db_conn = db_connection
+        self.data_access = data_access
+        self.executor = executor
+        self.service = data_access.service
 
         self.configure(bg="#f0f0f0")
 
@@ -49,6 +55,9 @@ class BookingPage(tk.Frame):
 
         form_frame.columnconfigure(1, weight=1)
 
+        for entry_name in ("flight_number_entry", "date_entry", "seat_number_entry"):
+            self.entries[entry_name].bind("<FocusOut>", lambda event: self.check_seat_availability())
+
         buttons_frame = ttk.Frame(self, style="TFrame")
         buttons_frame.pack(pady=(10, 20))
 
@@ -61,13 +70,13 @@ class BookingPage(tk.Frame):
                   background=[('active', '#e0e0e0'), ('!active', '#ffffff')],
                   foreground=[('active', '#000000'), ('!active', '#333333')])
 
-        submit_button = ttk.Button(
+        self.submit_button = ttk.Button(
             buttons_frame,
             text="Submit Reservation",
             command=self.submit_reservation,
             style="Booking.TButton"
         )
-        submit_button.pack(side=tk.LEFT, padx=10)
+        self.submit_button.pack(side=tk.LEFT, padx=10)
 
         back_button = ttk.Button(
             buttons_frame,
@@ -80,36 +89,75 @@ class BookingPage(tk.Frame):
         self.status_label = ttk.Label(self, text="", font=("Arial", 10), background="#f0f0f0")
         self.status_label.pack(pady=(0, 10))
 
+        self.loading_indicator = LoadingIndicator(self, anchor=self.status_label)
+
 
     def submit_reservation(self):
-        name = self.entries["name_entry"].get().strip()
-        flight_number = self.entries["flight_number_entry"].get().strip()
-        departure = self.entries["departure_entry"].get().strip()
-        destination = self.entries["destination_entry"].get().strip()
-        date = self.entries["date_entry"].get().strip()
-        seat_number = self.entries["seat_number_entry"].get().strip()
+        reservation_details, error = validation.validate_reservation(
+            [self.entries[field + "_entry"].get() for field in database.RESERVATION_COLUMNS[1:]])
+        if error:
+            messagebox.showerror("Error", f"{error}!", parent=self)
+            self.status_label.config(text=f"Error: {error}.", foreground="red")
+            return
+        name, flight_number, departure, destination, date, seat_number = reservation_details
 
-        if not all([name, flight_number, departure, destination, date, seat_number]):
-            messagebox.showerror("Error", "All fields are required!", parent=self)
-            self.status_label.config(text="Error: All fields are required.", foreground="red")
+        try:
+            seat_error = self.data_access.seat_inventory().check(flight_number, date, seat_number)
+        except database.Error as e:
+            # The booking transaction re-checks the seat, so just skip the hint.
+            print(f"Error checking seat availability: {e}")
+            seat_error = None
+        if seat_error:
+            messagebox.showerror("Seat Unavailable", seat_error, parent=self)
+            self.status_label.config(text=f"Error: {seat_error}", foreground="red")
             return
 
-        reservation_details = (name, flight_number, departure, destination, date, seat_number)
+        self.submit_button.config(state=tk.DISABLED)
+        self.loading_indicator.show()
+        self.status_label.config(text="Submitting reservation...", foreground="black")
+        self.executor.submit(self, self.service.add_reservation, reservation_details,
+                             on_success=self.on_reservation_added,
+                             on_error=self.on_submit_error,
+                             cancellable=False)
+
+    def on_reservation_added(self, reservation_id):
+        self.submit_button.config(state=tk.NORMAL)
+        self.loading_indicator.hide()
+        if reservation_id:
+            messagebox.showinfo("Success", f"Reservation successfully booked!\nID: {reservation_id}", parent=self)
+            self.status_label.config(text=f"Reservation booked (ID: {reservation_id}).", foreground="green")
+            self.clear_form()
+        else:
+            messagebox.showerror("Database Error", "Failed to book reservation. Check logs.", parent=self)
+            self.status_label.config(text="Error: Failed to book reservation.", foreground="red")
+
+    def on_submit_error(self, error):
+        self.submit_button.config(state=tk.NORMAL)
+        self.loading_indicator.hide()
+        if isinstance(error, seat_inventory.SeatUnavailableError):
+            messagebox.showerror("Seat Unavailable", str(error), parent=self)
+            self.status_label.config(text=f"Error: {error}", foreground="red")
+            return
+        messagebox.showerror("Error", f"An unexpected error occurred: {error}", parent=self)
+        self.status_label.config(text=f"Error: {error}", foreground="red")
+        print(f"Error during submission: {error}")
 
+    def check_seat_availability(self):
+        flight_number = self.entries["flight_number_entry"].get().strip()
+        date = self.entries["date_entry"].get().strip()
+        seat_number = self.entries["seat_number_entry"].get().strip()
+        if not (flight_number and date):
+            return
         try:
-            reservation_id = database.add_reservation(self.db_conn, reservation_details)
-            if reservation_id:
-                messagebox.showinfo("Success", f"Reservation successfully booked!\nID: {reservation_id}", parent=self)
-                self.status_label.config(text=f"Reservation booked (ID: {reservation_id}).", foreground="green")
-                self.clear_form()
-            else:
-                messagebox.showerror("Database Error", "Failed to book reservation. Check logs.", parent=self)
-                self.status_label.config(text="Error: Failed to book reservation.", foreground="red")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}", parent=self)
-            self.status_label.config(text=f"Error: {e}", foreground="red")
-            print(f"Error during submission: {e}")
-
+            inventory = self.data_access.seat_inventory()
+            if seat_number:
+                seat_error = inventory.check(flight_number, date, seat_number)
+                if seat_error:
+                    self.status_label.config(text=seat_error, foreground="red")
+                    return
+            self.status_label.config(text=inventory.describe(flight_number, date), foreground="black")
+        except database.Error as e:
+            print(f"Error checking seat availability: {e}")
 
     def clear_form(self):
         for entry_widget in self.entries.values():
@@ -117,15 +165,15 @@ class BookingPage(tk.Frame):
         self.entries["name_entry"].focus_set()
         self.status_label.config(text="")
 
-    def refresh_db_connection(self, new_conn):
-        self.db_conn = new_conn
-        print("BookingPage: Database connection refreshed.")
-
     def on_show(self):
         print("BookingPage is now visible.")
         self.clear_form()
         self.status_label.config(text="")
 
+    def on_hide(self):
+        # Bookings in flight are not cancelled; their result is still reported.
+        self.loading_indicator.hide()
+
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -133,9 +181,9 @@ if __name__ == "__main__":
     root.geometry("650x500")
 
     database.initialize_database()
-    test_db_conn = database.create_connection()
+    test_data_access = DataAccess()
 
-    if not test_db_conn:
+    if not test_data_access.check():
         print("Failed to connect to the database for testing. Exiting.")
         exit()
 
@@ -148,16 +196,17 @@ if __name__ == "__main__":
         tk.Label(root, text="Returned to Home (Test)").pack()
 
 
-    booking_page_frame = BookingPage(root, dummy_show_home, test_db_conn)
+    test_executor = DatabaseExecutor(root)
+    booking_page_frame = BookingPage(root, dummy_show_home, test_data_access, test_executor)
     booking_page_frame.grid(row=0, column=0, sticky="nsew")
     root.grid_rowconfigure(0, weight=1)
     root.grid_columnconfigure(0, weight=1)
 
 
     def on_closing():
-        if test_db_conn:
-            test_db_conn.close()
-            print("Test database connection closed.")
+        test_executor.shutdown()
+        test_data_access.close()
+        print("Test database connections closed.")
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
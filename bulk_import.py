@@ -0,0 +1,185 @@
+# bulk_import.py
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+import time
+import database
+import migrations
+import validation
+
+FIELDS = database.RESERVATION_COLUMNS[1:]
+DEFAULT_CHUNK_SIZE = 5000
+# Imports that reach this many rows stop updating the search index row by
+# row and rebuild it once at the end (see migrations.pause_search_indexing);
+# smaller manifests keep it live, since a rebuild costs time per booking
+# already in the table.
+DEFER_SEARCH_INDEX_ROWS = 5000
+
+class ImportReport:
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_error(self, line_number, message):
+        self.errors.append((line_number, message))
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    def summary(self):
+        rate = self.rows_imported / self.elapsed if self.elapsed else 0
+        return (f"Read {self.rows_read} rows, imported {self.rows_imported}, "
+                f"rejected {len(self.errors)} in {self.elapsed:.2f}s ({rate:.0f} rows/s).")
+
+def read_csv(file_obj):
+    reader = csv.DictReader(file_obj)
+    missing = [field for field in FIELDS if field not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+    for record in reader:
+        # line_num is the physical line, so quoted multi-line fields still
+        # report where the record ended.
+        yield reader.line_num, record, None
+
+def read_jsonl(file_obj):
+    for line_number, line in enumerate(file_obj, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+def validate_record(record):
+    values = []
+    for field in FIELDS:
+        value = record.get(field)
+        value = "" if value is None else str(value).strip()
+        if not value:
+            return None, f"Missing value for '{field}'"
+        values.append(value)
+    return validation.validate_reservation(values)
+
+def write_chunk(cursor, chunk):
+    cursor.executemany(database.INSERT_RESERVATION_SQL, [values for _, values in chunk])
+
+def write_rows(cursor, chunk):
+    # Row by row in one transaction; returns the (line number, message) of
+    # every row that was rejected.
+    rejected = []
+    for line_number, values in chunk:
+        try:
+            cursor.execute(database.INSERT_RESERVATION_SQL, values)
+        except sqlite3.IntegrityError as e:
+            rejected.append((line_number, f"Seat {values[5]} on {values[1]} {values[4]} is already booked ({e})"))
+    return rejected
+
+def insert_chunk(conn, chunk, report):
+    # Both passes go through database.run_write, so a chunk that meets
+    # another connection's lock is retried rather than lost; the report is
+    # only updated once a transaction has committed.
+    try:
+        database.run_write(conn, write_chunk, chunk)
+        report.rows_imported += len(chunk)
+        return
+    except sqlite3.IntegrityError:
+        pass
+
+    # Something in the chunk collides with an existing seat. Redo it row by
+    # row in a single transaction so only the offending rows are rejected.
+    rejected = database.run_write(conn, write_rows, chunk)
+    report.rows_imported += len(chunk) - len(rejected)
+    for line_number, message in rejected:
+        report.add_error(line_number, message)
+
+def import_reservations(conn, records, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None,
+                        defer_search_index_rows=DEFER_SEARCH_INDEX_ROWS):
+    report = ImportReport()
+    chunk = []
+    paused = False
+    try:
+        # A pause left behind by an interrupted import is undone first.
+        database.run_write(conn, migrations.resume_search_indexing)
+        for line_number, record, error in records:
+            report.rows_read += 1
+            values = None
+            if error is None:
+                values, error = validate_record(record)
+            if error:
+                report.add_error(line_number, error)
+                continue
+            chunk.append((line_number, values))
+            if not paused and report.rows_read >= defer_search_index_rows and database.has_search_index(conn):
+                database.run_write(conn, migrations.pause_search_indexing)
+                paused = True
+            if len(chunk) >= chunk_size:
+                insert_chunk(conn, chunk, report)
+                chunk = []
+                if progress_callback:
+                    progress_callback(report)
+        if chunk:
+            insert_chunk(conn, chunk, report)
+            if progress_callback:
+                progress_callback(report)
+    finally:
+        if paused:
+            database.run_write(conn, migrations.resume_search_indexing)
+    report.finish()
+    return report
+
+def import_file(conn, path, file_format=None, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None):
+    file_format = file_format or ("jsonl" if path.endswith((".jsonl", ".json")) else "csv")
+    reader = READERS[file_format]
+    if path == "-":
+        return import_reservations(conn, reader(sys.stdin), chunk_size, progress_callback)
+    with open(path, newline="", encoding="utf-8-sig") as file_obj:
+        return import_reservations(conn, reader(file_obj), chunk_size, progress_callback)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import reservations from CSV or JSON lines.")
+    parser.add_argument("path", help="Input file, or '-' to read from stdin")
+    parser.add_argument("--format", choices=sorted(READERS), help="Input format (default: from file extension)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction")
+    parser.add_argument("--database", help=f"Database file (default: {database.DATABASE_NAME})")
+    parser.add_argument("--show-errors", type=int, default=20, help="How many rejected rows to list")
+    args = parser.parse_args(argv)
+
+    config = database.DatabaseConfig(path=args.database)
+    database.initialize_database(config)
+    conn = database.create_connection(config)
+    if conn is None:
+        print("Error! Cannot create the database connection.")
+        return 2
+
+    def print_progress(report):
+        print(f"  {report.rows_imported} rows imported...", file=sys.stderr)
+
+    try:
+        report = import_file(conn, args.path, args.format, args.chunk_size, print_progress)
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}")
+        return 2
+    finally:
+        conn.close()
+
+    print(report.summary())
+    for line_number, message in report.errors[:args.show_errors]:
+        print(f"  line {line_number}: {message}")
+    if len(report.errors) > args.show_errors:
+        print(f"  ... and {len(report.errors) - args.show_errors} more.")
+    return 1 if report.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
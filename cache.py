@@ -0,0 +1,209 @@
+# cache.py
+import threading
+import time
+from collections import OrderedDict
+import database
+import instrumentation
+
+DEFAULT_MAX_RECORDS = 5000
+DEFAULT_MAX_QUERIES = 64
+# How long cached data is served without asking the database whether another
+# connection (another app instance, the HTTP API) has changed anything.
+DEFAULT_MAX_AGE_S = 2.0
+
+MISSING = object()
+
+class LRUCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=MISSING):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        # Returns the (key, value) pairs evicted to make room.
+        if self.max_entries <= 0:
+            return [(key, value)]
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        evicted = []
+        while len(self.entries) > self.max_entries:
+            evicted.append(self.entries.popitem(last=False))
+            self.evictions += 1
+        return evicted
+
+    def pop(self, key, default=None):
+        return self.entries.pop(key, default)
+
+    def keys(self):
+        return list(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+def query_rows(key, value):
+    kind = key[0]
+    if kind == "page":
+        return value[0]
+    if kind in ("search", "window"):
+        return value
+    return ()
+
+def page_may_contain(key, value, reservation_id):
+    # Pages are keyset ranges (ORDER BY id DESC, id < cursor), so a row that
+    # was inserted or changed only belongs to the page whose id range covers it.
+    _, page_size, cursor = key
+    rows = value[0]
+    if cursor is not None and reservation_id >= cursor:
+        return False
+    return not rows or len(rows) < page_size or reservation_id > rows[-1][0]
+
+class ReservationCache:
+    # Read-through cache used by ReservationService. Records are keyed by id;
+    # query results by ("page", page_size, cursor), ("window", offset, limit),
+    # ("search", text, limit) and ("count",). A write invalidates the record,
+    # every cached query that contains that row, and keyset pages whose id
+    # range covers it; counts, offset windows and searches are dropped on any
+    # write. Changes made through other
+    # connections are picked up from the change log (see sync).
+    def __init__(self, max_records=DEFAULT_MAX_RECORDS, max_queries=DEFAULT_MAX_QUERIES,
+                 max_age_s=DEFAULT_MAX_AGE_S):
+        self.lock = threading.Lock()
+        self.records = LRUCache(max_records)
+        self.queries = LRUCache(max_queries)
+        self.query_ids = {}
+        self.id_queries = {}
+        self.max_age_s = max_age_s
+        self.version = None
+        self.checked_at = 0.0
+
+    def is_fresh(self):
+        return self.version is not None and time.monotonic() - self.checked_at < self.max_age_s
+
+    def lookup(self, key):
+        # Returns (version, value), or (None, MISSING) on a miss.
+        with self.lock:
+            if key[0] == "record":
+                value = self.records.get(key[1])
+            else:
+                value = self.queries.get(key)
+            version = self.version
+        instrumentation.count("cache_misses" if value is MISSING else "cache_hits")
+        return (None, MISSING) if value is MISSING else (version, value)
+
+    def store(self, key, value, version):
+        # Only results read at the version the cache is synced to are kept;
+        # anything else might already be out of date.
+        with self.lock:
+            if version != self.version:
+                return
+            if key[0] == "record":
+                self.records.put(key[1], value)
+                return
+            rows = query_rows(key, value)
+            for row in rows:
+                self.records.put(row[0], row)
+            # A stored-again key drops the ids of its old result first.
+            self.forget_queries([(key, None)])
+            self.forget_queries(self.queries.put(key, value))
+            if key not in self.queries:
+                # Evicted straight away (max_queries=0): nothing to track.
+                return
+            ids = [row[0] for row in rows]
+            self.query_ids[key] = ids
+            for reservation_id in ids:
+                self.id_queries.setdefault(reservation_id, set()).add(key)
+
+    def forget_queries(self, evicted):
+        for key, _ in evicted:
+            for reservation_id in self.query_ids.pop(key, ()):
+                keys = self.id_queries.get(reservation_id)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.id_queries[reservation_id]
+
+    def drop_query(self, key):
+        value = self.queries.pop(key, MISSING)
+        if value is not MISSING:
+            self.forget_queries([(key, value)])
+
+    def invalidate(self, changes):
+        # changes maps reservation id -> current row, or None if it was deleted.
+        if not changes:
+            return
+        with self.lock:
+            # A reader that loaded the old row just before the write may still
+            # store it; the next read syncs with the change log and drops it.
+            self.checked_at = 0.0
+            for reservation_id, row in changes.items():
+                self.records.pop(reservation_id)
+                for key in list(self.id_queries.get(reservation_id, ())):
+                    self.drop_query(key)
+                if row is not None:
+                    for key in self.queries.keys():
+                        if key[0] == "page" and page_may_contain(key, self.queries.entries[key], reservation_id):
+                            self.drop_query(key)
+            for key in self.queries.keys():
+                if key[0] in ("count", "window", "search"):
+                    self.drop_query(key)
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+            self.queries.clear()
+            self.query_ids.clear()
+            self.id_queries.clear()
+
+    def sync(self, conn):
+        # Brings the cache up to the current change-log version, applying the
+        # logged changes as invalidations, or clearing everything if the log
+        # cannot say what changed.
+        version = database.get_change_version(conn)
+        with self.lock:
+            since = self.version
+            if since == version:
+                self.checked_at = time.monotonic()
+                return
+        result = database.get_changes_since(conn, since) if since is not None else None
+        if result is None:
+            self.clear()
+        else:
+            version, changes = result
+            self.invalidate(changes)
+        with self.lock:
+            if self.version is None or version > self.version:
+                self.version = version
+            self.checked_at = time.monotonic()
+
+    def stats(self):
+        with self.lock:
+            return {"records": self.records.stats(), "queries": self.queries.stats(), "version": self.version}
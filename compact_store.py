@@ -0,0 +1,304 @@
+# compact_store.py
+import argparse
+import sys
+from array import array
+from datetime import date
+import database
+import validation
+
+class StringColumn:
+    # Dictionary-encoded strings: every distinct value is kept once (interned)
+    # and each row only holds a 32-bit code. Flight numbers, cities, seats
+    # and even passenger names repeat a lot across a large result set.
+    def __init__(self):
+        self.codes = array("I")
+        self.values = []
+        self.lookup = {}
+
+    def encode(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value) if isinstance(value, str) else value
+            self.values.append(value)
+            self.lookup[value] = code
+        return code
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def append(self, value):
+        self.codes.append(self.encode(value))
+
+    def insert(self, index, value):
+        self.codes.insert(index, self.encode(value))
+
+    def set(self, index, value):
+        self.codes[index] = self.encode(value)
+
+    def delete(self, index):
+        del self.codes[index]
+
+    def ranks(self):
+        # rank[code] is the position of that value in sorted order, so rows can
+        # be sorted by comparing small ints instead of strings.
+        order = sorted(range(len(self.values)), key=lambda code: str(self.values[code]).casefold())
+        rank = array("I", bytes(4 * len(self.values)))
+        for position, code in enumerate(order):
+            rank[code] = position
+        return rank
+
+    def nbytes(self):
+        return (self.codes.itemsize * len(self.codes) + sys.getsizeof(self.values) + sys.getsizeof(self.lookup)
+                + sum(sys.getsizeof(value) for value in self.values))
+
+class DateColumn:
+    # Dates as integer day numbers (date.toordinal). Text that is not a valid
+    # YYYY-MM-DD date is kept as-is under a negative code, so nothing is lost.
+    def __init__(self):
+        self.days = array("i")
+        self.ordinals = {}
+        self.texts = {}
+        self.unparsed = []
+
+    def encode(self, value):
+        day = self.ordinals.get(value)
+        if day is None:
+            day = validation.date_to_day(value)
+            if day is None:
+                self.unparsed.append(value)
+                day = -len(self.unparsed)
+            self.ordinals[value] = day
+            if day > 0:
+                self.texts[day] = value
+        return day
+
+    def decode(self, day):
+        if day < 0:
+            return self.unparsed[-day - 1]
+        text = self.texts.get(day)
+        if text is None:
+            text = self.texts[day] = date.fromordinal(day).isoformat()
+        return text
+
+    def __getitem__(self, index):
+        return self.decode(self.days[index])
+
+    def append(self, value):
+        self.days.append(self.encode(value))
+
+    def insert(self, index, value):
+        self.days.insert(index, self.encode(value))
+
+    def set(self, index, value):
+        self.days[index] = self.encode(value)
+
+    def delete(self, index):
+        del self.days[index]
+
+    def nbytes(self):
+        return (self.days.itemsize * len(self.days) + sys.getsizeof(self.ordinals) + sys.getsizeof(self.texts)
+                + sum(sys.getsizeof(value) for value in self.ordinals))
+
+class ReservationStore:
+    # Column-oriented result set with the same row shape as database.py
+    # ((id, name, flight_number, departure, destination, date, seat_number)).
+    # Rows are only turned back into tuples when they are displayed.
+    def __init__(self, rows=()):
+        self.ids = array("q")
+        self.names = StringColumn()
+        self.flight_numbers = StringColumn()
+        self.departures = StringColumn()
+        self.destinations = StringColumn()
+        self.dates = DateColumn()
+        self.seat_numbers = StringColumn()
+        self.columns = {
+            "name": self.names,
+            "flight_number": self.flight_numbers,
+            "departure": self.departures,
+            "destination": self.destinations,
+            "date": self.dates,
+            "seat_number": self.seat_numbers,
+        }
+        # Per-row sort keys by column, built on first use and dropped on any change.
+        self.sort_keys = {}
+        self.extend(rows)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, row):
+        if self.sort_keys:
+            self.sort_keys.clear()
+        self.ids.append(row[0])
+        self.names.append(row[1])
+        self.flight_numbers.append(row[2])
+        self.departures.append(row[3])
+        self.destinations.append(row[4])
+        self.dates.append(row[5])
+        self.seat_numbers.append(row[6])
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def insert(self, index, row):
+        self.sort_keys.clear()
+        self.ids.insert(index, row[0])
+        for column, value in zip(self.columns.values(), row[1:]):
+            column.insert(index, value)
+
+    def row(self, index):
+        return (self.ids[index], self.names[index], self.flight_numbers[index], self.departures[index],
+                self.destinations[index], self.dates[index], self.seat_numbers[index])
+
+    def rows(self, indices=None):
+        for index in range(len(self.ids)) if indices is None else indices:
+            yield self.row(index)
+
+    def find(self, reservation_id):
+        try:
+            return self.ids.index(reservation_id)
+        except ValueError:
+            return None
+
+    def update(self, row):
+        index = self.find(row[0])
+        if index is not None:
+            self.sort_keys.clear()
+            for column, value in zip(self.columns.values(), row[1:]):
+                column.set(index, value)
+        return index
+
+    def remove(self, reservation_id):
+        index = self.find(reservation_id)
+        if index is None:
+            return False
+        self.sort_keys.clear()
+        del self.ids[index]
+        for column in self.columns.values():
+            column.delete(index)
+        return True
+
+    def sort_key(self, column):
+        # One int per row that orders like the column's values: the id, the day
+        # number, or the rank of the string among the column's distinct values.
+        keys = self.sort_keys.get(column)
+        if keys is None:
+            if column == "id":
+                keys = self.ids
+            elif column == "date":
+                keys = self.dates.days
+            else:
+                string_column = self.columns[column]
+                rank = string_column.ranks()
+                keys = array("I", [rank[code] for code in string_column.codes])
+            self.sort_keys[column] = keys
+        return keys
+
+    def sort_indices(self, column, reverse=False, indices=None):
+        # Row positions ordered by `column` (ties keep their current order),
+        # for showing the store sorted without reordering the columns.
+        indices = range(len(self.ids)) if indices is None else indices
+        return array("I", sorted(indices, key=self.sort_key(column).__getitem__, reverse=reverse))
+
+    def filter_indices(self, filters, indices=None):
+        # filters maps column name -> text; a row matches when every column
+        # contains its text (case-insensitive). String columns are tested once
+        # per distinct value, then rows are matched by code.
+        selected = range(len(self.ids)) if indices is None else indices
+        for column, text in filters.items():
+            needle = text.casefold()
+            if column == "id":
+                ids = self.ids
+                selected = [index for index in selected if needle in str(ids[index])]
+            elif column == "date":
+                matching = {day for value, day in self.dates.ordinals.items() if needle in str(value).casefold()}
+                days = self.dates.days
+                selected = [index for index in selected if days[index] in matching]
+            else:
+                string_column = self.columns[column]
+                matching = {code for code, value in enumerate(string_column.values) if needle in str(value).casefold()}
+                codes = string_column.codes
+                selected = [index for index in selected if codes[index] in matching]
+        return array("I", selected)
+
+    def select(self, flight_number=None, departure=None, destination=None, date_from=None, date_to=None,
+               text=None, indices=None):
+        # Row positions matching every given filter. Equality filters compare
+        # codes; `text` is a case-insensitive substring of the name, flight,
+        # cities or seat, tested once per distinct value rather than per row.
+        selected = range(len(self.ids)) if indices is None else indices
+        for column, value in ((self.flight_numbers, flight_number), (self.departures, departure),
+                              (self.destinations, destination)):
+            if value is None:
+                continue
+            code = column.lookup.get(value)
+            codes = column.codes
+            selected = [index for index in selected if codes[index] == code] if code is not None else []
+
+        if date_from is not None or date_to is not None:
+            # Bounds are only looked up, not added to the column; one that is
+            # not a YYYY-MM-DD date matches nothing.
+            low = validation.date_to_day(date_from) if date_from is not None else 1
+            high = validation.date_to_day(date_to) if date_to is not None else date.max.toordinal()
+            days = self.dates.days
+            if low is None or high is None:
+                selected = []
+            else:
+                selected = [index for index in selected if low <= days[index] <= high]
+
+        if text:
+            needle = text.casefold()
+            matches = []
+            for column in (self.names, self.flight_numbers, self.departures, self.destinations, self.seat_numbers):
+                matches.append((column.codes, {code for code, value in enumerate(column.values)
+                                               if needle in str(value).casefold()}))
+            selected = [index for index in selected
+                        if any(codes[index] in matching for codes, matching in matches)]
+        return array("I", selected)
+
+    def nbytes(self):
+        return self.ids.itemsize * len(self.ids) + sum(column.nbytes() for column in self.columns.values())
+
+def load_store(conn, date_from=None, date_to=None, flight_number=None, batch_size=database.DEFAULT_BATCH_SIZE):
+    # Fills a store straight from a fetchmany cursor, so the full list of row
+    # tuples never exists at once.
+    store = ReservationStore()
+    rows = database.stream_reservations(conn, date_from, date_to, flight_number, batch_size)
+    try:
+        store.extend(rows)
+    finally:
+        rows.close()
+    return store
+
+def main(argv=None):
+    # Memory comparison on synthetic data: a plain list of sqlite3 row tuples
+    # against the same rows in a ReservationStore.
+    import datagen
+    import tracemalloc
+    parser = argparse.ArgumentParser(description="Compare the memory use of row tuples and ReservationStore.")
+    parser.add_argument("--rows", type=int, default=1000000, help="Number of synthetic rows (default: 1000000)")
+    args = parser.parse_args(argv)
+
+    generator = datagen.ReservationGenerator()
+
+    tracemalloc.start()
+    # Built like sqlite3 returns them: fresh str objects for every field.
+    rows = [tuple([index + 1] + [value.encode().decode() for value in generator.reservation(index)])
+            for index in range(args.rows)]
+    tuple_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    store = ReservationStore((index + 1,) + generator.reservation(index) for index in range(args.rows))
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert store.row(len(store) - 1) == rows[-1]
+    print(f"{args.rows} rows: tuples {tuple_bytes / 1e6:.1f} MB, store {store_bytes / 1e6:.1f} MB "
+          f"({tuple_bytes / store_bytes:.1f}x smaller)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
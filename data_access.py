@@ -0,0 +1,68 @@
+# data_access.py
+import database
+import instrumentation
+import seat_inventory
+from service import ConnectionPool, ReservationService
+from write_queue import WriteQueue
+
+# Matches the DatabaseExecutor's worker threads. SQLite has a single writer,
+# so more than one write connection would only wait on its lock.
+DEFAULT_READ_POOL_SIZE = 2
+DEFAULT_WRITE_POOL_SIZE = 1
+
+class DataAccess:
+    # The app's way into the database, created once and handed to each page
+    # when it is built. Lists, searches and reports borrow read-only pooled
+    # connections; bookings and edits borrow read-write ones. The connection
+    # used on the Tk thread for instant seat checks is checked before each
+    # use and reopened if it broke, so pages never hold a connection of
+    # their own and switching pages does no connection work. With
+    # group_commit, writes go through a write_queue.WriteQueue instead.
+    def __init__(self, config=None, read_pool_size=DEFAULT_READ_POOL_SIZE, write_pool_size=DEFAULT_WRITE_POOL_SIZE,
+                 group_commit=False):
+        self.config = config or database.DEFAULT_CONFIG
+        self.read_config = self.config.for_reading()
+        self.service = ReservationService(ConnectionPool(write_pool_size, self.config),
+                                          read_pool=ConnectionPool(read_pool_size, self.read_config),
+                                          write_queue=WriteQueue(self.config) if group_commit else None)
+        self.ui_conn = None
+        self.inventory = None
+
+    def seat_inventory(self):
+        # Raises database.Error if the database cannot be reopened.
+        if self.ui_conn is not None:
+            if database.connection_is_usable(self.ui_conn):
+                return self.inventory
+            instrumentation.count("ui_reconnects")
+            self.close_ui_connection()
+        conn = database.create_connection(self.read_config)
+        if conn is None:
+            raise database.Error("Cannot open the database connection.")
+        self.ui_conn = conn
+        self.inventory = seat_inventory.SeatInventory(conn)
+        return self.inventory
+
+    def check(self):
+        try:
+            self.seat_inventory()
+            return True
+        except database.Error as e:
+            print(f"Database is not available: {e}")
+            return False
+
+    def settings(self):
+        self.seat_inventory()
+        return database.get_connection_settings(self.ui_conn)
+
+    def close_ui_connection(self):
+        try:
+            self.ui_conn.close()
+        except database.Error as e:
+            print(f"Error closing database connection: {e}")
+        self.ui_conn = None
+        self.inventory = None
+
+    def close(self):
+        self.service.close()
+        if self.ui_conn is not None:
+            self.close_ui_connection()
@@ -1,45 +1,433 @@
 # database.py
+import copy
+import random
+import re
 import sqlite3
+import time
 from sqlite3 import Error
+import instrumentation
+from validation import SEAT_LETTER_BITS, SEAT_LETTER_MASK, date_to_day, seat_code
 
 DATABASE_NAME = "flights.db"
+# Stored in PRAGMA user_version: the version of the last step in
+# migrations.MIGRATIONS. Older databases are migrated on startup.
+SCHEMA_VERSION = 3
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_BATCH_SIZE = 500
+# An offset window seeks from a sampled key at most this many rows back
+# (see sample_sort_keys).
+WINDOW_SAMPLE_STEP = 1000
+# Ids bound per "id IN (...)" statement in the batch operations, well under
+# SQLite's limit on host parameters.
+ID_CHUNK_SIZE = 500
 
-def create_connection():
+SEARCH_RESULT_LIMIT = 200
+SEARCH_CANDIDATE_LIMIT = 5000
+CHANGE_LOG_MAX_DELTA = 500
+CHANGE_LOG_RETENTION = 10000
+# Writes that hit another connection's lock are retried for this long, with
+# sleeps growing from WRITE_RETRY_BASE_S up to WRITE_RETRY_MAX_S.
+WRITE_RETRY_DEADLINE_S = 5.0
+WRITE_RETRY_BASE_S = 0.002
+WRITE_RETRY_MAX_S = 0.1
+# SQLITE_BUSY and SQLITE_LOCKED; extended codes keep these in the low byte.
+BUSY_ERROR_CODES = (5, 6)
+
+# Timed while instrumentation is on (see instrumentation.register_module):
+# the lookups that return reservation rows, and the rest of the query and
+# write API. get_reservations_window is only timed: its rows are counted
+# by get_sorted_reservations_window.
+INSTRUMENTED_ROW_QUERIES = (
+    "get_all_reservations", "get_reservations_page", "get_sorted_reservations_page",
+    "get_sorted_reservations_window", "iter_reservations", "stream_reservations", "get_reservation_by_id",
+    "get_reservations_by_ids", "find_reservations_by_flight", "find_reservations_by_date",
+    "find_reservations_by_name", "search_reservations", "get_changes_since",
+)
+INSTRUMENTED_CALLS = (
+    "run_write", "get_reservations_window", "add_reservation", "update_reservation", "delete_reservation",
+    "delete_reservations", "count_reservations", "is_seat_taken", "sample_sort_keys", "get_change_version", "prune_change_log",
+)
+
+RESERVATION_COLUMNS = ("id", "name", "flight_number", "departure", "destination", "date", "seat_number")
+
+# Goes through the reservations view's INSTEAD OF trigger; fine for bulk
+# loads, but cursor.lastrowid is not set, so use insert_booking for one row.
+INSERT_RESERVATION_SQL = ''' INSERT INTO reservations(name, flight_number, departure, destination, date, seat_number)
+              VALUES(?,?,?,?,?,?) '''
+
+INSERT_BOOKING_SQL = ''' INSERT INTO bookings(passenger_id, flight_id, departure_id, destination_id, day, seat)
+              VALUES(?,?,?,?,?,?) '''
+
+# Bookings store dates as day numbers (datetime.date.toordinal); SQLite's
+# julianday() of the same date is larger by this much.
+JULIAN_DAY_OFFSET = 1721424.5
+
+# Seat text of bookings.seat: packed seats (validation.seat_code) are
+# written back as 12C, values below zero point at unparsed_seats.
+SEAT_TEXT = (f"CASE WHEN b.seat > 0 THEN (b.seat >> {SEAT_LETTER_BITS}) || char(65 + (b.seat & {SEAT_LETTER_MASK})) "
+             "ELSE (SELECT seat_number FROM unparsed_seats WHERE id = -b.seat) END")
+
+# Reservation rows in the old column order, built from the normalized tables.
+# Days below zero point at unparsed_dates: text kept from older databases
+# that is not a YYYY-MM-DD date.
+RESERVATION_FIELDS = ("b.id, p.name, f.flight_number, dep.name, dst.name, "
+                      f"CASE WHEN b.day > 0 THEN date(b.day + {JULIAN_DAY_OFFSET}) "
+                      f"ELSE (SELECT date FROM unparsed_dates WHERE id = -b.day) END, {SEAT_TEXT}")
+
+# FROM clauses by outer table. CROSS JOIN keeps SQLite from reordering the
+# loop, so an ORDER BY on the outer table's unique column followed by a
+# bookings index walks both indexes in order without a sort step.
+RESERVATION_JOINS = {
+    "bookings": "bookings b JOIN passengers p ON p.id = b.passenger_id JOIN flights f ON f.id = b.flight_id",
+    "passengers": "passengers p CROSS JOIN bookings b ON b.passenger_id = p.id JOIN flights f ON f.id = b.flight_id",
+    "flights": "flights f CROSS JOIN bookings b ON b.flight_id = f.id JOIN passengers p ON p.id = b.passenger_id",
+}
+
+def reservation_select(outer="bookings", fields=RESERVATION_FIELDS):
+    return (f"SELECT {fields} FROM {RESERVATION_JOINS[outer]} "
+            "JOIN airports dep ON dep.id = b.departure_id JOIN airports dst ON dst.id = b.destination_id")
+
+RESERVATION_SELECT = reservation_select()
+
+class DatabaseConfig:
+    JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+    SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+    TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+
+    # WAL lets readers keep going while a booking is being written, and with
+    # WAL synchronous=NORMAL only fsyncs at checkpoints instead of per commit.
+    # read_only connections refuse writes (PRAGMA query_only).
+    def __init__(self, path=None, journal_mode="WAL", synchronous="NORMAL", cache_size_kib=16384,
+                 mmap_size=64 * 1024 * 1024, temp_store="MEMORY", busy_timeout_ms=5000, read_only=False):
+        if journal_mode.upper() not in self.JOURNAL_MODES:
+            raise ValueError(f"Unknown journal_mode: {journal_mode}")
+        if synchronous.upper() not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"Unknown synchronous mode: {synchronous}")
+        if temp_store.upper() not in self.TEMP_STORES:
+            raise ValueError(f"Unknown temp_store: {temp_store}")
+        self.path = path
+        self.journal_mode = journal_mode.upper()
+        self.synchronous = synchronous.upper()
+        self.cache_size_kib = int(cache_size_kib)
+        self.mmap_size = int(mmap_size)
+        self.temp_store = temp_store.upper()
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self.read_only = bool(read_only)
+
+    def database_path(self):
+        return self.path or DATABASE_NAME
+
+    def for_reading(self):
+        config = copy.copy(self)
+        config.read_only = True
+        return config
+
+    def __repr__(self):
+        return (f"DatabaseConfig(path={self.database_path()!r}, journal_mode={self.journal_mode!r}, "
+                f"synchronous={self.synchronous!r}, cache_size_kib={self.cache_size_kib}, "
+                f"mmap_size={self.mmap_size}, temp_store={self.temp_store!r}, "
+                f"busy_timeout_ms={self.busy_timeout_ms}, read_only={self.read_only})")
+
+DEFAULT_CONFIG = DatabaseConfig()
+
+def apply_pragmas(conn, config):
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {config.busy_timeout_ms}")
+    cursor.execute(f"PRAGMA journal_mode = {config.journal_mode}")
+    cursor.execute(f"PRAGMA synchronous = {config.synchronous}")
+    # A negative cache_size is read by SQLite as KiB rather than pages.
+    cursor.execute(f"PRAGMA cache_size = {-config.cache_size_kib}")
+    cursor.execute(f"PRAGMA mmap_size = {config.mmap_size}")
+    cursor.execute(f"PRAGMA temp_store = {config.temp_store}")
+    if config.read_only:
+        cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
+def create_connection(config=None, check_same_thread=True):
+    config = config or DEFAULT_CONFIG
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
+        conn = sqlite3.connect(config.database_path(), timeout=config.busy_timeout_ms / 1000,
+                               check_same_thread=check_same_thread)
+        apply_pragmas(conn, config)
         return conn
     except Error as e:
         print(f"Error connecting to database: {e}")
     return conn
 
-def create_table(conn):
+def connection_is_usable(conn):
+    # Cheap health check: reads the schema cookie from the file header, which
+    # fails on a closed handle, a corrupt or unreadable file, or a lock that
+    # outlasts busy_timeout. A transaction left open is rolled back first.
     try:
-        sql_create_reservations_table = """
-        CREATE TABLE IF NOT EXISTS reservations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            flight_number TEXT NOT NULL,
-            departure TEXT NOT NULL,
-            destination TEXT NOT NULL,
-            date TEXT NOT NULL,
-            seat_number TEXT NOT NULL
-        );
-        """
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute("PRAGMA schema_version").fetchone()
+        return True
+    except Error as e:
+        print(f"Database connection check failed: {e}")
+        return False
+
+def is_busy_error(error):
+    # True for the transient "database is locked" errors caused by another
+    # connection holding the write lock, which are worth retrying; constraint
+    # violations, a full disk or a corrupt file are not.
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in BUSY_ERROR_CODES
+    message = str(error)
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+def backoff_delays(deadline_s=WRITE_RETRY_DEADLINE_S, base_s=WRITE_RETRY_BASE_S, max_s=WRITE_RETRY_MAX_S):
+    # Sleeps before each retry: exponential backoff with full jitter (a random
+    # time up to base_s * 2**attempt), so writers that collided do not all
+    # wake up at the same moment again. Ends when the deadline would pass.
+    deadline = time.monotonic() + deadline_s
+    attempt = 0
+    while True:
+        delay = random.uniform(0, min(max_s, base_s * 2 ** attempt))
+        if time.monotonic() + delay > deadline:
+            return
+        yield delay
+        attempt += 1
+
+def run_write(conn, write, *args, deadline_s=WRITE_RETRY_DEADLINE_S):
+    # Runs write(cursor, *args) in one BEGIN IMMEDIATE transaction, commits and
+    # returns its result. IMMEDIATE takes the write lock up front, where
+    # busy_timeout applies; a deferred transaction that reads first fails at
+    # once in WAL mode if another connection committed in the meantime. A
+    # busy/locked error rolls back and retries the whole write until
+    # deadline_s; any other exception rolls back and is raised. A transaction
+    # the caller left open is the caller's to finish, so that is an error.
+    if conn.in_transaction:
+        raise sqlite3.ProgrammingError("run_write called inside an open transaction")
+    delays = backoff_delays(deadline_s)
+    while True:
         cursor = conn.cursor()
-        cursor.execute(sql_create_reservations_table)
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            result = write(cursor, *args)
+            conn.commit()
+            return result
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.rollback()
+            if not isinstance(e, Error) or not is_busy_error(e):
+                raise
+            delay = next(delays, None)
+            if delay is None:
+                instrumentation.count("write_busy_failures")
+                raise
+            instrumentation.count("write_retries")
+            time.sleep(delay)
+
+def get_connection_settings(conn):
+    synchronous_names = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+    temp_store_names = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+    cursor = conn.cursor()
+    settings = {}
+    try:
+        for pragma in ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout",
+                       "query_only"):
+            cursor.execute(f"PRAGMA {pragma}")
+            row = cursor.fetchone()
+            settings[pragma] = row[0] if row else None
+    except Error as e:
+        print(f"Error reading connection settings: {e}")
+    settings["synchronous"] = synchronous_names.get(settings.get("synchronous"), settings.get("synchronous"))
+    settings["temp_store"] = temp_store_names.get(settings.get("temp_store"), settings.get("temp_store"))
+    return settings
+
+def create_table(conn):
+    # Creates a new database or upgrades an old one to SCHEMA_VERSION.
+    import migrations
+    return migrations.migrate(conn)
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def set_schema_version(conn, version):
+    try:
+        conn.execute(f"PRAGMA user_version = {int(version)}")
         conn.commit()
     except Error as e:
-        print(f"Error creating table: {e}")
+        print(f"Error setting schema version: {e}")
 
-def add_reservation(conn, reservation_details):
-    sql = ''' INSERT INTO reservations(name, flight_number, departure, destination, date, seat_number)
-              VALUES(?,?,?,?,?,?) '''
+def get_change_version(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MAX(version) FROM reservation_changes")
+        return cursor.fetchone()[0] or 0
+    except Error as e:
+        print(f"Error reading change version: {e}")
+        return 0
+
+def get_changes_since(conn, version, max_changes=CHANGE_LOG_MAX_DELTA):
+    # Returns (latest_version, {reservation_id: current row or None if it was
+    # deleted}), collapsing repeated changes to the same row. Returns None when
+    # the caller should reload instead: too many changes, or the log has been
+    # pruned past `version`.
     cursor = conn.cursor()
     try:
-        cursor.execute(sql, reservation_details)
+        cursor.execute("SELECT MIN(version) FROM reservation_changes")
+        oldest = cursor.fetchone()[0]
+        if oldest is not None and oldest > version + 1:
+            return None
+        # Joined table by table: a LEFT JOIN on the reservations view would
+        # materialize the whole view first.
+        cursor.execute(f"""
+        SELECT c.version, c.reservation_id, {RESERVATION_FIELDS}
+        FROM reservation_changes c
+        LEFT JOIN bookings b ON b.id = c.reservation_id
+        LEFT JOIN passengers p ON p.id = b.passenger_id
+        LEFT JOIN flights f ON f.id = b.flight_id
+        LEFT JOIN airports dep ON dep.id = b.departure_id
+        LEFT JOIN airports dst ON dst.id = b.destination_id
+        WHERE c.version > ?
+        ORDER BY c.version
+        LIMIT ?
+        """, (version, max_changes + 1))
+        rows = cursor.fetchall()
+        if len(rows) > max_changes:
+            return None
+        changes = {}
+        latest = version
+        for row in rows:
+            latest = row[0]
+            changes[row[1]] = row[2:] if row[2] is not None else None
+        return latest, changes
+    except Error as e:
+        print(f"Error fetching reservation changes: {e}")
+        return None
+
+def prune_change_log(conn, keep=CHANGE_LOG_RETENTION):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM reservation_changes WHERE version <= (SELECT MAX(version) FROM reservation_changes) - ?",
+                       (keep,))
         conn.commit()
-        return cursor.lastrowid
+        return cursor.rowcount
+    except Error as e:
+        print(f"Error pruning change log: {e}")
+        return 0
+
+def has_search_index(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='reservations_fts'")
+    return cursor.fetchone() is not None
+
+def has_search_trigger(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='bookings_fts_insert'")
+    return cursor.fetchone() is not None
+
+def build_search_query(text):
+    # Every word must match (implicit AND) and is treated as a prefix, so
+    # "jo cai" finds "John Smith, Cairo". Quoting each term keeps user input
+    # from being parsed as FTS5 syntax.
+    terms = re.findall(r"\w+", text, re.UNICODE)
+    return " ".join(f'"{term}"*' for term in terms)
+
+def search_reservations(conn, text, limit=SEARCH_RESULT_LIMIT):
+    query = build_search_query(text)
+    if not query:
+        return []
+    cursor = conn.cursor()
+    try:
+        if has_search_index(conn):
+            # bm25 weights: a hit on the passenger name or flight number ranks
+            # above a hit on the city names. Only the newest matches are scored
+            # so a very common prefix ("ca" for Cairo) costs the same on a
+            # million rows as on a thousand.
+            cursor.execute("""
+            SELECT r.* FROM (
+                SELECT rowid, bm25(reservations_fts, 10.0, 8.0, 2.0, 2.0) AS score
+                FROM reservations_fts
+                WHERE reservations_fts MATCH ?
+                ORDER BY rowid DESC LIMIT ?
+            ) AS matches
+            JOIN reservations r ON r.id = matches.rowid
+            ORDER BY matches.score, matches.rowid DESC
+            LIMIT ?
+            """, (query, SEARCH_CANDIDATE_LIMIT, limit))
+        else:
+            pattern = f"%{text.strip()}%"
+            cursor.execute("""
+            SELECT * FROM reservations
+            WHERE name LIKE ? OR flight_number LIKE ? OR departure LIKE ? OR destination LIKE ?
+            ORDER BY id DESC LIMIT ?
+            """, (pattern, pattern, pattern, pattern, limit))
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error searching reservations: {e}")
+        return []
+
+def reference_id(cursor, table, column, value):
+    # Id of `value` in one of the lookup tables (passengers, flights,
+    # airports, unparsed_dates, unparsed_seats), adding it on first use.
+    cursor.execute(f"SELECT id FROM {table} WHERE {column} = ?", (value,))
+    row = cursor.fetchone()
+    if row is not None:
+        return row[0]
+    cursor.execute(f"INSERT INTO {table}({column}) VALUES (?)", (value,))
+    return cursor.lastrowid
+
+def stored_day(cursor, date, create=False):
+    # The bookings.day value for a date string: its day number, or minus the
+    # unparsed_dates id for other text. None if no booking can have it.
+    day = date_to_day(date)
+    if day is not None:
+        return day
+    if create:
+        return -reference_id(cursor, "unparsed_dates", "date", date)
+    cursor.execute("SELECT id FROM unparsed_dates WHERE date = ?", (date,))
+    row = cursor.fetchone()
+    return -row[0] if row else None
+
+def stored_seat(cursor, seat_number, create=False):
+    # The bookings.seat value for a seat string, like stored_day: its packed
+    # code, or minus the unparsed_seats id for text that is not a seat.
+    code = seat_code(seat_number)
+    if code is not None:
+        return code
+    if create:
+        return -reference_id(cursor, "unparsed_seats", "seat_number", seat_number)
+    cursor.execute("SELECT id FROM unparsed_seats WHERE seat_number = ?", (seat_number,))
+    row = cursor.fetchone()
+    return -row[0] if row else None
+
+def booking_values(cursor, reservation_details):
+    name, flight_number, departure, destination, date, seat_number = reservation_details
+    return (reference_id(cursor, "passengers", "name", name),
+            reference_id(cursor, "flights", "flight_number", flight_number),
+            reference_id(cursor, "airports", "name", departure),
+            reference_id(cursor, "airports", "name", destination),
+            stored_day(cursor, date, create=True),
+            stored_seat(cursor, seat_number, create=True))
+
+def insert_booking(cursor, reservation_details):
+    cursor.execute(INSERT_BOOKING_SQL, booking_values(cursor, reservation_details))
+    return cursor.lastrowid
+
+def update_booking(cursor, reservation_id, reservation_details):
+    cursor.execute("UPDATE bookings SET passenger_id=?, flight_id=?, departure_id=?, destination_id=?, day=?, "
+                   "seat=? WHERE id=?", booking_values(cursor, reservation_details) + (reservation_id,))
+    return cursor.rowcount
+
+def delete_booking(cursor, reservation_id):
+    cursor.execute("DELETE FROM bookings WHERE id=?", (reservation_id,))
+    return cursor.rowcount
+
+def delete_bookings(cursor, reservation_ids):
+    deleted = 0
+    for chunk, placeholders in id_chunks(reservation_ids):
+        cursor.execute(f"DELETE FROM bookings WHERE id IN ({placeholders})", chunk)
+        deleted += cursor.rowcount
+    return deleted
+
+def add_reservation(conn, reservation_details):
+    try:
+        return run_write(conn, insert_booking, reservation_details)
     except Error as e:
         print(f"Error adding reservation: {e}")
         return None
@@ -54,6 +442,193 @@ def get_all_reservations(conn):
         print(f"Error fetching reservations: {e}")
         return []
 
+def get_reservations_page(conn, page_size=DEFAULT_PAGE_SIZE, cursor=None):
+    # Keyset ("seek") pagination: the cursor is the id of the last row of the
+    # previous page, so every page is an index range scan on the primary key
+    # no matter how deep into the table it is.
+    cursor_obj = conn.cursor()
+    try:
+        if cursor is None:
+            cursor_obj.execute("SELECT * FROM reservations ORDER BY id DESC LIMIT ?", (page_size + 1,))
+        else:
+            cursor_obj.execute("SELECT * FROM reservations WHERE id < ? ORDER BY id DESC LIMIT ?",
+                               (cursor, page_size + 1))
+        rows = cursor_obj.fetchall()
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = rows[-1][0]
+        return rows, next_cursor
+    except Error as e:
+        print(f"Error fetching reservations page: {e}")
+        return [], None
+
+# Columns the reservations list can be ordered by in SQL: the table that
+# drives the join and the ORDER BY keys (row column, SQL expression) that
+# match its indexes exactly, so no sort step is needed. The last key makes
+# the order total, which keyset paging relies on.
+SORT_KEYS = {
+    "id": ("bookings", (("id", "b.id"),)),
+    "name": ("passengers", (("name", "p.name"), ("id", "b.id"))),
+    "flight_number": ("flights", (("flight_number", "f.flight_number"), ("date", "b.day"),
+                                  ("seat_number", "b.seat"))),
+    "date": ("bookings", (("date", "b.day"), ("id", "b.id"))),
+}
+
+# Just the tables the sort keys come from, for walking a whole order.
+SORT_KEY_JOINS = {
+    "bookings": "bookings b",
+    "passengers": "passengers p CROSS JOIN bookings b ON b.passenger_id = p.id",
+    "flights": "flights f CROSS JOIN bookings b ON b.flight_id = f.id",
+}
+
+def sort_key_values(cursor, sort_column, row):
+    # The stored values of a reservation row's sort keys, for seeking past it.
+    values = []
+    for column, _ in SORT_KEYS[sort_column][1]:
+        value = row[RESERVATION_COLUMNS.index(column)]
+        if column == "date":
+            value = stored_day(cursor, value) or 0
+        elif column == "seat_number":
+            value = stored_seat(cursor, value) or 0
+        values.append(value)
+    return values
+
+def sorted_reservations_sql(sort_column, descending, after_keys):
+    outer, keys = SORT_KEYS[sort_column]
+    direction = " DESC" if descending else ""
+    order_by = ", ".join(expression + direction for _, expression in keys)
+    select = reservation_select(outer)
+    if after_keys is None:
+        return f"{select} ORDER BY {order_by}", []
+    expressions = ", ".join(expression for _, expression in keys)
+    where = f"({expressions}) {'<' if descending else '>'} ({', '.join('?' * len(keys))})"
+    return f"{select} WHERE {where} ORDER BY {order_by}", list(after_keys)
+
+def get_sorted_reservations_page(conn, sort_column, descending=False, page_size=DEFAULT_PAGE_SIZE, after_row=None):
+    # Keyset page in sort_column order: after_row is the last row already
+    # shown, so deep pages are still an index range scan.
+    cursor = conn.cursor()
+    try:
+        after_keys = sort_key_values(cursor, sort_column, after_row) if after_row is not None else None
+        sql, params = sorted_reservations_sql(sort_column, descending, after_keys)
+        cursor.execute(sql + " LIMIT ?", params + [page_size])
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error fetching sorted reservations: {e}")
+        return []
+
+def sample_sort_keys(conn, sort_column, descending=False, step=WINDOW_SAMPLE_STEP):
+    # Sort key values of every step-th row in sort_column order (rows step,
+    # 2 * step, ...): seek points for get_sorted_reservations_window. One walk
+    # over the covering index: 1 to 1.5 s per million bookings.
+    outer, keys = SORT_KEYS[sort_column]
+    direction = " DESC" if descending else ""
+    order_by = ", ".join(expression + direction for _, expression in keys)
+    names = [f"k{index}" for index in range(len(keys))]
+    columns = ", ".join(f"{expression} AS {name}" for (_, expression), name in zip(keys, names))
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join(names)} FROM (SELECT {columns}, row_number() OVER (ORDER BY {order_by}) "
+                       f"AS position FROM {SORT_KEY_JOINS[outer]}) WHERE position % ? = 0", (step,))
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error sampling sort keys: {e}")
+        return []
+
+def get_sorted_reservations_window(conn, sort_column, descending=False, offset=0, limit=DEFAULT_PAGE_SIZE,
+                                   samples=(), step=WINDOW_SAMPLE_STEP):
+    # Rows offset .. offset + limit in sort_column order, for a scrollbar
+    # jump. Seeks past the nearest sample at or before offset (see
+    # sample_sort_keys) and only skips the rest, so the cost does not grow
+    # with the offset. Samples taken before later writes still work; the
+    # window is then off by about as many rows as were added or removed.
+    cursor = conn.cursor()
+    try:
+        index = min(offset // step, len(samples))
+        sql, params = sorted_reservations_sql(sort_column, descending, samples[index - 1] if index else None)
+        cursor.execute(sql + " LIMIT ? OFFSET ?", params + [limit, offset - index * step])
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error fetching sorted reservations: {e}")
+        return []
+
+def get_reservations_window(conn, offset, limit, samples=()):
+    # Newest first, like get_reservations_page; samples from
+    # sample_sort_keys(conn, "id", True).
+    return get_sorted_reservations_window(conn, "id", True, offset, limit, samples)
+
+def iter_reservations(conn, batch_size=DEFAULT_BATCH_SIZE):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT * FROM reservations ORDER BY id DESC")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    except Error as e:
+        print(f"Error streaming reservations: {e}")
+    finally:
+        cursor.close()
+
+def date_range_days(date_from=None, date_to=None):
+    # (first day, last day or None) for optional YYYY-MM-DD bounds; raises
+    # ValueError for anything else.
+    days = (date_to_day(date_from) if date_from else 1, date_to_day(date_to) if date_to else None)
+    if days[0] is None or (date_to and days[1] is None):
+        raise ValueError(f"invalid date range {date_from!r} - {date_to!r}, expected YYYY-MM-DD")
+    return days
+
+def stream_reservations(conn, date_from=None, date_to=None, flight_number=None, batch_size=DEFAULT_BATCH_SIZE):
+    # Rows come back in the order of the index that serves the filters, so
+    # SQLite never has to sort (and buffer) the result before the first row.
+    # Date bounds must be YYYY-MM-DD (ValueError otherwise); a range never
+    # includes unparsed dates. Unlike the lookups above, errors are raised
+    # rather than printed: a stream that silently stopped part way would
+    # look like a complete result to the caller.
+    conditions = []
+    params = []
+    if flight_number:
+        conditions.append("f.flight_number = ?")
+        params.append(flight_number)
+    if date_from or date_to:
+        days = date_range_days(date_from, date_to)
+        conditions.append("b.day >= ?")
+        params.append(days[0])
+        if date_to:
+            conditions.append("b.day <= ?")
+            params.append(days[1])
+
+    if flight_number:
+        order_by = "b.day, b.seat"
+    elif date_from or date_to:
+        order_by = "b.day, b.id"
+    else:
+        order_by = "b.id"
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"{RESERVATION_SELECT}{where} ORDER BY {order_by}"
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+def count_reservations(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM bookings")
+        return cursor.fetchone()[0]
+    except Error as e:
+        print(f"Error counting reservations: {e}")
+        return 0
+
 def get_reservation_by_id(conn, reservation_id):
     cursor = conn.cursor()
     try:
@@ -64,44 +639,138 @@ def get_reservation_by_id(conn, reservation_id):
         print(f"Error fetching reservation by ID: {e}")
         return None
 
+def id_chunks(reservation_ids):
+    reservation_ids = list(reservation_ids)
+    for start in range(0, len(reservation_ids), ID_CHUNK_SIZE):
+        chunk = reservation_ids[start:start + ID_CHUNK_SIZE]
+        yield chunk, ", ".join("?" * len(chunk))
+
+def get_reservations_by_ids(conn, reservation_ids):
+    # Rows for the given ids (missing ones are left out), in id order.
+    cursor = conn.cursor()
+    rows = []
+    try:
+        for chunk, placeholders in id_chunks(reservation_ids):
+            cursor.execute(f"{RESERVATION_SELECT} WHERE b.id IN ({placeholders})", chunk)
+            rows.extend(cursor.fetchall())
+        rows.sort()
+        return rows
+    except Error as e:
+        print(f"Error fetching reservations by ID: {e}")
+        return []
+
+def find_reservations_by_flight(conn, flight_number, date):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"{RESERVATION_SELECT} WHERE f.flight_number=? AND b.day=? ORDER BY b.seat",
+                       (flight_number, stored_day(cursor, date)))
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error fetching reservations by flight: {e}")
+        return []
+
+def find_reservations_by_date(conn, date):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"{RESERVATION_SELECT} WHERE b.day=? ORDER BY b.id DESC", (stored_day(cursor, date),))
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error fetching reservations by date: {e}")
+        return []
+
+def find_reservations_by_name(conn, name):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"{RESERVATION_SELECT} WHERE p.name=? ORDER BY b.id DESC", (name,))
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error fetching reservations by name: {e}")
+        return []
+
+def find_seat_holder(cursor, flight_number, date, seat_number):
+    # Id of the booking holding the seat, or None; one probe of the unique
+    # (flight_id, day, seat) index.
+    cursor.execute("SELECT b.id FROM flights f JOIN bookings b ON b.flight_id = f.id "
+                   "WHERE f.flight_number=? AND b.day=? AND b.seat=?",
+                   (flight_number, stored_day(cursor, date), stored_seat(cursor, seat_number)))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def get_booked_seats(cursor, flight_number, date):
+    cursor.execute(f"SELECT {SEAT_TEXT} FROM flights f JOIN bookings b ON b.flight_id = f.id "
+                   "WHERE f.flight_number=? AND b.day=?", (flight_number, stored_day(cursor, date)))
+    return [seat_number for (seat_number,) in cursor.fetchall()]
+
+def is_seat_taken(conn, flight_number, date, seat_number, exclude_id=None):
+    cursor = conn.cursor()
+    try:
+        holder = find_seat_holder(cursor, flight_number, date, seat_number)
+        return holder is not None and holder != exclude_id
+    except Error as e:
+        print(f"Error checking seat availability: {e}")
+        return False
+
 def update_reservation(conn, reservation_id, updated_details):
-    sql = ''' UPDATE reservations
-              SET name = ? ,
-                  flight_number = ? ,
-                  departure = ? ,
-                  destination = ? ,
-                  date = ? ,
-                  seat_number = ?
-              WHERE id = ?'''
-    cursor = conn.cursor()
-    try:
-        data_to_update = updated_details + (reservation_id,)
-        cursor.execute(sql, data_to_update)
-        conn.commit()
+    try:
+        run_write(conn, update_booking, reservation_id, updated_details)
         return True
     except Error as e:
         print(f"Error updating reservation: {e}")
         return False
 
 def delete_reservation(conn, reservation_id):
-    sql = 'DELETE FROM reservations WHERE id=?'
-    cursor = conn.cursor()
     try:
-        cursor.execute(sql, (reservation_id,))
-        conn.commit()
+        run_write(conn, delete_booking, reservation_id)
         return True
     except Error as e:
         print(f"Error deleting reservation: {e}")
         return False
 
-def initialize_database():
-    conn = create_connection()
+def move_bookings(cursor, reservation_ids, flight_number=None, date=None):
+    # Puts every given booking on another flight and/or date in place, keeping
+    # its seat; the unique seat index rejects the move if a seat is taken.
+    flight_id = reference_id(cursor, "flights", "flight_number", flight_number) if flight_number else None
+    day = stored_day(cursor, date, create=True) if date else None
+    moved = 0
+    for chunk, placeholders in id_chunks(reservation_ids):
+        cursor.execute(f"UPDATE bookings SET flight_id=COALESCE(?, flight_id), day=COALESCE(?, day) "
+                       f"WHERE id IN ({placeholders})", [flight_id, day] + chunk)
+        moved += cursor.rowcount
+    return moved
+
+def delete_reservations(conn, reservation_ids):
+    # Deletes all the given reservations in one transaction: either every
+    # row goes or none does. Returns how many existed, or None on error.
+    try:
+        return run_write(conn, delete_bookings, reservation_ids)
+    except Error as e:
+        print(f"Error deleting reservations: {e}")
+        return None
+
+def initialize_database(config=None):
+    # Startup path: a database already at SCHEMA_VERSION is only pruned, not
+    # re-checked table by table; older ones are migrated first.
+    conn = create_connection(config)
     if conn is not None:
-        create_table(conn)
+        if get_schema_version(conn) < SCHEMA_VERSION:
+            create_table(conn)
+        elif has_search_index(conn) and not has_search_trigger(conn):
+            # A bulk import stopped while search indexing was paused.
+            import migrations
+            run_write(conn, migrations.resume_search_indexing)
+        prune_change_log(conn)
         conn.close()
     else:
         print("Error! Cannot create the database connection.")
 
 if __name__ == '__main__':
-    initialize_database()
-    print(f"Database '{DATABASE_NAME}' initialized.")
+    import sys
+    if "--settings" in sys.argv:
+        conn = create_connection()
+        if conn is not None:
+            for name, value in get_connection_settings(conn).items():
+                print(f"{name} = {value}")
+            conn.close()
+    else:
+        initialize_database()
+        print(f"Database '{DATABASE_NAME}' initialized.")
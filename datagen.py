@@ -0,0 +1,110 @@
+# datagen.py
+import argparse
+import math
+import random
+import sys
+from datetime import date, timedelta
+import database
+
+FIRST_NAMES = ("Alice", "Bruno", "Chiara", "David", "Elena", "Farid", "Giulia", "Hiro", "Ines", "Jonas",
+               "Kemal", "Laura", "Marco", "Nadia", "Omar", "Paula", "Quentin", "Rosa", "Sven", "Tariq",
+               "Ursula", "Victor", "Wen", "Ximena", "Yusuf", "Zoe")
+LAST_NAMES = ("Rossi", "Smith", "Garcia", "Müller", "Dubois", "Kowalski", "Nakamura", "Silva", "Jensen",
+              "Novak", "Okafor", "Larsen", "Bianchi", "Haddad", "Moreau", "Chen", "Andersen", "Costa",
+              "Yilmaz", "Fischer", "Ricci", "Papadopoulos", "Ivanova", "O'Brien")
+CITIES = ("Rome", "Milan", "London", "Paris", "Madrid", "Berlin", "Amsterdam", "Vienna", "Zurich", "Lisbon",
+          "Athens", "Dublin", "Oslo", "Stockholm", "Copenhagen", "Warsaw", "Prague", "Istanbul", "New York",
+          "Toronto", "Dubai", "Tokyo", "Singapore", "Cairo")
+AIRLINES = ("AZ", "BA", "AF", "IB", "LH", "KL", "OS", "LX", "TP", "A3", "EI", "SK", "LO", "TK")
+
+FLIGHT_COUNT = 500
+DAY_COUNT = 730
+SEAT_ROWS = 30
+SEAT_LETTERS = "ABCDEF"
+START_DATE = date(2025, 1, 1)
+DEFAULT_SEED = 42
+
+class ReservationGenerator:
+    # Deterministic synthetic bookings. Every row gets a distinct
+    # (flight, date, seat) slot: row i maps to slot (i * stride) mod capacity
+    # with a stride coprime to the capacity, which spreads rows over all
+    # flights and dates without having to remember the slots already used.
+    def __init__(self, seed=DEFAULT_SEED):
+        self.seed = seed
+        rng = random.Random(seed)
+        self.flights = []
+        used_numbers = set()
+        while len(self.flights) < FLIGHT_COUNT:
+            number = f"{rng.choice(AIRLINES)}{rng.randint(100, 9999)}"
+            if number in used_numbers:
+                continue
+            used_numbers.add(number)
+            departure, destination = rng.sample(CITIES, 2)
+            self.flights.append((number, departure, destination))
+        self.dates = [(START_DATE + timedelta(days=day)).isoformat() for day in range(DAY_COUNT)]
+        self.seats = [f"{row}{letter}" for row in range(1, SEAT_ROWS + 1) for letter in SEAT_LETTERS]
+        self.capacity = FLIGHT_COUNT * DAY_COUNT * len(self.seats)
+        self.stride = self.pick_stride(rng)
+
+    def pick_stride(self, rng):
+        while True:
+            stride = rng.randrange(self.capacity // 3, self.capacity // 2)
+            if math.gcd(stride, self.capacity) == 1:
+                return stride
+
+    def reservation(self, index):
+        if index >= self.capacity:
+            raise ValueError(f"Only {self.capacity} distinct seats are available.")
+        slot = index * self.stride % self.capacity
+        slot, seat = divmod(slot, len(self.seats))
+        flight, day = divmod(slot, DAY_COUNT)
+        number, departure, destination = self.flights[flight]
+        # Names depend only on the row index so any row can be regenerated alone.
+        rng = random.Random(self.seed * 1000003 + index)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        return (name, number, departure, destination, self.dates[day], self.seats[seat])
+
+    def reservations(self, count, start=0):
+        for index in range(start, start + count):
+            yield self.reservation(index)
+
+def seed_database(conn, count, seed=DEFAULT_SEED, chunk_size=database.DEFAULT_BATCH_SIZE * 10,
+                  progress_callback=None):
+    generator = ReservationGenerator(seed)
+    cursor = conn.cursor()
+    inserted = 0
+    while inserted < count:
+        size = min(chunk_size, count - inserted)
+        with conn:
+            cursor.executemany(database.INSERT_RESERVATION_SQL, generator.reservations(size, inserted))
+        inserted += size
+        if progress_callback:
+            progress_callback(inserted)
+    return generator
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill a database with deterministic synthetic reservations.")
+    parser.add_argument("database", help="Database file to create or extend")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of reservations (default: 10000)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"Random seed (default: {DEFAULT_SEED})")
+    args = parser.parse_args(argv)
+
+    conn = database.create_connection(database.DatabaseConfig(path=args.database))
+    if conn is None:
+        print("Error! Cannot create the database connection.")
+        return 2
+    try:
+        database.create_table(conn)
+        existing = database.count_reservations(conn)
+        if existing:
+            print(f"{args.database} already has {existing} reservations; not seeding again.")
+            return 1
+        seed_database(conn, args.rows, args.seed,
+                      progress_callback=lambda done: print(f"  {done} rows", end="\r", flush=True))
+        print(f"\nSeeded {args.rows} reservations into {args.database}.")
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# diagnostics.py
+import time
+import tkinter as tk
+from tkinter import ttk
+import instrumentation
+
+REFRESH_INTERVAL_MS = 1000
+
+class DiagnosticsPage(tk.Frame):
+    # Hidden page (Ctrl+Shift+D in the main window) showing the live numbers
+    # collected by instrumentation.py. It only reads the recorder, so keeping
+    # it open does not add database work of its own.
+    def __init__(self, master, show_home_page_callback):
+        super().__init__(master)
+        self.master = master
+        self.show_home_page = show_home_page_callback
+        self.refresh_after_id = None
+
+        self.configure(bg="#f0f0f0")
+
+        title_label = ttk.Label(
+            self,
+            text="Performance Diagnostics",
+            font=("Arial", 20, "bold"),
+            background="#f0f0f0",
+            foreground="#333333"
+        )
+        title_label.pack(pady=(20, 10))
+
+        controls_frame = ttk.Frame(self, style="TFrame")
+        controls_frame.pack(fill=tk.X, padx=30)
+
+        self.enabled_var = tk.BooleanVar(value=instrumentation.is_enabled())
+        enabled_check = ttk.Checkbutton(
+            controls_frame,
+            text="Collect timings",
+            variable=self.enabled_var,
+            command=self.toggle_instrumentation
+        )
+        enabled_check.pack(side=tk.LEFT)
+
+        threshold_label = ttk.Label(controls_frame, text="Slow call threshold (ms):", background="#f0f0f0")
+        threshold_label.pack(side=tk.LEFT, padx=(20, 5))
+
+        self.threshold_var = tk.StringVar(value=f"{instrumentation.recorder.slow_threshold_ms:g}")
+        threshold_spinbox = ttk.Spinbox(controls_frame, from_=1, to=10000, increment=10, width=7,
+                                        textvariable=self.threshold_var, command=self.apply_threshold)
+        threshold_spinbox.pack(side=tk.LEFT)
+        threshold_spinbox.bind("<Return>", lambda event: self.apply_threshold())
+        threshold_spinbox.bind("<FocusOut>", lambda event: self.apply_threshold())
+
+        reset_button = ttk.Button(controls_frame, text="Reset", command=self.reset_stats)
+        reset_button.pack(side=tk.LEFT, padx=(20, 5))
+
+        timings_frame = ttk.Frame(self, padding="10")
+        timings_frame.pack(expand=True, fill=tk.BOTH, padx=20, pady=(5, 0))
+
+        columns = ("name", "count", "total_ms", "mean_ms", "p95_ms", "max_ms")
+        self.timings_tree = ttk.Treeview(timings_frame, columns=columns, show="headings", height=10)
+        self.timings_tree.heading("name", text="Operation")
+        self.timings_tree.heading("count", text="Calls")
+        self.timings_tree.heading("total_ms", text="Total ms")
+        self.timings_tree.heading("mean_ms", text="Mean ms")
+        self.timings_tree.heading("p95_ms", text="p95 ms")
+        self.timings_tree.heading("max_ms", text="Max ms")
+        self.timings_tree.column("name", width=260, minwidth=150)
+        for column in columns[1:]:
+            self.timings_tree.column(column, width=80, minwidth=60, anchor=tk.E)
+
+        timings_scrollbar = ttk.Scrollbar(timings_frame, orient="vertical", command=self.timings_tree.yview)
+        self.timings_tree.configure(yscrollcommand=timings_scrollbar.set)
+        timings_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.timings_tree.pack(expand=True, fill=tk.BOTH)
+
+        self.counters_label = ttk.Label(self, text="", font=("Arial", 10), background="#f0f0f0")
+        self.counters_label.pack(fill=tk.X, padx=30, pady=5)
+
+        slow_frame = ttk.Frame(self, padding="10")
+        slow_frame.pack(fill=tk.BOTH, padx=20)
+
+        slow_columns = ("time", "name", "elapsed_ms", "detail")
+        self.slow_tree = ttk.Treeview(slow_frame, columns=slow_columns, show="headings", height=6)
+        self.slow_tree.heading("time", text="Time")
+        self.slow_tree.heading("name", text="Slow call")
+        self.slow_tree.heading("elapsed_ms", text="ms")
+        self.slow_tree.heading("detail", text="Arguments")
+        self.slow_tree.column("time", width=70, minwidth=60, anchor=tk.CENTER)
+        self.slow_tree.column("name", width=220, minwidth=150)
+        self.slow_tree.column("elapsed_ms", width=70, minwidth=60, anchor=tk.E)
+        self.slow_tree.column("detail", width=260, minwidth=100)
+
+        slow_scrollbar = ttk.Scrollbar(slow_frame, orient="vertical", command=self.slow_tree.yview)
+        self.slow_tree.configure(yscrollcommand=slow_scrollbar.set)
+        slow_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.slow_tree.pack(fill=tk.BOTH)
+
+        back_button = ttk.Button(self, text="Back to Home", command=self.show_home_page)
+        back_button.pack(pady=10)
+
+    def toggle_instrumentation(self):
+        if self.enabled_var.get():
+            self.apply_threshold()
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+        self.refresh()
+
+    def apply_threshold(self):
+        try:
+            threshold = float(self.threshold_var.get())
+        except ValueError:
+            threshold = 0
+        if threshold <= 0:
+            self.threshold_var.set(f"{instrumentation.recorder.slow_threshold_ms:g}")
+            return
+        instrumentation.recorder.slow_threshold_ms = threshold
+
+    def reset_stats(self):
+        instrumentation.recorder.reset()
+        self.refresh()
+
+    def refresh(self):
+        snapshot = instrumentation.recorder.snapshot()
+
+        timings = sorted(snapshot["timings"].items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        self.timings_tree.delete(*self.timings_tree.get_children())
+        for name, stats in timings:
+            self.timings_tree.insert("", tk.END, values=(
+                name, stats["count"], f"{stats['total_ms']:.1f}", f"{stats['mean_ms']:.2f}",
+                f"{stats['p95_ms']:.2f}", f"{stats['max_ms']:.2f}"))
+
+        counters = snapshot["counters"]
+        if counters:
+            text = "   ".join(f"{name.replace('_', ' ').capitalize()}: {value}" for name, value in sorted(counters.items()))
+        elif instrumentation.is_enabled():
+            text = "No activity recorded yet."
+        else:
+            text = "Instrumentation is off. Tick 'Collect timings' to start recording."
+        self.counters_label.config(text=text)
+
+        self.slow_tree.delete(*self.slow_tree.get_children())
+        for timestamp, name, elapsed_ms, detail in reversed(snapshot["slow_calls"]):
+            self.slow_tree.insert("", tk.END, values=(
+                time.strftime("%H:%M:%S", time.localtime(timestamp)), name, f"{elapsed_ms:.1f}", detail))
+
+    def schedule_refresh(self):
+        self.refresh()
+        self.refresh_after_id = self.after(REFRESH_INTERVAL_MS, self.schedule_refresh)
+
+    def on_show(self):
+        self.enabled_var.set(instrumentation.is_enabled())
+        self.threshold_var.set(f"{instrumentation.recorder.slow_threshold_ms:g}")
+        if self.refresh_after_id is None:
+            self.schedule_refresh()
+
+    def on_hide(self):
+        if self.refresh_after_id is not None:
+            self.after_cancel(self.refresh_after_id)
+            self.refresh_after_id = None
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Diagnostics Page Test")
+    root.geometry("800x600")
+
+    instrumentation.enable()
+    with instrumentation.timer("demo.operation"):
+        time.sleep(0.06)
+    instrumentation.count("rows_fetched", 100)
+
+    diagnostics_page_frame = DiagnosticsPage(root, lambda: print("Dummy: Show Home Page"))
+    diagnostics_page_frame.pack(fill="both", expand=True)
+    diagnostics_page_frame.on_show()
+
+    root.mainloop()
@@ -2,14 +2,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import database
+import seat_inventory
+import validation
+from data_access import DataAccess
+from workers import DatabaseExecutor, LoadingIndicator
 
 class EditReservationPage(tk.Frame):
-    def __init__(self, master, show_reservations_page_callback, db_connection):
+    def __init__(self, master, show_reservations_page_callback, data_access, executor):
         super().__init__(master)
         self.master = master
         self.show_reservations_page = show_reservations_page_callback
-        self.db_conn = db_connection
+        self.data_access = data_access
+        self.executor = executor
+        self.service = data_access.service
         self.current_reservation_id = None
+        self.current_booking = None
 
         self.configure(bg="#f0f0f0")
 
@@ -62,13 +69,13 @@ class EditReservationPage(tk.Frame):
                   background=[('active', '#e0e0e0'), ('!active', '#ffffff')],
                   foreground=[('active', '#000000'), ('!active', '#333333')])
 
-        update_button = ttk.Button(
+        self.update_button = ttk.Button(
             buttons_frame,
             text="Update Reservation",
             command=self.update_reservation_details,
             style="Edit.TButton"
         )
-        update_button.pack(side=tk.LEFT, padx=10)
+        self.update_button.pack(side=tk.LEFT, padx=10)
 
         cancel_button = ttk.Button(
             buttons_frame,
@@ -81,6 +88,8 @@ class EditReservationPage(tk.Frame):
         self.status_label = ttk.Label(self, text="", font=("Arial", 10), background="#f0f0f0")
         self.status_label.pack(pady=(0, 10))
 
+        self.loading_indicator = LoadingIndicator(self, anchor=self.status_label)
+
     def load_reservation_details(self, reservation_id):
         self.current_reservation_id = reservation_id
         self.clear_form(clear_status=False)
@@ -91,63 +100,98 @@ class EditReservationPage(tk.Frame):
             self.show_reservations_page()
             return
 
-        try:
-            reservation_data = database.get_reservation_by_id(self.db_conn, self.current_reservation_id)
-            if reservation_data:
-                self.entries["name_entry"].insert(0, reservation_data[1])
-                self.entries["flight_number_entry"].insert(0, reservation_data[2])
-                self.entries["departure_entry"].insert(0, reservation_data[3])
-                self.entries["destination_entry"].insert(0, reservation_data[4])
-                self.entries["date_entry"].insert(0, reservation_data[5])
-                self.entries["seat_number_entry"].insert(0, reservation_data[6])
-                self.status_label.config(text=f"Editing Reservation ID: {self.current_reservation_id}", foreground="blue")
-            else:
-                messagebox.showerror("Error", f"Reservation ID: {self.current_reservation_id} not found.", parent=self)
-                self.status_label.config(text=f"Error: Reservation ID {self.current_reservation_id} not found.", foreground="red")
-                self.show_reservations_page()
-        except Exception as e:
-            messagebox.showerror("Load Error", f"Failed to load reservation details: {e}", parent=self)
-            self.status_label.config(text=f"Error loading details: {e}", foreground="red")
-            print(f"Error loading reservation details: {e}")
+        self.executor.cancel(self)
+        self.update_button.config(state=tk.DISABLED)
+        self.loading_indicator.show()
+        self.status_label.config(text=f"Loading reservation ID: {reservation_id}...", foreground="black")
+        self.executor.submit(self, self.service.get_reservation, reservation_id,
+                             on_success=self.on_reservation_loaded, on_error=self.on_load_error)
+
+    def on_reservation_loaded(self, reservation_data):
+        self.loading_indicator.hide()
+        if reservation_data:
+            self.clear_form(clear_status=False)
+            self.entries["name_entry"].insert(0, reservation_data[1])
+            self.entries["flight_number_entry"].insert(0, reservation_data[2])
+            self.entries["departure_entry"].insert(0, reservation_data[3])
+            self.entries["destination_entry"].insert(0, reservation_data[4])
+            self.entries["date_entry"].insert(0, reservation_data[5])
+            self.entries["seat_number_entry"].insert(0, reservation_data[6])
+            self.current_booking = (reservation_data[2], reservation_data[5], reservation_data[6])
+            self.update_button.config(state=tk.NORMAL)
+            self.status_label.config(text=f"Editing Reservation ID: {self.current_reservation_id}", foreground="blue")
+        else:
+            messagebox.showerror("Error", f"Reservation ID: {self.current_reservation_id} not found.", parent=self)
+            self.status_label.config(text=f"Error: Reservation ID {self.current_reservation_id} not found.", foreground="red")
             self.show_reservations_page()
 
+    def on_load_error(self, error):
+        self.loading_indicator.hide()
+        messagebox.showerror("Load Error", f"Failed to load reservation details: {error}", parent=self)
+        self.status_label.config(text=f"Error loading details: {error}", foreground="red")
+        print(f"Error loading reservation details: {error}")
+        self.show_reservations_page()
+
     def update_reservation_details(self):
         if self.current_reservation_id is None:
             messagebox.showerror("Error", "No reservation selected for update.", parent=self)
             self.status_label.config(text="Error: No reservation to update.", foreground="red")
             return
 
-        name = self.entries["name_entry"].get().strip()
-        flight_number = self.entries["flight_number_entry"].get().strip()
-        departure = self.entries["departure_entry"].get().strip()
-        destination = self.entries["destination_entry"].get().strip()
-        date = self.entries["date_entry"].get().strip()
-        seat_number = self.entries["seat_number_entry"].get().strip()
-
-        if not all([name, flight_number, departure, destination, date, seat_number]):
-            messagebox.showerror("Error", "All fields are required!", parent=self)
-            self.status_label.config(text="Error: All fields must be filled.", foreground="red")
+        updated_details, error = validation.validate_reservation(
+            [self.entries[field + "_entry"].get() for field in database.RESERVATION_COLUMNS[1:]])
+        if error:
+            messagebox.showerror("Error", f"{error}!", parent=self)
+            self.status_label.config(text=f"Error: {error}.", foreground="red")
             return
-
-        updated_details = (name, flight_number, departure, destination, date, seat_number)
+        name, flight_number, departure, destination, date, seat_number = updated_details
 
         try:
-            confirm = messagebox.askyesno("Confirm Update",
-                                           f"Are you sure you want to update reservation ID: {self.current_reservation_id}?",
-                                           parent=self)
-            if confirm:
-                success = database.update_reservation(self.db_conn, self.current_reservation_id, updated_details)
-                if success:
-                    messagebox.showinfo("Success", f"Reservation ID: {self.current_reservation_id} updated successfully.", parent=self)
-                    self.status_label.config(text="Reservation updated successfully!", foreground="green")
-                    self.show_reservations_page()
-                else:
-                    messagebox.showerror("Update Error", f"Failed to update reservation ID: {self.current_reservation_id}.", parent=self)
-                    self.status_label.config(text="Error: Failed to update reservation.", foreground="red")
-        except Exception as e:
-            messagebox.showerror("Update Error", f"An unexpected error occurred: {e}", parent=self)
-            self.status_label.config(text=f"Error: {e}", foreground="red")
-            print(f"Error during update: {e}")
+            seat_error = self.data_access.seat_inventory().check(flight_number, date, seat_number,
+                                                                 self.current_booking)
+        except database.Error as e:
+            # The booking transaction re-checks the seat, so just skip the hint.
+            print(f"Error checking seat availability: {e}")
+            seat_error = None
+        if seat_error:
+            messagebox.showerror("Seat Unavailable", seat_error, parent=self)
+            self.status_label.config(text=f"Error: {seat_error}", foreground="red")
+            return
+
+        confirm = messagebox.askyesno("Confirm Update",
+                                       f"Are you sure you want to update reservation ID: {self.current_reservation_id}?",
+                                       parent=self)
+        if confirm:
+            reservation_id = self.current_reservation_id
+            self.update_button.config(state=tk.DISABLED)
+            self.loading_indicator.show()
+            self.status_label.config(text="Saving changes...", foreground="black")
+            self.executor.submit(self, self.service.update_reservation, reservation_id, updated_details,
+                                 on_success=lambda updated_id: self.on_reservation_updated(reservation_id, updated_id),
+                                 on_error=self.on_update_error,
+                                 cancellable=False)
+
+    def on_reservation_updated(self, reservation_id, success):
+        self.update_button.config(state=tk.NORMAL)
+        self.loading_indicator.hide()
+        if success:
+            messagebox.showinfo("Success", f"Reservation ID: {reservation_id} updated successfully.", parent=self)
+            self.status_label.config(text="Reservation updated successfully!", foreground="green")
+            self.show_reservations_page()
+        else:
+            messagebox.showerror("Update Error", f"Failed to update reservation ID: {reservation_id}.", parent=self)
+            self.status_label.config(text="Error: Failed to update reservation.", foreground="red")
+
+    def on_update_error(self, error):
+        self.update_button.config(state=tk.NORMAL)
+        self.loading_indicator.hide()
+        if isinstance(error, seat_inventory.SeatUnavailableError):
+            messagebox.showerror("Seat Unavailable", str(error), parent=self)
+            self.status_label.config(text=f"Error: {error}", foreground="red")
+            return
+        messagebox.showerror("Update Error", f"An unexpected error occurred: {error}", parent=self)
+        self.status_label.config(text=f"Error: {error}", foreground="red")
+        print(f"Error during update: {error}")
 
     def clear_form(self, clear_status=True):
         for entry_widget in self.entries.values():
@@ -158,16 +202,17 @@ class EditReservationPage(tk.Frame):
     def go_back_to_reservations(self):
         self.clear_form()
         self.current_reservation_id = None
+        self.current_booking = None
         self.show_reservations_page()
 
-    def refresh_db_connection(self, new_conn):
-        self.db_conn = new_conn
-        print("EditReservationPage: Database connection refreshed.")
-
     def on_show(self, reservation_id):
         print(f"EditReservationPage is now visible for ID: {reservation_id}. Loading details.")
         self.load_reservation_details(reservation_id)
 
+    def on_hide(self):
+        self.executor.cancel(self)
+        self.loading_indicator.hide()
+
 if __name__ == "__main__":
     root = tk.Tk()
     root.title("Edit Reservation Page Test")
@@ -202,7 +247,9 @@ if __name__ == "__main__":
         edit_page_frame.pack_forget()
         tk.Label(root, text="Returned to Reservations List (Test)").pack()
 
-    edit_page_frame = EditReservationPage(root, dummy_show_reservations_list, test_db_conn)
+    test_executor = DatabaseExecutor(root)
+    test_data_access = DataAccess()
+    edit_page_frame = EditReservationPage(root, dummy_show_reservations_list, test_data_access, test_executor)
     edit_page_frame.pack(fill=tk.BOTH, expand=True)
 
     if TEST_RES_ID:
@@ -211,6 +258,8 @@ if __name__ == "__main__":
         tk.Label(root, text="Error: Could not load test reservation ID for editing.").pack()
 
     def on_closing():
+        test_executor.shutdown()
+        test_data_access.close()
         if test_db_conn:
             if TEST_RES_ID:
                 database.delete_reservation(test_db_conn, TEST_RES_ID)
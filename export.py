@@ -0,0 +1,97 @@
+# export.py
+import argparse
+import csv
+import json
+import os
+import sys
+import database
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+def write_csv(rows, file_obj):
+    writer = csv.writer(file_obj)
+    writer.writerow(database.RESERVATION_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+def write_jsonl(rows, file_obj):
+    count = 0
+    for row in rows:
+        file_obj.write(json.dumps(dict(zip(database.RESERVATION_COLUMNS, row))))
+        file_obj.write("\n")
+        count += 1
+    return count
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+def export_reservations(conn, path, file_format=None, date_from=None, date_to=None, flight_number=None,
+                        batch_size=database.DEFAULT_BATCH_SIZE, archive=None):
+    # Rows go from a fetchmany cursor straight to disk, so memory use does not
+    # depend on how many rows match. The file is written under a temporary
+    # name and moved into place only once the export has finished; if reading
+    # fails part way the partial file is deleted and the error raised. With an
+    # archive.Archive, a date range also takes in the archived flights.
+    file_format = file_format or ("jsonl" if path.endswith((".jsonl", ".json")) else "csv")
+    if file_format not in WRITERS:
+        raise ValueError(f"Unknown export format: {file_format}")
+    # Checked here so a bad range fails before anything is written.
+    database.date_range_days(date_from, date_to)
+
+    if archive is not None:
+        rows = archive.stream_reservations(conn, date_from, date_to, flight_number, batch_size)
+    else:
+        rows = database.stream_reservations(conn, date_from, date_to, flight_number, batch_size)
+    try:
+        if path == "-":
+            return WRITERS[file_format](rows, sys.stdout)
+
+        temp_path = path + ".part"
+        try:
+            with open(temp_path, "w", newline="", encoding="utf-8") as file_obj:
+                count = WRITERS[file_format](rows, file_obj)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return count
+    finally:
+        rows.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export reservations to CSV or JSON lines.")
+    parser.add_argument("path", help="Output file, or '-' for stdout")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Output format (default: from file extension)")
+    parser.add_argument("--from", dest="date_from", help="Earliest flight date to include (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="Latest flight date to include (YYYY-MM-DD)")
+    parser.add_argument("--flight", dest="flight_number", help="Only export this flight number")
+    parser.add_argument("--database", help=f"Database file (default: {database.DATABASE_NAME})")
+    parser.add_argument("--archive", action="store_true",
+                        help="Include archived flights in the date range (see archive.py)")
+    args = parser.parse_args(argv)
+
+    conn = database.create_connection(database.DatabaseConfig(path=args.database))
+    if conn is None:
+        print("Error! Cannot create the database connection.")
+        return 2
+    archive = None
+    if args.archive:
+        from archive import Archive
+        archive = Archive(database_path=args.database)
+    try:
+        count = export_reservations(conn, args.path, args.format, args.date_from, args.date_to, args.flight_number,
+                                    archive=archive)
+    except (OSError, ValueError, database.Error) as e:
+        print(f"Export failed: {e}")
+        return 2
+    finally:
+        conn.close()
+    if args.path != "-":
+        print(f"Exported {count} reservations to {args.path}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,11 +3,12 @@ import tkinter as tk
 from tkinter import ttk
 
 class HomePage(tk.Frame):
-    def __init__(self, master, show_booking_page_callback, show_reservations_page_callback):
+    def __init__(self, master, show_booking_page_callback, show_reservations_page_callback, show_reports_page_callback):
         super().__init__(master)
         self.master = master
         self.show_booking_page = show_booking_page_callback
         self.show_reservations_page = show_reservations_page_callback
+        self.show_reports_page = show_reports_page_callback
 
         self.configure(bg="#f0f0f0")
 
@@ -52,6 +53,14 @@ class HomePage(tk.Frame):
         )
         view_button.pack(pady=15, fill=tk.X, padx=50)
 
+        reports_button = ttk.Button(
+            options_frame,
+            text="Flight Reports",
+            command=self.show_reports_page,
+            style="Home.TButton"
+        )
+        reports_button.pack(pady=15, fill=tk.X, padx=50)
+
         self.status_bar = ttk.Label(
             self,
             text="Welcome! Please select an option.",
@@ -86,7 +95,12 @@ if __name__ == "__main__":
         home_page_frame.grid_forget()
         tk.Label(root, text="Navigated to Reservations Page (Test)").grid(row=0, column=0, sticky="nsew")
 
-    home_page_frame = HomePage(root, dummy_show_booking, dummy_show_reservations)
+    def dummy_show_reports():
+        print("Dummy: Show Reports Page")
+        home_page_frame.grid_forget()
+        tk.Label(root, text="Navigated to Reports Page (Test)").grid(row=0, column=0, sticky="nsew")
+
+    home_page_frame = HomePage(root, dummy_show_booking, dummy_show_reservations, dummy_show_reports)
     home_page_frame.grid(row=0, column=0, sticky="nsew")
     root.grid_rowconfigure(0, weight=1)
     root.grid_columnconfigure(0, weight=1)
@@ -0,0 +1,252 @@
+# instrumentation.py
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+SLOW_CALL_MS = 50.0
+SLOW_LOG_SIZE = 100
+TIMING_SAMPLES = 512
+ENV_VARIABLE = "FLIGHT_APP_PROFILE"
+
+class TimingStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=TIMING_SAMPLES)
+
+    def record(self, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self.samples.append(elapsed_ms)
+
+    def snapshot(self):
+        ordered = sorted(self.samples)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * (len(ordered) - 1) + 0.5))] if ordered else 0.0
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p95_ms": p95,
+            "max_ms": self.max_ms,
+        }
+
+class Recorder:
+    # Collects timings, counters and slow calls from any thread. Nothing is
+    # recorded while disabled; the module-level helpers check `enabled`
+    # before doing any work, so a disabled recorder costs one attribute read.
+    def __init__(self):
+        self.enabled = False
+        self.slow_threshold_ms = SLOW_CALL_MS
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+        self.slow_calls = deque(maxlen=SLOW_LOG_SIZE)
+
+    def record(self, name, elapsed_ms, detail=""):
+        with self.lock:
+            stats = self.timings.get(name)
+            if stats is None:
+                stats = self.timings[name] = TimingStats()
+            stats.record(elapsed_ms)
+            slow = elapsed_ms >= self.slow_threshold_ms
+            if slow:
+                self.slow_calls.append((time.time(), name, elapsed_ms, detail))
+        if slow:
+            print(f"Slow call: {name} took {elapsed_ms:.1f} ms {detail}".rstrip())
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        with self.lock:
+            self.timings.clear()
+            self.counters.clear()
+            self.slow_calls.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "timings": {name: stats.snapshot() for name, stats in self.timings.items()},
+                "counters": dict(self.counters),
+                "slow_calls": list(self.slow_calls),
+            }
+
+recorder = Recorder()
+
+def count(name, amount=1):
+    if recorder.enabled:
+        recorder.count(name, amount)
+
+class NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_TIMER = NullTimer()
+
+class Timer:
+    def __init__(self, name, detail=""):
+        self.name = name
+        self.detail = detail
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        recorder.record(self.name, (time.perf_counter() - self.started) * 1000, self.detail)
+        return False
+
+def timer(name, detail=""):
+    # Context manager timing the block under `name`; a shared no-op when
+    # instrumentation is off.
+    if recorder.enabled:
+        return Timer(name, detail)
+    return NULL_TIMER
+
+def describe_args(args, kwargs, limit=80):
+    # Connections and other objects without a useful repr are left out, so
+    # the slow-call log shows just the ids, dates and search text involved.
+    parts = [repr(arg) for arg in args if isinstance(arg, (str, int, float, tuple))]
+    parts += [f"{key}={value!r}" for key, value in kwargs.items() if isinstance(value, (str, int, float, tuple))]
+    text = ", ".join(parts)
+    if len(text) > limit:
+        text = text[:limit - 3] + "..."
+    return f"({text})" if text else ""
+
+def count_result_rows(result):
+    # Rows returned by a query, for the usual return shapes of database.py:
+    # a list of rows, a (rows, cursor) / (version, rows, ...) tuple, or a
+    # single row (None when there is none).
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        for item in result[:3]:
+            if isinstance(item, (list, dict)):
+                return len(item)
+        return 1
+    return 0
+
+def timed(fn, name=None, counts_rows=False):
+    import inspect
+    name = name or f"{fn.__module__}.{fn.__name__}"
+
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def generator_wrapper(*args, **kwargs):
+            # Times the whole iteration, not just creating the generator.
+            started = time.perf_counter()
+            rows = 0
+            try:
+                for item in fn(*args, **kwargs):
+                    rows += 1
+                    yield item
+            finally:
+                recorder.record(name, (time.perf_counter() - started) * 1000, describe_args(args, kwargs))
+                if rows and counts_rows:
+                    recorder.count("rows_fetched", rows)
+        return generator_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            recorder.record(name, (time.perf_counter() - started) * 1000, describe_args(args, kwargs))
+        if counts_rows:
+            rows = count_result_rows(result)
+            if rows:
+                recorder.count("rows_fetched", rows)
+        return result
+    return wrapper
+
+# Module functions are wrapped only while instrumentation is enabled and the
+# originals are put back when it is disabled, so the disabled hot path runs
+# exactly the original code. Only the functions a module names are wrapped:
+# its query and write API, not helpers such as id_chunks or backoff_delays.
+registered_modules = {}
+originals = {}
+
+def register_module(module, row_queries=(), calls=()):
+    # row_queries return reservation rows and also count rows_fetched;
+    # calls (counts, writes, seat checks) are only timed.
+    if module not in registered_modules:
+        registered_modules[module] = (tuple(row_queries), tuple(calls))
+        if recorder.enabled:
+            patch_module(module)
+
+def patch_module(module):
+    row_queries, calls = registered_modules[module]
+    for attr in row_queries + calls:
+        if (module, attr) in originals:
+            continue
+        fn = getattr(module, attr)
+        originals[(module, attr)] = fn
+        setattr(module, attr, timed(fn, counts_rows=attr in row_queries))
+
+def unpatch_modules():
+    for (module, attr), fn in originals.items():
+        setattr(module, attr, fn)
+    originals.clear()
+
+def enable(slow_threshold_ms=None):
+    if slow_threshold_ms is not None:
+        recorder.slow_threshold_ms = slow_threshold_ms
+    if recorder.enabled:
+        return
+    recorder.enabled = True
+    for module in registered_modules:
+        patch_module(module)
+
+def disable():
+    recorder.enabled = False
+    unpatch_modules()
+
+def is_enabled():
+    return recorder.enabled
+
+def enable_from_environment():
+    # FLIGHT_APP_PROFILE=1 turns instrumentation on at startup;
+    # FLIGHT_APP_PROFILE=20 also sets the slow-call threshold to 20 ms.
+    value = os.environ.get(ENV_VARIABLE, "").strip()
+    if not value or value == "0":
+        return False
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = None
+    enable(threshold if threshold and threshold > 1 else None)
+    return True
+
+class StartupTimer:
+    # Wall-clock phases of application startup. Always on: it is a handful of
+    # perf_counter calls and the report is printed once.
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.last = self.started
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        elapsed_ms = (now - self.last) * 1000
+        self.phases.append((phase, elapsed_ms))
+        self.last = now
+        if recorder.enabled:
+            recorder.record(f"startup.{phase}", elapsed_ms)
+
+    def total_ms(self):
+        return (self.last - self.started) * 1000
+
+    def report(self):
+        phases = ", ".join(f"{phase} {elapsed_ms:.1f} ms" for phase, elapsed_ms in self.phases)
+        return f"Startup took {self.total_ms():.1f} ms ({phases})."
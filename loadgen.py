@@ -0,0 +1,366 @@
+# loadgen.py
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+import database
+import datagen
+import instrumentation
+from benchmark import summarize
+from write_queue import WriteQueue
+
+DEFAULT_AGENTS = (1, 2, 4, 8)
+DEFAULT_DURATION_S = 5.0
+DEFAULT_ROWS = 10000
+DEFAULT_RETRIES = 3
+DEFAULT_OUTPUT = "loadgen_results.json"
+# Relative weights of what a booking agent does.
+DEFAULT_MIX = {"book": 30, "edit": 20, "delete": 10, "list": 40}
+OPERATIONS = tuple(DEFAULT_MIX)
+# Pause before retrying a write that hit a lock, in seconds (random in range).
+RETRY_PAUSE_S = (0.001, 0.01)
+
+class ErrorLog:
+    # Stands in for sys.stdout while agents run. database.py reports a failed
+    # call by printing "Error ...: <sqlite message>" and returning None/False,
+    # so the messages are counted per agent thread by kind: lock timeouts,
+    # seat conflicts (the unique seat index on bookings) and anything else.
+    def __init__(self):
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        for line in text.splitlines():
+            if not line.startswith("Error"):
+                continue
+            if "locked" in line or "busy" in line:
+                kind = "locked"
+            elif "UNIQUE constraint failed: bookings." in line:
+                kind = "conflict"
+            else:
+                kind = "other"
+            key = (threading.get_ident(), kind)
+            with self.lock:
+                self.counts[key] = self.counts.get(key, 0) + 1
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def count(self, kind):
+        return self.counts.get((threading.get_ident(), kind), 0)
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}' (expected {', '.join(OPERATIONS)})")
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise ValueError("At least one operation needs a positive weight")
+    return mix
+
+class Agent:
+    # One booking terminal: its own connection, its own random stream, and a
+    # loop of weighted operations until the deadline. With a write_queue the
+    # agent's writes go through it (group commit) instead of its connection.
+    def __init__(self, agent_id, settings, error_log, write_queue=None):
+        self.settings = settings
+        self.error_log = error_log
+        self.write_queue = write_queue
+        # Distinct per agent, round and starting database size, so no round
+        # or rerun replays bookings that are already in the database.
+        self.rng = random.Random(f"{settings['seed']}:{settings['rows']}:{settings['round']}:{agent_id}")
+        self.generator = datagen.ReservationGenerator(settings["seed"])
+        self.conn = database.create_connection(database.DatabaseConfig(
+            path=settings["path"], journal_mode=settings["journal_mode"],
+            busy_timeout_ms=settings["busy_timeout_ms"]))
+        self.max_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM bookings").fetchone()[0]
+        self.latencies = {name: [] for name in OPERATIONS}
+        self.stats = {"ops": 0, "retries": 0, "locked": 0, "conflict": 0, "errors": 0, "missing": 0}
+
+    def queued(self, action, write, *args):
+        # Reports a failed write the way database.py does, so ErrorLog sees it.
+        try:
+            return self.write_queue.call(write, *args)
+        except database.Error as e:
+            print(f"Error {action}: {e}")
+            return None
+
+    def book(self):
+        # A random slot past the seeded rows; datagen never maps two indices
+        # to the same seat, so clashes are only between agents.
+        index = self.rng.randrange(self.settings["rows"], self.generator.capacity)
+        reservation_details = self.generator.reservation(index)
+        if self.write_queue is not None:
+            reservation_id = self.queued("adding reservation", database.insert_booking, reservation_details)
+        else:
+            reservation_id = database.add_reservation(self.conn, reservation_details)
+        if reservation_id:
+            self.max_id = max(self.max_id, reservation_id)
+        return reservation_id is not None
+
+    def edit(self):
+        row = database.get_reservation_by_id(self.conn, self.rng.randint(1, self.max_id))
+        if row is None:
+            self.stats["missing"] += 1
+            return True
+        # A passenger name change, the most common edit.
+        name = self.generator.reservation(self.rng.randrange(self.generator.capacity))[0]
+        updated_details = (name,) + tuple(row[2:])
+        if self.write_queue is not None:
+            return self.queued("updating reservation", database.update_booking, row[0], updated_details) is not None
+        return database.update_reservation(self.conn, row[0], updated_details)
+
+    def delete(self):
+        reservation_id = self.rng.randint(1, self.max_id)
+        if self.write_queue is not None:
+            return self.queued("deleting reservation", database.delete_booking, reservation_id) is not None
+        return database.delete_reservation(self.conn, reservation_id)
+
+    def list(self):
+        database.get_reservations_page(self.conn, database.DEFAULT_PAGE_SIZE, self.rng.randint(1, self.max_id + 1))
+        return True
+
+    def run_once(self, name):
+        # Retries a write that failed on a lock, like an agent pressing the
+        # button again; anything else is counted and given up on.
+        operation = getattr(self, name)
+        for attempt in range(self.settings["retries"] + 1):
+            locked, conflicts, errors = (self.error_log.count(kind) for kind in ("locked", "conflict", "other"))
+            if operation():
+                return
+            if self.error_log.count("locked") > locked:
+                if attempt < self.settings["retries"]:
+                    self.stats["retries"] += 1
+                    time.sleep(self.rng.uniform(*RETRY_PAUSE_S))
+                    continue
+                self.stats["locked"] += 1
+            elif self.error_log.count("conflict") > conflicts:
+                self.stats["conflict"] += 1
+            elif self.error_log.count("other") > errors:
+                self.stats["errors"] += 1
+            return
+
+    def run(self, start_event):
+        names = [name for name in OPERATIONS if self.settings["mix"].get(name)]
+        weights = [self.settings["mix"][name] for name in names]
+        start_event.wait()
+        deadline = time.perf_counter() + self.settings["duration_s"]
+        while time.perf_counter() < deadline:
+            name = self.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            self.run_once(name)
+            self.latencies[name].append(time.perf_counter() - started)
+            self.stats["ops"] += 1
+        self.conn.close()
+        return {"latencies": self.latencies, "stats": self.stats}
+
+def agent_main(agent_id, settings, start_event, results, error_log=None, write_queue=None):
+    # Entry point of an agent thread or process. A process gets an ErrorLog
+    # and instrumentation counters (database.py's own lock retries) of its
+    # own; threads share the ones set up by run_round.
+    in_process = error_log is None
+    if in_process:
+        error_log = ErrorLog()
+        sys.stdout = error_log
+        instrumentation.recorder.reset()
+        instrumentation.enable()
+    try:
+        report = Agent(agent_id, settings, error_log, write_queue).run(start_event)
+        if in_process:
+            report["counters"] = instrumentation.recorder.snapshot()["counters"]
+        results.put((agent_id, report))
+    except Exception as e:
+        results.put((agent_id, {"failed": f"{type(e).__name__}: {e}"}))
+
+def run_round(agents, settings, use_threads):
+    # Starts every agent, releases them together and merges what they report.
+    write_queue = None
+    if use_threads:
+        start_event, results = threading.Event(), queue.Queue()
+        error_log = ErrorLog()
+        if settings["group_commit"]:
+            write_queue = WriteQueue(database.DatabaseConfig(
+                path=settings["path"], journal_mode=settings["journal_mode"],
+                busy_timeout_ms=settings["busy_timeout_ms"]))
+        workers = [threading.Thread(target=agent_main,
+                                    args=(i, settings, start_event, results, error_log, write_queue))
+                   for i in range(agents)]
+        instrumentation.recorder.reset()
+        instrumentation.enable()
+    else:
+        start_event, results = multiprocessing.Event(), multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=agent_main, args=(i, settings, start_event, results))
+                   for i in range(agents)]
+    real_stdout = sys.stdout
+    if use_threads:
+        sys.stdout = error_log
+    try:
+        for worker in workers:
+            worker.start()
+        # Give processes time to open their connections before the clock starts.
+        time.sleep(0.2 if use_threads else 0.5)
+        start_event.set()
+        reports = [results.get()[1] for _ in workers]
+        for worker in workers:
+            worker.join()
+        counters = instrumentation.recorder.snapshot()["counters"]
+    finally:
+        sys.stdout = real_stdout
+        instrumentation.disable()
+        if write_queue is not None:
+            write_queue.close()
+
+    failed = [report["failed"] for report in reports if "failed" in report]
+    if failed:
+        raise RuntimeError(f"{len(failed)} agent(s) failed: {failed[0]}")
+    latencies = {name: [] for name in OPERATIONS}
+    stats = {}
+    for report in reports:
+        for name, values in report["latencies"].items():
+            latencies[name].extend(values)
+        for key, value in report["stats"].items():
+            stats[key] = stats.get(key, 0) + value
+        for key, value in report.get("counters", {}).items():
+            counters[key] = counters.get(key, 0) + value
+    all_latencies = [value for values in latencies.values() for value in values]
+    failures = stats["locked"] + stats["conflict"] + stats["errors"]
+    return {
+        "agents": agents,
+        "overall": summarize(all_latencies, settings["duration_s"]),
+        "operations": {name: summarize(values, settings["duration_s"]) for name, values in latencies.items() if values},
+        "retries": stats["retries"],
+        "locked": stats["locked"],
+        "conflicts": stats["conflict"],
+        "errors": stats["errors"],
+        "missing": stats["missing"],
+        "error_rate": round(failures / stats["ops"], 4) if stats["ops"] else 0.0,
+        # Retries made inside database.run_write, before an agent saw an error.
+        "db_retries": counters.get("write_retries", 0),
+        "db_busy_failures": counters.get("write_busy_failures", 0),
+        "group_commits": counters.get("group_commits", 0),
+        "writes_per_commit": round(counters.get("group_commit_writes", 0) / counters["group_commits"], 2)
+        if counters.get("group_commits") else None,
+    }
+
+def print_results(rounds):
+    print(f"\n{'agents':>6}{'ops/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'db retries':>11}{'retries':>9}"
+          f"{'locked':>8}{'conflicts':>10}{'errors':>8}{'error %':>9}")
+    for result in rounds:
+        overall = result["overall"]
+        print(f"{result['agents']:>6}{overall['throughput_ops_s']:>10}{overall['p50_ms']:>9.3f}"
+              f"{overall['p95_ms']:>9.3f}{overall['p99_ms']:>9.3f}{result['db_retries']:>11}{result['retries']:>9}"
+              f"{result['locked']:>8}{result['conflicts']:>10}{result['errors']:>8}{result['error_rate'] * 100:>9.2f}")
+    if any(result["group_commits"] for result in rounds):
+        print("\nGroup commit: " + ", ".join(f"{result['agents']} agent(s) {result['writes_per_commit']} writes/commit"
+                                            for result in rounds))
+    print("\np95 ms per operation:")
+    print(f"{'agents':>6}" + "".join(f"{name:>10}" for name in OPERATIONS))
+    for result in rounds:
+        cells = [result["operations"].get(name, {}).get("p95_ms") for name in OPERATIONS]
+        print(f"{result['agents']:>6}" + "".join(f"{cell:>10.3f}" if cell is not None else f"{'-':>10}"
+                                                 for cell in cells))
+
+def prepare_database(path, rows, seed):
+    conn = database.create_connection(database.DatabaseConfig(path=path))
+    if conn is None:
+        raise RuntimeError(f"Cannot open the database {path}")
+    try:
+        database.create_table(conn)
+        existing = database.count_reservations(conn)
+        if not existing:
+            print(f"Seeding {rows} reservations...", flush=True)
+            datagen.seed_database(conn, rows, seed)
+            existing = rows
+        return existing
+    finally:
+        conn.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulate concurrent booking agents sharing one database and report how they scale.")
+    parser.add_argument("database", nargs="?",
+                        help="Database to load (it is written to!); default: a temporary seeded copy")
+    parser.add_argument("--agents", default=",".join(str(agents) for agents in DEFAULT_AGENTS),
+                        help="Comma-separated agent counts to run in turn (default: 1,2,4,8)")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION_S,
+                        help=f"Seconds per agent count (default: {DEFAULT_DURATION_S})")
+    parser.add_argument("--threads", action="store_true", help="Run agents as threads instead of processes")
+    parser.add_argument("--group-commit", action="store_true",
+                        help="Send the agents' writes through one shared writer thread (needs --threads)")
+    parser.add_argument("--mix", default=",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()),
+                        help="Operation weights (default: book=30,edit=20,delete=10,list=40)")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS,
+                        help=f"Rows to seed into an empty database (default: {DEFAULT_ROWS})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"Retries of a write that hit a lock (default: {DEFAULT_RETRIES})")
+    parser.add_argument("--busy-timeout-ms", type=int, default=database.DEFAULT_CONFIG.busy_timeout_ms,
+                        help="SQLite busy timeout per connection; lower it to surface lock contention")
+    parser.add_argument("--journal-mode", default=database.DEFAULT_CONFIG.journal_mode,
+                        help="Journal mode of the agents' connections (default: WAL)")
+    parser.add_argument("--seed", type=int, default=datagen.DEFAULT_SEED, help="Random seed")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"Results file (default: {DEFAULT_OUTPUT})")
+    args = parser.parse_args(argv)
+
+    try:
+        agent_counts = [int(agents) for agents in args.agents.split(",") if agents.strip()]
+        mix = parse_mix(args.mix)
+        database.DatabaseConfig(journal_mode=args.journal_mode)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.group_commit and not args.threads:
+        parser.error("--group-commit needs --threads: the agents share one writer thread")
+
+    workdir = None
+    path = args.database
+    if path is None:
+        workdir = tempfile.mkdtemp(prefix="flight-loadgen-")
+        path = os.path.join(workdir, "loadgen.db")
+    try:
+        rows = prepare_database(path, args.rows, args.seed)
+        settings = {
+            "path": path, "rows": rows, "seed": args.seed, "mix": mix, "retries": args.retries,
+            "duration_s": args.duration, "busy_timeout_ms": args.busy_timeout_ms,
+            "journal_mode": args.journal_mode.upper(), "group_commit": args.group_commit,
+        }
+        rounds = []
+        for round_index, agents in enumerate(agent_counts):
+            print(f"Running {agents} agent(s) for {args.duration:.0f}s...", flush=True)
+            rounds.append(run_round(agents, dict(settings, round=round_index), args.threads))
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "mode": "threads" if args.threads else "processes",
+            "settings": {key: value for key, value in settings.items() if key != "path"},
+        },
+        "rounds": rounds,
+    }
+    with open(args.output, "w", encoding="utf-8") as file_obj:
+        json.dump(report, file_obj, indent=2)
+    print_results(rounds)
+    print(f"\nResults saved to {args.output}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
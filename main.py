@@ -1,28 +1,53 @@
 # main.py
+import time
+STARTUP_STARTED = time.perf_counter()
+
+import importlib
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
 import database
+import instrumentation
+import seat_inventory
+from data_access import DataAccess
+from workers import DatabaseExecutor
 
 from home import HomePage
-from booking import BookingPage
-from reservations import ReservationsPage
-from edit_reservation import EditReservationPage
+
+# Every page except HomePage is imported and built the first time it is shown.
+PAGE_MODULES = {
+    "BookingPage": "booking",
+    "ReservationsPage": "reservations",
+    "EditReservationPage": "edit_reservation",
+    "ReportsPage": "reports",
+    "DiagnosticsPage": "diagnostics",
+}
 
 class FlightReservationApp(tk.Tk):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, startup=None, **kwargs):
+        self.startup = startup or instrumentation.StartupTimer()
         super().__init__(*args, **kwargs)
 
         self.title("Simple Flight Reservation System")
         self.geometry("800x600")
+        self.startup.mark("window")
+
+        instrumentation.register_module(database, database.INSTRUMENTED_ROW_QUERIES, database.INSTRUMENTED_CALLS)
+        instrumentation.register_module(seat_inventory, calls=seat_inventory.INSTRUMENTED_CALLS)
+        if instrumentation.enable_from_environment():
+            print("Performance instrumentation enabled.")
 
-        self.db_conn = None
+        self.data_access = None
         self.initialize_app_database()
+        self.startup.mark("database")
 
-        if not self.db_conn:
+        if not self.data_access:
             messagebox.showerror("Database Error", "Failed to connect to the database. The application cannot start.")
             self.destroy()
             return
 
+        self.executor = DatabaseExecutor(self)
+
         self.style = ttk.Style(self)
         try:
             self.style.theme_use('clam')
@@ -30,76 +55,119 @@ class FlightReservationApp(tk.Tk):
             print("Clam theme not available, using default.")
             self.style.theme_use(self.style.theme_names()[0])
 
-        container = ttk.Frame(self, padding="10")
-        container.pack(side="top", fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
+        self.container = ttk.Frame(self, padding="10")
+        self.container.pack(side="top", fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
 
         self.frames = {}
         self.current_frame = None
 
-        for F in (HomePage, BookingPage, ReservationsPage, EditReservationPage):
-            page_name = F.__name__
-            if page_name == "HomePage":
-                frame = F(container,
-                          show_booking_page_callback=lambda: self.show_frame("BookingPage"),
-                          show_reservations_page_callback=lambda: self.show_frame("ReservationsPage"))
-            elif page_name == "BookingPage":
-                frame = F(container,
-                          show_home_page_callback=lambda: self.show_frame("HomePage"),
-                          db_connection=self.db_conn)
-            elif page_name == "ReservationsPage":
-                frame = F(container,
-                          show_home_page_callback=lambda: self.show_frame("HomePage"),
-                          show_edit_page_callback=self.show_edit_frame_with_id,
-                          db_connection=self.db_conn)
-            elif page_name == "EditReservationPage":
-                frame = F(container,
-                          show_reservations_page_callback=lambda: self.show_frame("ReservationsPage"),
-                          db_connection=self.db_conn)
-            else:
-                frame = F(container, self)
-
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
-
         self.show_frame("HomePage")
+        self.startup.mark("home page")
 
+        # DiagnosticsPage is not linked from any page.
+        self.bind_all("<Control-Shift-D>", lambda event: self.show_frame("DiagnosticsPage"))
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.after_idle(self.report_startup)
+
+    def report_startup(self):
+        self.startup.mark("first paint")
+        print(self.startup.report())
+
+    def create_frame(self, page_name):
+        if page_name == "HomePage":
+            page_class = HomePage
+        elif page_name in PAGE_MODULES:
+            page_class = getattr(importlib.import_module(PAGE_MODULES[page_name]), page_name)
+        else:
+            return None
+
+        if page_name == "HomePage":
+            frame = page_class(self.container,
+                               show_booking_page_callback=lambda: self.show_frame("BookingPage"),
+                               show_reservations_page_callback=lambda: self.show_frame("ReservationsPage"),
+                               show_reports_page_callback=lambda: self.show_frame("ReportsPage"))
+        elif page_name == "BookingPage":
+            frame = page_class(self.container,
+                               show_home_page_callback=lambda: self.show_frame("HomePage"),
+                               data_access=self.data_access,
+                               executor=self.executor)
+        elif page_name == "ReservationsPage":
+            frame = page_class(self.container,
+                               show_home_page_callback=lambda: self.show_frame("HomePage"),
+                               show_edit_page_callback=self.show_edit_frame_with_id,
+                               data_access=self.data_access,
+                               executor=self.executor)
+        elif page_name == "EditReservationPage":
+            frame = page_class(self.container,
+                               show_reservations_page_callback=lambda: self.show_frame("ReservationsPage"),
+                               data_access=self.data_access,
+                               executor=self.executor)
+        elif page_name == "ReportsPage":
+            frame = page_class(self.container,
+                               show_home_page_callback=lambda: self.show_frame("HomePage"),
+                               data_access=self.data_access,
+                               executor=self.executor)
+        else:
+            frame = page_class(self.container,
+                               show_home_page_callback=lambda: self.show_frame("HomePage"))
+
+        self.frames[page_name] = frame
+        frame.grid(row=0, column=0, sticky="nsew")
+        return frame
 
     def initialize_app_database(self):
         try:
             database.initialize_database()
-            self.db_conn = database.create_connection()
-            if self.db_conn:
+            data_access = DataAccess()
+            if data_access.check():
+                self.data_access = data_access
                 print("Database connection established successfully.")
+                print(f"Database settings: {data_access.settings()}")
+                self.start_archiving()
             else:
+                data_access.close()
                 print("Failed to create database connection.")
         except Exception as e:
             print(f"Error during database initialization: {e}")
-            self.db_conn = None
+            self.data_access = None
 
-    def show_frame(self, page_name_to_show, data_to_pass=None):
-        if page_name_to_show not in self.frames:
-            print(f"Error: Frame '{page_name_to_show}' not found.")
+    def start_archiving(self):
+        # Opt-in: FLIGHT_APP_ARCHIVE_DAYS=365 moves flights older than a year
+        # to the archive databases on a background thread. archive.py is only
+        # imported when the variable is set, so startup does not pay for it.
+        if not os.environ.get("FLIGHT_APP_ARCHIVE_DAYS", "").strip():
             return
+        import archive
+        keep_days = archive.keep_days_from_environment()
+        if keep_days:
+            print(f"Archiving flights older than {keep_days} days in the background.")
+            archive.start_background_archiving(self.data_access.config, archive.Archive(), keep_days)
 
-        frame_to_show = self.frames[page_name_to_show]
+    def show_frame(self, page_name_to_show, data_to_pass=None):
+        frame_to_show = self.frames.get(page_name_to_show)
+        if frame_to_show is None:
+            with instrumentation.timer(f"{page_name_to_show}.create"):
+                frame_to_show = self.create_frame(page_name_to_show)
+            if frame_to_show is None:
+                print(f"Error: Frame '{page_name_to_show}' not found.")
+                return
 
         if self.current_frame and self.current_frame != frame_to_show:
-            pass 
+            if hasattr(self.current_frame, 'on_hide'):
+                self.current_frame.on_hide()
 
         frame_to_show.tkraise()
         self.current_frame = frame_to_show
         print(f"Showing frame: {page_name_to_show}")
 
         if hasattr(frame_to_show, 'on_show'):
-            if data_to_pass is not None:
-                frame_to_show.on_show(data_to_pass)
-            else:
-                frame_to_show.on_show()
-        
-        self.refresh_all_db_connections()
+            with instrumentation.timer(f"{page_name_to_show}.on_show"):
+                if data_to_pass is not None:
+                    frame_to_show.on_show(data_to_pass)
+                else:
+                    frame_to_show.on_show()
 
     def show_edit_frame_with_id(self, reservation_id):
         if reservation_id is not None:
@@ -107,28 +175,15 @@ class FlightReservationApp(tk.Tk):
         else:
             messagebox.showwarning("Edit Error", "No reservation selected to edit.", parent=self)
 
-    def refresh_all_db_connections(self):
-        if not self.db_conn:
-            print("Cannot refresh DB connections, main connection is None.")
-            return
-
-        for frame_instance in self.frames.values():
-            if hasattr(frame_instance, 'refresh_db_connection'):
-                try:
-                    frame_instance.refresh_db_connection(self.db_conn)
-                except Exception as e:
-                    print(f"Error refreshing DB connection for {frame_instance.__class__.__name__}: {e}")
-
     def on_closing(self):
         if messagebox.askokcancel("Quit", "Do you want to exit the application?", parent=self):
-            if self.db_conn:
-                try:
-                    self.db_conn.close()
-                    print("Database connection closed successfully.")
-                except Exception as e:
-                    print(f"Error closing database connection: {e}")
+            self.executor.shutdown()
+            self.data_access.close()
+            print("Database connections closed.")
             self.destroy()
 
 if __name__ == "__main__":
-    app = FlightReservationApp()
+    startup = instrumentation.StartupTimer(STARTUP_STARTED)
+    startup.mark("imports")
+    app = FlightReservationApp(startup=startup)
     app.mainloop()
\ No newline at end of file
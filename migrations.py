@@ -0,0 +1,524 @@
+# migrations.py
+import argparse
+import sys
+import time
+import database
+import reporting
+import validation
+from database import Error
+
+DEFAULT_BATCH_SIZE = 20000
+
+def valid_date_sql(expr):
+    # date() echoes impossible days like 2025-02-30 back unchanged, while
+    # julianday() rolls them over; going through julianday() catches them.
+    return f"(date(julianday({expr})) IS {expr} AND {expr} >= '0001-01-01')"
+
+def day_from_text_sql(expr):
+    # SQL twin of database.date_to_day: the day number of a YYYY-MM-DD date,
+    # or minus the unparsed_dates id of any other text (which must exist).
+    return (f"CASE WHEN {valid_date_sql(expr)} "
+            f"THEN CAST(julianday({expr}) - {database.JULIAN_DAY_OFFSET} AS INTEGER) "
+            f"ELSE -(SELECT id FROM unparsed_dates WHERE date = {expr}) END")
+
+def seat_code_sql(expr):
+    # SQL twin of validation.seat_code: the packed seat for text like "12C"
+    # or " 12 c", or NULL. Trimmed, the last character is the letter and the
+    # rest, trimmed again, must be a row number of one to three digits.
+    whitespace = "char(" + ", ".join(str(ord(c)) for c in validation.WHITESPACE) + ")"
+    text = f"trim({expr}, {whitespace})"
+    letter = f"upper(substr({text}, -1))"
+    digits = f"rtrim(substr({text}, 1, length({text}) - 1), {whitespace})"
+    return (f"CASE WHEN unicode({letter}) BETWEEN 65 AND 90 AND length({digits}) BETWEEN 1 AND 3 "
+            f"AND {digits} NOT GLOB '*[^0-9]*' AND CAST({digits} AS INTEGER) > 0 "
+            f"THEN CAST({digits} AS INTEGER) << {validation.SEAT_LETTER_BITS} | (unicode({letter}) - 65) END")
+
+def seat_from_text_sql(expr):
+    # Like day_from_text_sql: the packed seat, or minus the unparsed_seats id
+    # of any other text (which must exist).
+    return (f"COALESCE({seat_code_sql(expr)}, "
+            f"-(SELECT id FROM unparsed_seats WHERE seat_number = {expr}))")
+
+def table_type(conn, name):
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+def create_base_tables(conn, batch_size=DEFAULT_BATCH_SIZE, progress_callback=None):
+    # Version 1: the original flat reservations table.
+    try:
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS reservations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            flight_number TEXT NOT NULL,
+            departure TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            date TEXT NOT NULL,
+            seat_number TEXT NOT NULL
+        )
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS seat_maps (
+            flight_number TEXT NOT NULL,
+            date TEXT NOT NULL,
+            seat_rows INTEGER NOT NULL,
+            seat_letters TEXT NOT NULL,
+            PRIMARY KEY (flight_number, date)
+        )
+        """)
+        conn.commit()
+        return True
+    except Error as e:
+        conn.rollback()
+        print(f"Error creating table: {e}")
+        return False
+
+def create_lookup_tables(conn):
+    # Names, flight numbers and airports are stored once and referenced by
+    # integer id; rows in these tables are never deleted or changed, so the
+    # triggers below can always look the text up again. Dates are day numbers
+    # (see database.date_to_day) and seats packed integers (see
+    # validation.seat_code); legacy text that is neither is kept in
+    # unparsed_dates and unparsed_seats.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS airports (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS passengers (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS flights (
+        id INTEGER PRIMARY KEY,
+        flight_number TEXT NOT NULL UNIQUE
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS unparsed_dates (
+        id INTEGER PRIMARY KEY,
+        date TEXT NOT NULL UNIQUE
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS unparsed_seats (
+        id INTEGER PRIMARY KEY,
+        seat_number TEXT NOT NULL UNIQUE
+    )
+    """)
+
+def create_normalized_tables(conn):
+    # Version 2 bookings, with the seat still stored as text.
+    create_lookup_tables(conn)
+    # The route stays on the booking: older databases have the same flight
+    # number with different routes, and none of that is thrown away.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS bookings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        passenger_id INTEGER NOT NULL REFERENCES passengers(id),
+        flight_id INTEGER NOT NULL REFERENCES flights(id),
+        departure_id INTEGER NOT NULL REFERENCES airports(id),
+        destination_id INTEGER NOT NULL REFERENCES airports(id),
+        day INTEGER NOT NULL,
+        seat_number TEXT NOT NULL
+    )
+    """)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_bookings_flight_day_seat "
+                 "ON bookings(flight_id, day, seat_number)")
+    # Version 1 let a seat be booked twice. The unique index above keeps the
+    # first booking of a seat; the others are kept here, verbatim, for
+    # someone to rebook by hand.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS conflicting_reservations (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        flight_number TEXT NOT NULL,
+        departure TEXT NOT NULL,
+        destination TEXT NOT NULL,
+        date TEXT NOT NULL,
+        seat_number TEXT NOT NULL
+    )
+    """)
+
+def create_packed_tables(conn):
+    # Version 3 bookings: the seat is a packed integer, so the unique seat
+    # index is all integers and orders a flight's seats as 1A, 1B, ... 10A.
+    create_lookup_tables(conn)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS bookings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        passenger_id INTEGER NOT NULL REFERENCES passengers(id),
+        flight_id INTEGER NOT NULL REFERENCES flights(id),
+        departure_id INTEGER NOT NULL REFERENCES airports(id),
+        destination_id INTEGER NOT NULL REFERENCES airports(id),
+        day INTEGER NOT NULL,
+        seat INTEGER NOT NULL
+    )
+    """)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_bookings_flight_day_seat ON bookings(flight_id, day, seat)")
+
+def create_booking_indexes(conn):
+    # Built after the data is copied, which is much faster than keeping them
+    # up to date row by row.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_day ON bookings(day)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_passenger ON bookings(passenger_id)")
+
+def create_compatibility_view(conn):
+    # `reservations` keeps its old columns as a view, and INSTEAD OF triggers
+    # turn writes to it into writes to bookings, so existing SQL still works.
+    conn.execute("CREATE VIEW IF NOT EXISTS reservations(id, name, flight_number, departure, destination, date, "
+                 f"seat_number) AS {database.RESERVATION_SELECT}")
+    references = f"""
+        INSERT OR IGNORE INTO passengers(name) VALUES (new.name);
+        INSERT OR IGNORE INTO flights(flight_number) VALUES (new.flight_number);
+        INSERT OR IGNORE INTO airports(name) VALUES (new.departure);
+        INSERT OR IGNORE INTO airports(name) VALUES (new.destination);
+        INSERT OR IGNORE INTO unparsed_dates(date) SELECT new.date WHERE NOT {valid_date_sql("new.date")};
+        INSERT OR IGNORE INTO unparsed_seats(seat_number) SELECT new.seat_number WHERE {seat_code_sql("new.seat_number")} IS NULL;
+    """
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS reservations_insert INSTEAD OF INSERT ON reservations BEGIN
+        {references}
+        INSERT INTO bookings(id, passenger_id, flight_id, departure_id, destination_id, day, seat)
+        VALUES (new.id,
+                (SELECT id FROM passengers WHERE name = new.name),
+                (SELECT id FROM flights WHERE flight_number = new.flight_number),
+                (SELECT id FROM airports WHERE name = new.departure),
+                (SELECT id FROM airports WHERE name = new.destination),
+                {day_from_text_sql("new.date")},
+                {seat_from_text_sql("new.seat_number")});
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS reservations_update INSTEAD OF UPDATE ON reservations BEGIN
+        {references}
+        UPDATE bookings
+        SET passenger_id = (SELECT id FROM passengers WHERE name = new.name),
+            flight_id = (SELECT id FROM flights WHERE flight_number = new.flight_number),
+            departure_id = (SELECT id FROM airports WHERE name = new.departure),
+            destination_id = (SELECT id FROM airports WHERE name = new.destination),
+            day = {day_from_text_sql("new.date")},
+            seat = {seat_from_text_sql("new.seat_number")}
+        WHERE id = old.id;
+    END
+    """)
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS reservations_delete INSTEAD OF DELETE ON reservations BEGIN
+        DELETE FROM bookings WHERE id = old.id;
+    END
+    """)
+
+def create_change_log(conn):
+    # Every write to bookings appends (version, id, operation) here, so a
+    # view can ask for "what changed since version N" instead of reloading.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS reservation_changes (
+        version INTEGER PRIMARY KEY AUTOINCREMENT,
+        reservation_id INTEGER NOT NULL,
+        operation TEXT NOT NULL
+    )
+    """)
+    for operation, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+        conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS bookings_log_{operation.lower()} AFTER {operation} ON bookings BEGIN
+            INSERT INTO reservation_changes(reservation_id, operation) VALUES ({row}.id, '{operation.lower()}');
+        END
+        """)
+
+def fts_values(row):
+    return (f"{row}.id, (SELECT name FROM passengers WHERE id = {row}.passenger_id), "
+            f"(SELECT flight_number FROM flights WHERE id = {row}.flight_id), "
+            f"(SELECT name FROM airports WHERE id = {row}.departure_id), "
+            f"(SELECT name FROM airports WHERE id = {row}.destination_id)")
+
+def search_insert_trigger_sql():
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS bookings_fts_insert AFTER INSERT ON bookings BEGIN
+        INSERT INTO reservations_fts(rowid, name, flight_number, departure, destination)
+        VALUES ({fts_values("new")});
+    END
+    """
+
+def search_indexing_paused(conn):
+    names = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE name IN ('reservations_fts', 'bookings_fts_insert')")}
+    return names == {"reservations_fts"}
+
+def pause_search_indexing(cursor):
+    # For bulk loads: keeping the FTS index current costs a trigger run per
+    # inserted row (about 45 us, a third of a 100k-row import), while one
+    # rebuild of the whole index takes about 5 us per booking in the table.
+    # Searches miss the new rows until resume_search_indexing runs.
+    cursor.execute("DROP TRIGGER IF EXISTS bookings_fts_insert")
+
+def resume_search_indexing(cursor):
+    # Rebuilds the index and puts the trigger back in the same transaction, so
+    # no insert falls between the two. Also repairs a pause left behind by an
+    # import that was interrupted; returns whether a rebuild was needed.
+    if not search_indexing_paused(cursor.connection):
+        return False
+    cursor.execute("INSERT INTO reservations_fts(reservations_fts) VALUES ('rebuild')")
+    cursor.execute(search_insert_trigger_sql())
+    return True
+
+def create_search_index(conn):
+    # External-content FTS5 index over the reservations view; rowids are
+    # booking ids, so an index built before the migration stays valid.
+    try:
+        # A missing insert trigger (a paused bulk load, or bookings rebuilt
+        # by a migration) means rows may be missing from the index.
+        already_exists = table_type(conn, "reservations_fts") is not None and not search_indexing_paused(conn)
+        conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS reservations_fts USING fts5(
+            name, flight_number, departure, destination,
+            content='reservations', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """)
+        conn.execute(search_insert_trigger_sql())
+        conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS bookings_fts_delete AFTER DELETE ON bookings BEGIN
+            INSERT INTO reservations_fts(reservations_fts, rowid, name, flight_number, departure, destination)
+            VALUES ('delete', {fts_values("old")});
+        END
+        """)
+        conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS bookings_fts_update
+        AFTER UPDATE OF passenger_id, flight_id, departure_id, destination_id ON bookings BEGIN
+            INSERT INTO reservations_fts(reservations_fts, rowid, name, flight_number, departure, destination)
+            VALUES ('delete', {fts_values("old")});
+            INSERT INTO reservations_fts(rowid, name, flight_number, departure, destination)
+            VALUES ({fts_values("new")});
+        END
+        """)
+        if not already_exists:
+            conn.execute("INSERT INTO reservations_fts(reservations_fts) VALUES ('rebuild')")
+        conn.commit()
+    except Error as e:
+        # SQLite builds without FTS5 still work; search falls back to LIKE.
+        conn.rollback()
+        print(f"Error creating search index: {e}")
+
+def copy_batch(conn, low, high):
+    # Copies legacy rows with low < id <= high. Everything happens in SQL, so
+    # only one batch of pages is ever touched and nothing is held in Python.
+    # A seat that is already taken (by a lower id) sends the row to
+    # conflicting_reservations instead.
+    params = (low, high)
+    conn.execute("INSERT OR IGNORE INTO passengers(name) "
+                 "SELECT name FROM legacy_reservations WHERE id > ? AND id <= ?", params)
+    conn.execute("INSERT OR IGNORE INTO flights(flight_number) "
+                 "SELECT flight_number FROM legacy_reservations WHERE id > ? AND id <= ?", params)
+    conn.execute("INSERT OR IGNORE INTO airports(name) "
+                 "SELECT departure FROM legacy_reservations WHERE id > ? AND id <= ? "
+                 "UNION SELECT destination FROM legacy_reservations WHERE id > ? AND id <= ?", params + params)
+    conn.execute("INSERT OR IGNORE INTO unparsed_dates(date) "
+                 f"SELECT date FROM legacy_reservations WHERE id > ? AND id <= ? AND NOT {valid_date_sql('date')}", params)
+    copied = conn.execute(f"""
+    INSERT OR IGNORE INTO bookings(id, passenger_id, flight_id, departure_id, destination_id, day, seat_number)
+    SELECT r.id, p.id, f.id, dep.id, dst.id, {day_from_text_sql("r.date")}, r.seat_number
+    FROM legacy_reservations r
+    JOIN passengers p ON p.name = r.name
+    JOIN flights f ON f.flight_number = r.flight_number
+    JOIN airports dep ON dep.name = r.departure
+    JOIN airports dst ON dst.name = r.destination
+    WHERE r.id > ? AND r.id <= ?
+    ORDER BY r.id
+    """, params).rowcount
+    copied += conn.execute("INSERT OR IGNORE INTO conflicting_reservations SELECT * FROM legacy_reservations "
+                           "WHERE id > ? AND id <= ? AND id NOT IN (SELECT id FROM bookings WHERE id > ? AND id <= ?)",
+                           params + params).rowcount
+    return copied
+
+def normalize_reservations(conn, batch_size=DEFAULT_BATCH_SIZE, progress_callback=None):
+    # Version 2: reservations -> airports, flights, passengers, bookings.
+    # The old table is renamed, copied over in id ranges with a commit after
+    # each batch, and dropped at the end. If the copy is interrupted the next
+    # run carries on after the last copied id.
+    try:
+        if table_type(conn, "reservations") == "table":
+            for trigger in ("reservations_fts_insert", "reservations_fts_delete", "reservations_fts_update",
+                            "reservations_log_insert", "reservations_log_update", "reservations_log_delete"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            create_normalized_tables(conn)
+            conn.execute("ALTER TABLE reservations RENAME TO legacy_reservations")
+            conn.commit()
+
+        if table_type(conn, "legacy_reservations") == "table":
+            copied, low = conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM (SELECT id FROM bookings "
+                "UNION ALL SELECT id FROM conflicting_reservations)").fetchone()
+            last, remaining = conn.execute(
+                "SELECT COALESCE(MAX(id), 0), COUNT(*) FROM legacy_reservations WHERE id > ?", (low,)).fetchone()
+            total = copied + remaining
+            if remaining:
+                print(f"Migrating {total} reservations to the normalized schema...")
+            while low < last:
+                high = low + batch_size
+                copied += copy_batch(conn, low, high)
+                conn.commit()
+                low = high
+                if progress_callback:
+                    progress_callback(copied, total)
+            keep_sequence(conn, ("reservations", "legacy_reservations"))
+            conn.execute("DROP TABLE legacy_reservations")
+            conflicts = conn.execute("SELECT COUNT(*) FROM conflicting_reservations").fetchone()[0]
+            if conflicts:
+                print(f"{conflicts} reservations were for seats already booked and are kept in "
+                      "conflicting_reservations.")
+
+        # The reservations view and the triggers on bookings are created by
+        # the last step, for the bookings table in its final shape.
+        create_normalized_tables(conn)
+        conn.commit()
+    except Error as e:
+        conn.rollback()
+        print(f"Error migrating reservations: {e}")
+        return False
+    return True
+
+def keep_sequence(conn, old_names):
+    # Keep AUTOINCREMENT's high-water mark so ids of deleted rows are never
+    # handed out again (the change log may still mention them).
+    names = ", ".join("?" * (len(old_names) + 1))
+    params = tuple(old_names) + ("bookings",)
+    sequence = conn.execute(f"SELECT MAX(seq) FROM sqlite_sequence WHERE name IN ({names})", params).fetchone()[0]
+    conn.execute(f"DELETE FROM sqlite_sequence WHERE name IN ({names})", params)
+    if sequence:
+        conn.execute("INSERT INTO sqlite_sequence(name, seq) VALUES ('bookings', ?)", (sequence,))
+
+def copy_bookings_batch(conn, low, high):
+    # Copies version 2 bookings with low < id <= high, packing their seats.
+    # Seats that only differed in spelling ("12a" and "12A" on one flight)
+    # are the same packed seat: the unique index keeps the first, and the
+    # others keep their text as unparsed seats, so no booking is lost.
+    params = (low, high)
+    columns = "passenger_id, flight_id, departure_id, destination_id, day"
+    conn.execute("INSERT OR IGNORE INTO unparsed_seats(seat_number) SELECT seat_number FROM legacy_bookings "
+                 f"WHERE id > ? AND id <= ? AND {seat_code_sql('seat_number')} IS NULL", params)
+    copied = conn.execute(f"INSERT OR IGNORE INTO bookings(id, {columns}, seat) "
+                          f"SELECT l.id, {columns}, {seat_from_text_sql('l.seat_number')} FROM legacy_bookings l "
+                          "WHERE l.id > ? AND l.id <= ? ORDER BY l.id", params).rowcount
+    skipped = ("FROM legacy_bookings l WHERE l.id > ? AND l.id <= ? "
+               "AND l.id NOT IN (SELECT id FROM bookings WHERE id > ? AND id <= ?)")
+    conn.execute(f"INSERT OR IGNORE INTO unparsed_seats(seat_number) SELECT l.seat_number {skipped}", params + params)
+    copied += conn.execute(f"INSERT INTO bookings(id, {columns}, seat) SELECT l.id, {columns}, "
+                           f"-(SELECT u.id FROM unparsed_seats u WHERE u.seat_number = l.seat_number) {skipped}",
+                           params + params).rowcount
+    return copied
+
+def pack_seats(conn, batch_size=DEFAULT_BATCH_SIZE, progress_callback=None):
+    # Version 3: bookings.seat_number (text) -> bookings.seat (packed
+    # integer). Same shape as version 2: the table is renamed, copied in id
+    # ranges with a commit per batch, and dropped at the end; an interrupted
+    # copy carries on after the last copied id. The view and every trigger on
+    # bookings go with the old table and are created again at the end.
+    try:
+        if table_type(conn, "legacy_bookings") is None and "seat_number" in table_columns(conn, "bookings"):
+            conn.execute("DROP VIEW IF EXISTS reservations")
+            for index in ("idx_bookings_flight_day_seat", "idx_bookings_day", "idx_bookings_passenger"):
+                conn.execute(f"DROP INDEX IF EXISTS {index}")
+            conn.execute("ALTER TABLE bookings RENAME TO legacy_bookings")
+        create_packed_tables(conn)
+        conn.commit()
+
+        if table_type(conn, "legacy_bookings") == "table":
+            copied = conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+            low = conn.execute("SELECT COALESCE(MAX(id), 0) FROM bookings").fetchone()[0]
+            last, remaining = conn.execute(
+                "SELECT COALESCE(MAX(id), 0), COUNT(*) FROM legacy_bookings WHERE id > ?", (low,)).fetchone()
+            total = copied + remaining
+            if remaining:
+                print(f"Packing the seats of {total} bookings...")
+            while low < last:
+                high = low + batch_size
+                copied += copy_bookings_batch(conn, low, high)
+                conn.commit()
+                low = high
+                if progress_callback:
+                    progress_callback(copied, total)
+            keep_sequence(conn, ("legacy_bookings",))
+            conn.execute("DROP TABLE legacy_bookings")
+
+        create_packed_tables(conn)
+        create_booking_indexes(conn)
+        create_compatibility_view(conn)
+        create_change_log(conn)
+        conn.commit()
+    except Error as e:
+        conn.rollback()
+        print(f"Error packing seats: {e}")
+        return False
+    create_search_index(conn)
+    # The summary triggers went with the old table; enabling again also
+    # recounts, which is one pass over bookings.
+    if reporting.has_summaries(conn) and not reporting.enable_summaries(conn):
+        return False
+    return True
+
+def table_columns(conn, name):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({name})")]
+
+# (version, description, step). Each step brings the schema from the
+# previous version to its own and must be safe to run again after a crash;
+# PRAGMA user_version is only bumped once a step has finished.
+MIGRATIONS = [
+    (1, "reservations and seat_maps tables", create_base_tables),
+    (2, "normalized airports, flights, passengers and bookings", normalize_reservations),
+    (3, "integer seats in bookings", pack_seats),
+]
+
+def pending_migrations(conn):
+    current = database.get_schema_version(conn)
+    return [migration for migration in MIGRATIONS if migration[0] > current]
+
+def migrate(conn, batch_size=DEFAULT_BATCH_SIZE, progress_callback=None):
+    for version, description, step in pending_migrations(conn):
+        if not step(conn, batch_size, progress_callback):
+            print(f"Error! Migration to schema version {version} ({description}) failed.")
+            return False
+        database.set_schema_version(conn, version)
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bring a reservations database up to the current schema.")
+    parser.add_argument("database", nargs="?", default=database.DATABASE_NAME,
+                        help=f"Database file (default: {database.DATABASE_NAME})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Reservations copied per transaction (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--status", action="store_true", help="Only show the schema version and pending migrations")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Compact the file afterwards (the old table's pages are otherwise only reused)")
+    args = parser.parse_args(argv)
+
+    conn = database.create_connection(database.DatabaseConfig(path=args.database))
+    if conn is None:
+        print("Error! Cannot create the database connection.")
+        return 2
+    try:
+        print(f"{args.database}: schema version {database.get_schema_version(conn)}")
+        pending = pending_migrations(conn)
+        for version, description, _ in pending:
+            print(f"  pending: {version} - {description}")
+        if args.status:
+            return 0
+        ok = True
+        if pending:
+            started = time.perf_counter()
+            ok = migrate(conn, args.batch_size,
+                         lambda done, total: print(f"  {done}/{total} rows", end="\r", flush=True))
+            print(f"\n{args.database}: schema version {database.get_schema_version(conn)} "
+                  f"({time.perf_counter() - started:.1f}s)")
+        if ok and args.vacuum:
+            conn.execute("VACUUM")
+            print(f"{args.database}: vacuumed")
+        return 0 if ok else 1
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
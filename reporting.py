@@ -0,0 +1,241 @@
+# reporting.py
+import argparse
+import datetime
+import sys
+import time
+import database
+import seat_inventory
+from database import Error
+
+REPORT_LIMIT = 100
+BUSIEST_DATES_LIMIT = 10
+LAST_DAY = datetime.date.max.toordinal()
+DEFAULT_CAPACITY = seat_inventory.DEFAULT_SEAT_ROWS * len(seat_inventory.DEFAULT_SEAT_LETTERS)
+
+# Optional summary tables: booking counts per day, per (day, flight) and per
+# (day, route), kept up to date by triggers on bookings. Keyed by day first
+# because every report is filtered by a date range.
+SUMMARY_TABLES = {
+    "day_totals": ("day",),
+    "flight_day_totals": ("day", "flight_id"),
+    "route_day_totals": ("day", "departure_id", "destination_id"),
+}
+
+def day_range(date_from=None, date_to=None):
+    # (first, last) day numbers for optional YYYY-MM-DD bounds, or None if
+    # either bound is not a valid date. Unparsed legacy dates never match.
+    low = database.date_to_day(date_from) if date_from else 1
+    high = database.date_to_day(date_to) if date_to else LAST_DAY
+    if low is None or high is None:
+        return None
+    return low, high
+
+def has_summaries(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type='table' "
+                   f"AND name IN ({', '.join('?' * len(SUMMARY_TABLES))})", tuple(SUMMARY_TABLES))
+    return cursor.fetchone()[0] == len(SUMMARY_TABLES)
+
+def summary_triggers():
+    # One AFTER trigger per operation on bookings, each touching every
+    # summary table: +1 for the new row's keys, -1 for the old row's keys.
+    add, remove = [], []
+    for table, keys in SUMMARY_TABLES.items():
+        add.append(f"INSERT INTO {table}({', '.join(keys)}, booked) "
+                   f"VALUES ({', '.join('new.' + key for key in keys)}, 1) "
+                   f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET booked = booked + 1;")
+        match = " AND ".join(f"{key} = old.{key}" for key in keys)
+        remove.append(f"UPDATE {table} SET booked = booked - 1 WHERE {match};")
+        remove.append(f"DELETE FROM {table} WHERE {match} AND booked <= 0;")
+    return {
+        "insert": ("AFTER INSERT ON bookings", add),
+        "delete": ("AFTER DELETE ON bookings", remove),
+        "update": ("AFTER UPDATE OF day, flight_id, departure_id, destination_id ON bookings", remove + add),
+    }
+
+def enable_summaries(conn):
+    # Creates and fills the summary tables and their triggers inside one
+    # write transaction, so no booking can slip in between the fill and the
+    # triggers. Costs one pass over bookings; safe to run again.
+    cursor = conn.cursor()
+    try:
+        if conn.in_transaction:
+            conn.commit()
+        cursor.execute("BEGIN IMMEDIATE")
+        for table, keys in SUMMARY_TABLES.items():
+            columns = ", ".join(f"{key} INTEGER NOT NULL" for key in keys)
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns}, booked INTEGER NOT NULL, "
+                           f"PRIMARY KEY ({', '.join(keys)})) WITHOUT ROWID")
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(f"INSERT INTO {table}({', '.join(keys)}, booked) "
+                           f"SELECT {', '.join(keys)}, COUNT(*) FROM bookings GROUP BY {', '.join(keys)}")
+        for operation, (event, statements) in summary_triggers().items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS bookings_totals_{operation}")
+            cursor.execute(f"CREATE TRIGGER bookings_totals_{operation} {event} BEGIN\n"
+                           + "\n".join(statements) + "\nEND")
+        conn.commit()
+        return True
+    except Error as e:
+        conn.rollback()
+        print(f"Error enabling report summaries: {e}")
+        return False
+
+def disable_summaries(conn):
+    cursor = conn.cursor()
+    try:
+        for operation in summary_triggers():
+            cursor.execute(f"DROP TRIGGER IF EXISTS bookings_totals_{operation}")
+        for table in SUMMARY_TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.commit()
+        return True
+    except Error as e:
+        conn.rollback()
+        print(f"Error disabling report summaries: {e}")
+        return False
+
+def totals_sql(conn, table):
+    # (day, keys..., booked) rows of one summary for a day range: read from
+    # the summary table when it exists, otherwise counted from bookings.
+    # Either way the day range is a range scan on an index starting with day.
+    columns = ", ".join(SUMMARY_TABLES[table])
+    if has_summaries(conn):
+        return f"SELECT {columns}, booked FROM {table} WHERE day BETWEEN ? AND ?"
+    return f"SELECT {columns}, COUNT(*) AS booked FROM bookings WHERE day BETWEEN ? AND ? GROUP BY {columns}"
+
+def date_sql(column):
+    return f"date({column} + {database.JULIAN_DAY_OFFSET})"
+
+def busiest_dates(conn, date_from=None, date_to=None, limit=BUSIEST_DATES_LIMIT):
+    # [(date, bookings)], most bookings first.
+    days = day_range(date_from, date_to)
+    if days is None:
+        print(f"Error: invalid date range {date_from!r} - {date_to!r}")
+        return []
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT {date_sql('t.day')}, t.booked FROM ({totals_sql(conn, 'day_totals')}) AS t "
+                       "ORDER BY t.booked DESC, t.day LIMIT ?", days + (limit,))
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error computing busiest dates: {e}")
+        return []
+
+def load_factors(conn, date_from=None, date_to=None, flight_number=None, limit=REPORT_LIMIT):
+    # [(flight_number, date, booked, capacity, load factor)], fullest first.
+    # Capacity comes from seat_maps, or the default 30 x ABCDEF layout.
+    days = day_range(date_from, date_to)
+    if days is None:
+        print(f"Error: invalid date range {date_from!r} - {date_to!r}")
+        return []
+    params = list(days)
+    where = ""
+    if flight_number:
+        where = "WHERE f.flight_number = ?"
+        params.append(flight_number)
+    capacity = f"COALESCE(s.seat_rows * length(s.seat_letters), {DEFAULT_CAPACITY})"
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+        SELECT f.flight_number, {date_sql('t.day')}, t.booked, {capacity},
+               ROUND(t.booked * 1.0 / {capacity}, 3) AS load_factor
+        FROM ({totals_sql(conn, 'flight_day_totals')}) AS t
+        JOIN flights f ON f.id = t.flight_id
+        LEFT JOIN seat_maps s ON s.flight_number = f.flight_number AND s.date = {date_sql('t.day')}
+        {where}
+        ORDER BY load_factor DESC, t.booked DESC, f.flight_number, t.day
+        LIMIT ?
+        """, params + [limit])
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error computing load factors: {e}")
+        return []
+
+def route_day_bookings(conn, date_from=None, date_to=None, departure=None, destination=None, limit=REPORT_LIMIT):
+    # [(date, departure, destination, bookings)] by date, busiest route first.
+    days = day_range(date_from, date_to)
+    if days is None:
+        print(f"Error: invalid date range {date_from!r} - {date_to!r}")
+        return []
+    conditions = []
+    params = list(days)
+    for alias, name in (("dep", departure), ("dst", destination)):
+        if name:
+            conditions.append(f"{alias}.name = ?")
+            params.append(name)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+        SELECT {date_sql('t.day')}, dep.name, dst.name, t.booked
+        FROM ({totals_sql(conn, 'route_day_totals')}) AS t
+        JOIN airports dep ON dep.id = t.departure_id
+        JOIN airports dst ON dst.id = t.destination_id
+        {where}
+        ORDER BY t.day, t.booked DESC, dep.name, dst.name
+        LIMIT ?
+        """, params + [limit])
+        return cursor.fetchall()
+    except Error as e:
+        print(f"Error computing route bookings: {e}")
+        return []
+
+def dashboard(conn, date_from=None, date_to=None, flight_number=None, limit=REPORT_LIMIT):
+    # Everything the reports page shows, from one connection.
+    started = time.perf_counter()
+    result = {
+        "summaries": has_summaries(conn),
+        "load_factors": load_factors(conn, date_from, date_to, flight_number, limit),
+        "route_day_bookings": route_day_bookings(conn, date_from, date_to, limit=limit),
+        "busiest_dates": busiest_dates(conn, date_from, date_to),
+    }
+    result["elapsed_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Booking reports: load factors, route bookings, busiest dates.")
+    parser.add_argument("database", nargs="?", default=database.DATABASE_NAME,
+                        help=f"Database file (default: {database.DATABASE_NAME})")
+    parser.add_argument("--from", dest="date_from", help="First date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="Last date (YYYY-MM-DD)")
+    parser.add_argument("--flight", dest="flight_number", help="Only this flight number (load factors)")
+    parser.add_argument("--limit", type=int, default=20, help="Rows per report (default: 20)")
+    parser.add_argument("--enable-summaries", action="store_true",
+                        help="Create trigger-maintained summary tables so reports stay fast on large databases")
+    parser.add_argument("--disable-summaries", action="store_true", help="Drop the summary tables and triggers")
+    args = parser.parse_args(argv)
+
+    if day_range(args.date_from, args.date_to) is None:
+        parser.error("--from and --to must be dates in YYYY-MM-DD format")
+    conn = database.create_connection(database.DatabaseConfig(path=args.database))
+    if conn is None:
+        print("Error! Cannot create the database connection.")
+        return 2
+    try:
+        database.create_table(conn)
+        if args.enable_summaries:
+            started = time.perf_counter()
+            if not enable_summaries(conn):
+                return 1
+            print(f"Summary tables built in {time.perf_counter() - started:.1f}s.")
+        if args.disable_summaries and not disable_summaries(conn):
+            return 1
+
+        report = dashboard(conn, args.date_from, args.date_to, args.flight_number, args.limit)
+        source = "summary tables" if report["summaries"] else "bookings"
+        print(f"Reports from {source} in {report['elapsed_ms']:.1f} ms")
+        print("\nLoad factors:")
+        for flight_number, date, booked, capacity, load_factor in report["load_factors"]:
+            print(f"  {flight_number:10}{date:12}{booked:>5}/{capacity:<5}{load_factor:>8.1%}")
+        print("\nBookings per route per day:")
+        for date, departure, destination, booked in report["route_day_bookings"]:
+            print(f"  {date:12}{departure + ' - ' + destination:40}{booked:>6}")
+        print("\nBusiest dates:")
+        for date, booked in report["busiest_dates"]:
+            print(f"  {date:12}{booked:>6}")
+        return 0
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# reports.py
+import datetime
+import tkinter as tk
+from tkinter import ttk
+import database
+from data_access import DataAccess
+from workers import DatabaseExecutor, LoadingIndicator
+
+DEFAULT_RANGE_DAYS = 30
+
+class ReportsPage(tk.Frame):
+    # Load factors, bookings per route per day and busiest dates for a date
+    # range, computed in SQL by reporting.py on a worker thread.
+    def __init__(self, master, show_home_page_callback, data_access, executor):
+        super().__init__(master)
+        self.master = master
+        self.show_home_page = show_home_page_callback
+        self.data_access = data_access
+        self.executor = executor
+        self.service = data_access.service
+
+        self.configure(bg="#f0f0f0")
+
+        title_label = ttk.Label(
+            self,
+            text="Flight Reports",
+            font=("Arial", 20, "bold"),
+            background="#f0f0f0",
+            foreground="#333333"
+        )
+        title_label.pack(pady=(20, 10))
+
+        filter_frame = ttk.Frame(self, style="TFrame")
+        filter_frame.pack(fill=tk.X, padx=30)
+
+        today = datetime.date.today()
+        self.date_from_var = tk.StringVar(value=today.isoformat())
+        self.date_to_var = tk.StringVar(value=(today + datetime.timedelta(days=DEFAULT_RANGE_DAYS - 1)).isoformat())
+        self.flight_var = tk.StringVar()
+        for label, variable, width in (("From:", self.date_from_var, 12), ("To:", self.date_to_var, 12),
+                                       ("Flight:", self.flight_var, 10)):
+            ttk.Label(filter_frame, text=label, background="#f0f0f0").pack(side=tk.LEFT, padx=(0, 5))
+            entry = ttk.Entry(filter_frame, textvariable=variable, width=width)
+            entry.pack(side=tk.LEFT, padx=(0, 15))
+            entry.bind("<Return>", lambda event: self.load_reports())
+
+        self.refresh_button = ttk.Button(filter_frame, text="Refresh", command=self.load_reports)
+        self.refresh_button.pack(side=tk.LEFT)
+
+        notebook = ttk.Notebook(self)
+        notebook.pack(expand=True, fill=tk.BOTH, padx=20, pady=10)
+
+        self.load_tree = self.create_tree(notebook, "Load Factors", (
+            ("flight_number", "Flight", 100), ("date", "Date", 100), ("booked", "Booked", 80),
+            ("capacity", "Seats", 80), ("load_factor", "Load Factor", 100)))
+        self.route_tree = self.create_tree(notebook, "Bookings per Route", (
+            ("date", "Date", 100), ("departure", "From", 160), ("destination", "To", 160),
+            ("booked", "Bookings", 80)))
+        self.dates_tree = self.create_tree(notebook, "Busiest Dates", (
+            ("date", "Date", 120), ("booked", "Bookings", 100)))
+
+        self.status_label = ttk.Label(self, text="", font=("Arial", 10), background="#f0f0f0")
+        self.status_label.pack(fill=tk.X, padx=30)
+        self.loading_indicator = LoadingIndicator(self, anchor=self.status_label)
+
+        back_button = ttk.Button(self, text="Back to Home", command=self.show_home_page)
+        back_button.pack(pady=10)
+
+    def create_tree(self, notebook, title, columns):
+        frame = ttk.Frame(notebook, padding="5")
+        notebook.add(frame, text=title)
+        tree = ttk.Treeview(frame, columns=[name for name, _, _ in columns], show="headings")
+        for name, heading, width in columns:
+            tree.heading(name, text=heading)
+            tree.column(name, width=width, minwidth=60, anchor=tk.W if name in ("departure", "destination") else tk.CENTER)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(expand=True, fill=tk.BOTH)
+        return tree
+
+    def load_reports(self):
+        date_from = self.date_from_var.get().strip() or None
+        date_to = self.date_to_var.get().strip() or None
+        for value in (date_from, date_to):
+            if value and database.date_to_day(value) is None:
+                self.status_label.config(text=f"Invalid date '{value}', expected YYYY-MM-DD.", foreground="red")
+                return
+        flight_number = self.flight_var.get().strip() or None
+
+        self.executor.cancel(self)
+        self.refresh_button.config(state=tk.DISABLED)
+        self.loading_indicator.show()
+        self.status_label.config(text="Computing reports...", foreground="black")
+        self.executor.submit(self, self.service.reports_dashboard, date_from, date_to, flight_number,
+                             on_success=self.show_reports,
+                             on_error=self.on_reports_error)
+
+    def show_reports(self, report):
+        self.refresh_button.config(state=tk.NORMAL)
+        self.loading_indicator.hide()
+        self.fill_tree(self.load_tree, [row[:4] + (f"{row[4]:.1%}",) for row in report["load_factors"]])
+        self.fill_tree(self.route_tree, report["route_day_bookings"])
+        self.fill_tree(self.dates_tree, report["busiest_dates"])
+        source = "summary tables" if report["summaries"] else "bookings"
+        if not report["load_factors"]:
+            text = "No bookings in this date range."
+        else:
+            text = f"Computed from {source} in {report['elapsed_ms']:.0f} ms."
+        self.status_label.config(text=text, foreground="black")
+
+    def fill_tree(self, tree, rows):
+        tree.delete(*tree.get_children())
+        for row in rows:
+            tree.insert("", tk.END, values=row)
+
+    def on_reports_error(self, error):
+        self.refresh_button.config(state=tk.NORMAL)
+        self.loading_indicator.hide()
+        self.status_label.config(text=f"Error computing reports: {error}", foreground="red")
+        print(f"Error computing reports: {error}")
+
+    def on_show(self):
+        self.load_reports()
+
+    def on_hide(self):
+        self.executor.cancel(self)
+        self.loading_indicator.hide()
+        self.refresh_button.config(state=tk.NORMAL)
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Reports Page Test")
+    root.geometry("800x600")
+
+    database.initialize_database()
+    style = ttk.Style(root)
+    style.theme_use('clam')
+
+    test_executor = DatabaseExecutor(root)
+    test_data_access = DataAccess()
+    reports_page_frame = ReportsPage(root, lambda: print("Dummy: Show Home Page"), test_data_access, test_executor)
+    reports_page_frame.pack(fill="both", expand=True)
+    reports_page_frame.on_show()
+
+    def on_closing():
+        test_executor.shutdown()
+        test_data_access.close()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    root.mainloop()
@@ -1,15 +1,96 @@
 # reservations.py
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import database
+import instrumentation
+from compact_store import ReservationStore
+from virtual_tree import VirtualTreeview
+from data_access import DataAccess
+from workers import DatabaseExecutor, LoadingIndicator
+
+COLUMN_TITLES = {
+    "id": "ID",
+    "name": "Passenger Name",
+    "flight_number": "Flight No.",
+    "departure": "Departure",
+    "destination": "Destination",
+    "date": "Date",
+    "seat_number": "Seat No.",
+}
+
+SEARCH_DEBOUNCE_MS = 250
+
+def describe_reservations(reservation_ids):
+    if len(reservation_ids) == 1:
+        return f"reservation ID: {reservation_ids[0]}"
+    return f"{len(reservation_ids)} reservations"
+
+def describe_export_filter(date_from, date_to, flight_number):
+    parts = []
+    if flight_number:
+        parts.append(f"flight {flight_number}")
+    if date_from or date_to:
+        parts.append(f"dates {date_from or '...'} to {date_to or '...'}")
+    return ", ".join(parts) if parts else "all reservations"
+
+class ExportFilterDialog(simpledialog.Dialog):
+    # Optional date range and flight number for an export; every field may be
+    # left empty. `result` is (date_from, date_to, flight_number) with None
+    # for the empty ones, or None if the dialog was cancelled.
+    def __init__(self, parent, initial=(None, None, None)):
+        self.initial = initial
+        self.entries = []
+        super().__init__(parent, "Export Reservations")
+
+    def body(self, master):
+        ttk.Label(master, text="Leave a field empty to export everything.").grid(row=0, column=0, columnspan=2,
+                                                                                 sticky=tk.W, pady=(0, 5))
+        labels = ("From date (YYYY-MM-DD):", "To date (YYYY-MM-DD):", "Flight number:")
+        for row, (label, value) in enumerate(zip(labels, self.initial), start=1):
+            ttk.Label(master, text=label).grid(row=row, column=0, sticky=tk.W, padx=(0, 5), pady=2)
+            entry = ttk.Entry(master, width=20)
+            entry.insert(0, value or "")
+            entry.grid(row=row, column=1, pady=2)
+            self.entries.append(entry)
+        return self.entries[0]
+
+    def validate(self):
+        date_from, date_to, flight_number = (entry.get().strip() or None for entry in self.entries)
+        try:
+            database.date_range_days(date_from, date_to)
+        except ValueError as e:
+            messagebox.showerror("Input Error", str(e), parent=self)
+            return False
+        self.values = (date_from, date_to, flight_number)
+        return True
+
+    def apply(self):
+        self.result = self.values
 
 class ReservationsPage(tk.Frame):
-    def __init__(self, master, show_home_page_callback, show_edit_page_callback, db_connection):
+    def __init__(self, master, show_home_page_callback, show_edit_page_callback, data_access, executor):
         super().__init__(master)
         self.master = master
         self.show_home_page = show_home_page_callback
         self.show_edit_page = show_edit_page_callback
-        self.db_conn = db_connection
+        self.data_access = data_access
+        self.executor = executor
+        self.service = data_access.service
+        self.page_size = database.DEFAULT_PAGE_SIZE
+        self.page_cursors = [None]
+        self.page_index = 0
+        self.next_cursor = None
+        self.search_after_id = None
+        self.active_search = ""
+        self.seen_version = None
+        self.loaded_view = None
+        # Rows currently listed (a page or search results), kept column-wise.
+        self.store = ReservationStore()
+        self.sort_column = None
+        self.sort_descending = False
+        self.column_filters = {}
+        # (date_from, date_to, flight_number) last used for an export.
+        self.export_filter = (None, None, None)
 
         self.configure(bg="#f0f0f0")
 
@@ -22,19 +103,56 @@ class ReservationsPage(tk.Frame):
         )
         title_label.pack(pady=(20, 10))
 
+        search_frame = ttk.Frame(self, style="TFrame")
+        search_frame.pack(fill=tk.X, padx=30)
+
+        search_label = ttk.Label(search_frame, text="Search:", font=("Arial", 11), background="#f0f0f0")
+        search_label.pack(side=tk.LEFT)
+
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, font=("Arial", 11), width=40)
+        self.search_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.search_entry.bind("<KeyRelease>", self.on_search_changed)
+        self.search_entry.bind("<Escape>", lambda event: self.clear_search())
+
+        clear_search_button = ttk.Button(search_frame, text="Clear", command=self.clear_search)
+        clear_search_button.pack(side=tk.LEFT, padx=5)
+
+        filter_frame = ttk.Frame(self, style="TFrame")
+        filter_frame.pack(fill=tk.X, padx=30, pady=(5, 0))
+
+        filter_label = ttk.Label(filter_frame, text="Filter:", font=("Arial", 11), background="#f0f0f0")
+        filter_label.pack(side=tk.LEFT)
+
+        self.filter_column_var = tk.StringVar(value=COLUMN_TITLES["flight_number"])
+        self.filter_column_combo = ttk.Combobox(filter_frame, textvariable=self.filter_column_var,
+                                                values=list(COLUMN_TITLES.values()), state="readonly", width=15)
+        self.filter_column_combo.pack(side=tk.LEFT, padx=5)
+
+        self.filter_text_var = tk.StringVar()
+        self.filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_text_var, font=("Arial", 11), width=20)
+        self.filter_entry.pack(side=tk.LEFT, padx=5)
+        self.filter_entry.bind("<Return>", lambda event: self.apply_column_filter())
+
+        self.apply_filter_button = ttk.Button(filter_frame, text="Apply", command=self.apply_column_filter)
+        self.apply_filter_button.pack(side=tk.LEFT, padx=5)
+
+        self.clear_filters_button = ttk.Button(filter_frame, text="Clear Filters", command=self.clear_column_filters)
+        self.clear_filters_button.pack(side=tk.LEFT, padx=5)
+
+        self.filters_label = ttk.Label(filter_frame, text="", font=("Arial", 9), background="#f0f0f0",
+                                       foreground="#555555")
+        self.filters_label.pack(side=tk.LEFT, padx=10)
+
         tree_frame = ttk.Frame(self, padding="10")
         tree_frame.pack(expand=True, fill=tk.BOTH, padx=20, pady=5)
 
         columns = ("id", "name", "flight_number", "departure", "destination", "date", "seat_number")
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", selectmode="browse")
+        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", selectmode="extended")
+        self.tree.bind("<Control-a>", self.select_all_rows)
 
-        self.tree.heading("id", text="ID")
-        self.tree.heading("name", text="Passenger Name")
-        self.tree.heading("flight_number", text="Flight No.")
-        self.tree.heading("departure", text="Departure")
-        self.tree.heading("destination", text="Destination")
-        self.tree.heading("date", text="Date")
-        self.tree.heading("seat_number", text="Seat No.")
+        for column, title in COLUMN_TITLES.items():
+            self.tree.heading(column, text=title, command=lambda column=column: self.sort_by(column))
 
         self.tree.column("id", width=40, minwidth=30, stretch=tk.NO, anchor=tk.CENTER)
         self.tree.column("name", width=150, minwidth=100)
@@ -54,6 +172,64 @@ class ReservationsPage(tk.Frame):
         
         self.tree.pack(expand=True, fill=tk.BOTH)
 
+        self.virtual_mode = tk.BooleanVar(value=False)
+        self.virtual_tree = VirtualTreeview(
+            self.tree, vsb,
+            count_rows=lambda: self.service.count_reservations()[1],
+            fetch_rows=self.fetch_reservation_window
+        )
+
+        pager_frame = ttk.Frame(self, style="TFrame")
+        pager_frame.pack(pady=(5, 0))
+
+        self.prev_page_button = ttk.Button(
+            pager_frame,
+            text="< Previous",
+            command=self.show_previous_page,
+            state=tk.DISABLED
+        )
+        self.prev_page_button.pack(side=tk.LEFT, padx=5)
+
+        self.page_label = ttk.Label(pager_frame, text="Page 1", font=("Arial", 10), background="#f0f0f0")
+        self.page_label.pack(side=tk.LEFT, padx=10)
+
+        self.next_page_button = ttk.Button(
+            pager_frame,
+            text="Next >",
+            command=self.show_next_page,
+            state=tk.DISABLED
+        )
+        self.next_page_button.pack(side=tk.LEFT, padx=5)
+
+        virtual_check = ttk.Checkbutton(
+            pager_frame,
+            text="Virtual scrolling",
+            variable=self.virtual_mode,
+            command=self.toggle_virtual_mode
+        )
+        virtual_check.pack(side=tk.LEFT, padx=(20, 5))
+
+        self.export_button = ttk.Button(
+            pager_frame,
+            text="Export...",
+            command=self.export_reservations
+        )
+        self.export_button.pack(side=tk.LEFT, padx=(20, 5))
+
+        reschedule_button = ttk.Button(
+            pager_frame,
+            text="Reschedule...",
+            command=self.reschedule_selected_reservations
+        )
+        reschedule_button.pack(side=tk.LEFT, padx=5)
+
+        move_button = ttk.Button(
+            pager_frame,
+            text="Move to Flight...",
+            command=self.move_selected_to_flight
+        )
+        move_button.pack(side=tk.LEFT, padx=5)
+
         buttons_frame = ttk.Frame(self, style="TFrame", padding="10")
         buttons_frame.pack(pady=(5, 15))
 
@@ -101,27 +277,320 @@ class ReservationsPage(tk.Frame):
         self.status_label = ttk.Label(self, text="", font=("Arial", 10), background="#f0f0f0")
         self.status_label.pack(pady=(0,10))
 
+        self.loading_indicator = LoadingIndicator(self, anchor=self.status_label)
+
     def load_reservations(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        if self.active_search:
+            self.submit_search()
+            return
 
-        try:
-            if not self.db_conn or getattr(self.db_conn, 'closed', False): 
-                messagebox.showerror("Database Error", "Database connection is not available.", parent=self)
-                self.status_label.config(text="Error: Database connection lost.", foreground="red")
-                return
+        if self.virtual_mode.get():
+            self.load_virtual_reservations()
+            return
 
-            reservations_data = database.get_all_reservations(self.db_conn)
-            if reservations_data:
-                for row in reservations_data:
-                    self.tree.insert("", tk.END, values=row)
-                self.status_label.config(text=f"Loaded {len(reservations_data)} reservations.", foreground="green")
+        self.executor.cancel(self)
+        self.loading_indicator.show()
+        self.status_label.config(text="Loading reservations...", foreground="black")
+        cursor = self.page_cursors[self.page_index]
+        self.executor.submit(self, self.service.list_reservations, self.page_size, cursor,
+                             on_success=self.on_page_loaded, on_error=self.on_load_error)
+
+    def on_page_loaded(self, result):
+        self.loading_indicator.hide()
+        self.seen_version, reservations_data, self.next_cursor = result
+        self.loaded_view = self.current_view()
+        self.store = ReservationStore(reservations_data)
+        self.show_store()
+
+        if reservations_data:
+            first_row = self.page_index * self.page_size + 1
+            last_row = first_row + len(reservations_data) - 1
+            self.status_label.config(text=f"Showing reservations {first_row}-{last_row}.", foreground="green")
+        elif self.page_index > 0:
+            self.show_previous_page()
+            return
+        else:
+            self.status_label.config(text="No reservations found.", foreground="black")
+        self.update_pager()
+
+    def load_virtual_reservations(self):
+        self.executor.cancel(self)
+        self.loading_indicator.show()
+        self.status_label.config(text="Loading reservations...", foreground="black")
+        self.executor.submit(self, self.service.count_reservations,
+                             on_success=self.on_virtual_count_loaded, on_error=self.on_load_error)
+
+    def on_virtual_count_loaded(self, result):
+        self.loading_indicator.hide()
+        self.seen_version, total = result
+        self.loaded_view = self.current_view()
+        self.store = ReservationStore()
+        self.update_sort_controls()
+        try:
+            self.virtual_tree.reload(total)
+            if total:
+                self.status_label.config(text=f"{total} reservations (virtual scrolling).", foreground="green")
             else:
                 self.status_label.config(text="No reservations found.", foreground="black")
-        except Exception as e: 
-            messagebox.showerror("Load Error", f"Failed to load reservations: {e}", parent=self)
-            self.status_label.config(text=f"Error loading reservations: {e}", foreground="red")
-            print(f"Error loading reservations: {e}")
+        except Exception as e:
+            self.on_load_error(e)
+
+    def current_view(self):
+        if self.active_search:
+            return ("search", self.active_search)
+        if self.virtual_mode.get():
+            return ("virtual",)
+        return ("page", self.page_index)
+
+    def refresh_changes(self):
+        # Patch what is already on screen with the rows changed since it was
+        # loaded; falls back to a full load when there is no usable baseline.
+        if self.seen_version is None or self.loaded_view != self.current_view():
+            self.load_reservations()
+            return
+        self.executor.cancel(self)
+        self.executor.submit(self, self.service.get_changes_since, self.seen_version,
+                             on_success=self.on_changes_loaded, on_error=self.on_load_error)
+
+    def on_changes_loaded(self, result):
+        if result is None:
+            self.load_reservations()
+            return
+        self.seen_version, changes = result
+        if not changes:
+            return
+        if self.loaded_view == ("virtual",):
+            self.load_virtual_reservations()
+            return
+        touched = self.apply_changes(changes, allow_insert=self.loaded_view == ("page", 0))
+        if touched:
+            self.status_label.config(text=f"Updated {touched} changed reservation(s).", foreground="green")
+        self.update_pager()
+
+    def apply_changes(self, changes, allow_insert):
+        # Rows newer than the top row are new bookings and belong at the top of
+        # the first page; any other row is only patched if it is on screen.
+        # With a sort or filter active the changed store is simply shown again.
+        reorder = self.sort_column is not None or bool(self.column_filters)
+        top_id = self.store.ids[0] if len(self.store) else 0
+        touched = 0
+        for reservation_id, row in sorted(changes.items()):
+            iid = str(reservation_id)
+            if row is None:
+                if self.store.remove(reservation_id):
+                    if self.tree.exists(iid):
+                        self.tree.delete(iid)
+                    touched += 1
+            elif self.store.update(row) is not None:
+                if not reorder and self.tree.exists(iid):
+                    self.tree.item(iid, values=self.store.row(self.store.find(reservation_id)))
+                touched += 1
+            elif allow_insert and reservation_id > top_id:
+                self.store.insert(0, row)
+                if not reorder:
+                    self.tree.insert("", 0, iid=iid, values=self.store.row(0))
+                touched += 1
+        instrumentation.count("treeview_updates", touched)
+
+        if allow_insert and len(self.store) > self.page_size:
+            for reservation_id in self.store.ids[self.page_size:].tolist():
+                self.store.remove(reservation_id)
+                if self.tree.exists(str(reservation_id)):
+                    self.tree.delete(str(reservation_id))
+            self.next_cursor = self.store.ids[-1]
+        if reorder and touched:
+            self.show_store()
+        return touched
+
+    def show_store(self):
+        # Shows the loaded rows through the active filters and sort order;
+        # both work on the store's precomputed keys, with no query.
+        indices = None
+        if self.column_filters:
+            indices = self.store.filter_indices(self.column_filters)
+        if self.sort_column is not None:
+            indices = self.store.sort_indices(self.sort_column, self.sort_descending, indices)
+        self.tree.delete(*self.tree.get_children())
+        shown = 0
+        for row in self.store.rows(indices):
+            self.tree.insert("", tk.END, iid=str(row[0]), values=row)
+            shown += 1
+        instrumentation.count("treeview_inserts", shown)
+        self.update_sort_controls()
+        return shown
+
+    def sort_by(self, column):
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            sql_order = self.virtual_tree.active and not self.active_search
+            if sql_order and column not in database.SORT_KEYS:
+                self.status_label.config(
+                    text=f"Sorting by {COLUMN_TITLES[column]} needs a loaded page; turn off virtual scrolling.",
+                    foreground="red")
+                return
+            self.sort_column = column
+            self.sort_descending = False
+        self.refresh_sorted_view()
+
+    def refresh_sorted_view(self):
+        if self.virtual_tree.active and not self.active_search:
+            # Too many rows to hold: let SQLite walk the matching index.
+            self.update_sort_controls()
+            self.load_virtual_reservations()
+            return
+        shown = self.show_store()
+        if self.column_filters:
+            self.status_label.config(text=f"{shown} of {len(self.store)} loaded reservations match the filters.",
+                                     foreground="green")
+
+    def apply_column_filter(self):
+        if self.virtual_tree.active and not self.active_search:
+            self.status_label.config(text="Filters apply to a loaded page; turn off virtual scrolling.",
+                                     foreground="red")
+            return
+        titles = {title: column for column, title in COLUMN_TITLES.items()}
+        column = titles.get(self.filter_column_var.get())
+        if column is None:
+            return
+        text = self.filter_text_var.get().strip()
+        if text:
+            self.column_filters[column] = text
+        else:
+            self.column_filters.pop(column, None)
+        self.refresh_sorted_view()
+
+    def clear_column_filters(self):
+        self.filter_text_var.set("")
+        if not self.column_filters:
+            return
+        self.column_filters = {}
+        self.refresh_sorted_view()
+
+    def update_sort_controls(self):
+        for column, title in COLUMN_TITLES.items():
+            if column == self.sort_column:
+                title += " \u25bc" if self.sort_descending else " \u25b2"
+            self.tree.heading(column, text=title)
+        self.filters_label.config(text="; ".join(f"{COLUMN_TITLES[column]} contains '{text}'"
+                                                 for column, text in self.column_filters.items()))
+        state = tk.DISABLED if self.virtual_tree.active and not self.active_search else tk.NORMAL
+        self.apply_filter_button.config(state=state)
+
+    def on_load_error(self, error):
+        self.loading_indicator.hide()
+        messagebox.showerror("Load Error", f"Failed to load reservations: {error}", parent=self)
+        self.status_label.config(text=f"Error loading reservations: {error}", foreground="red")
+        print(f"Error loading reservations: {error}")
+        self.update_pager()
+
+    def fetch_reservation_window(self, offset, limit, after_row):
+        if self.sort_column is not None:
+            return self.service.get_sorted_window(self.sort_column, self.sort_descending, offset, limit, after_row)
+        after_id = after_row[0] if after_row is not None else None
+        return self.service.get_reservations_window(offset, limit, after_id)
+
+    def on_search_changed(self, event=None):
+        # Debounce keystrokes: only search once typing pauses.
+        if self.search_after_id is not None:
+            self.after_cancel(self.search_after_id)
+        self.search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self.search_after_id = None
+        text = self.search_var.get().strip()
+        if text == self.active_search:
+            return
+        self.active_search = text
+        if not text:
+            if self.virtual_mode.get():
+                self.activate_virtual_tree()
+            self.load_reservations()
+            return
+        self.virtual_tree.deactivate()
+        self.submit_search()
+
+    def submit_search(self):
+        self.executor.cancel(self)
+        self.loading_indicator.show()
+        self.executor.submit(self, self.service.search_reservations, self.active_search,
+                             on_success=self.on_search_results, on_error=self.on_load_error)
+
+    def on_search_results(self, result):
+        self.loading_indicator.hide()
+        self.seen_version, rows = result
+        self.loaded_view = self.current_view()
+        self.store = ReservationStore(rows)
+        self.show_store()
+        if rows:
+            more = "+" if len(rows) >= database.SEARCH_RESULT_LIMIT else ""
+            self.status_label.config(text=f"{len(rows)}{more} reservations match '{self.active_search}'.",
+                                     foreground="green")
+        else:
+            self.status_label.config(text=f"No reservations match '{self.active_search}'.", foreground="black")
+        self.update_pager()
+
+    def clear_search(self):
+        if self.search_after_id is not None:
+            self.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        self.search_var.set("")
+        self.run_search()
+
+    def toggle_virtual_mode(self):
+        if self.active_search:
+            # Search results are always a plain list; apply the mode once the
+            # search is cleared.
+            self.update_pager()
+            return
+        if self.virtual_mode.get():
+            self.activate_virtual_tree()
+        else:
+            self.virtual_tree.deactivate()
+            self.reset_pagination()
+        self.update_pager()
+        self.load_reservations()
+
+    def activate_virtual_tree(self):
+        # Only index-backed sort orders can be kept once rows come from SQL.
+        if self.sort_column not in database.SORT_KEYS:
+            self.sort_column = None
+            self.sort_descending = False
+        self.virtual_tree.activate()
+
+    def update_pager(self):
+        if self.active_search:
+            self.page_label.config(text="Search results")
+            self.prev_page_button.config(state=tk.DISABLED)
+            self.next_page_button.config(state=tk.DISABLED)
+            return
+        if self.virtual_mode.get():
+            self.page_label.config(text="All pages")
+            self.prev_page_button.config(state=tk.DISABLED)
+            self.next_page_button.config(state=tk.DISABLED)
+            return
+        self.page_label.config(text=f"Page {self.page_index + 1}")
+        self.prev_page_button.config(state=tk.NORMAL if self.page_index > 0 else tk.DISABLED)
+        self.next_page_button.config(state=tk.NORMAL if self.next_cursor is not None else tk.DISABLED)
+
+    def show_next_page(self):
+        if self.next_cursor is None:
+            return
+        del self.page_cursors[self.page_index + 1:]
+        self.page_cursors.append(self.next_cursor)
+        self.page_index += 1
+        self.load_reservations()
+
+    def show_previous_page(self):
+        if self.page_index == 0:
+            return
+        self.page_index -= 1
+        self.load_reservations()
+
+    def reset_pagination(self):
+        self.page_cursors = [None]
+        self.page_index = 0
+        self.next_cursor = None
 
     def get_selected_reservation_id(self):
         selected_item = self.tree.focus() 
@@ -143,43 +612,171 @@ class ReservationsPage(tk.Frame):
             print(f"Attempting to edit reservation ID: {reservation_id}")
             self.show_edit_page(reservation_id)
 
+    def get_selected_reservation_ids(self):
+        # Every selected row; with virtual scrolling this includes selected
+        # rows that have been scrolled out of view.
+        if self.virtual_tree.active:
+            reservation_ids = sorted(self.virtual_tree.selected_keys)
+        else:
+            reservation_ids = [int(iid) for iid in self.tree.selection()]
+        if not reservation_ids:
+            messagebox.showwarning("Selection Error", "Please select one or more reservations from the list first.",
+                                   parent=self)
+        return reservation_ids
+
+    def select_all_rows(self, event=None):
+        if not self.virtual_tree.active and self.tree.get_children():
+            self.tree.selection_set(*self.tree.get_children())
+        return "break"
+
     def delete_selected_reservation(self):
-        reservation_id = self.get_selected_reservation_id()
-        if reservation_id is None:
+        reservation_ids = self.get_selected_reservation_ids()
+        if not reservation_ids:
             return
 
-        confirm = messagebox.askyesno(
-            "Confirm Delete",
-            f"Are you sure you want to delete reservation ID: {reservation_id}?",
-            parent=self
-        )
+        if len(reservation_ids) == 1:
+            question = f"Are you sure you want to delete reservation ID: {reservation_ids[0]}?"
+        else:
+            question = f"Are you sure you want to delete the {len(reservation_ids)} selected reservations?"
+        confirm = messagebox.askyesno("Confirm Delete", question, parent=self)
 
         if confirm:
-            try:
-                if not self.db_conn or getattr(self.db_conn, 'closed', False):
-                     messagebox.showerror("Database Error", "Database connection is not available.", parent=self)
-                     return
-
-                success = database.delete_reservation(self.db_conn, reservation_id)
-                if success:
-                    messagebox.showinfo("Success", f"Reservation ID: {reservation_id} deleted successfully.", parent=self)
-                    self.status_label.config(text=f"Reservation ID: {reservation_id} deleted.", foreground="green")
-                    self.load_reservations() 
-                else:
-                    messagebox.showerror("Delete Error", f"Failed to delete reservation ID: {reservation_id}.", parent=self)
-                    self.status_label.config(text=f"Error deleting reservation ID: {reservation_id}.", foreground="red")
-            except Exception as e:
-                messagebox.showerror("Delete Error", f"An error occurred: {e}", parent=self)
-                self.status_label.config(text=f"Error: {e}", foreground="red")
-                print(f"Error deleting reservation: {e}")
-
-    def refresh_db_connection(self, new_conn):
-        self.db_conn = new_conn
-        print("ReservationsPage: Database connection refreshed.")
+            self.loading_indicator.show()
+            self.status_label.config(text=f"Deleting {describe_reservations(reservation_ids)}...", foreground="black")
+            self.executor.submit(self, self.service.delete_reservations, reservation_ids,
+                                 on_success=lambda deleted: self.on_reservations_deleted(reservation_ids, deleted),
+                                 on_error=self.on_delete_error,
+                                 cancellable=False)
+
+    def on_reservations_deleted(self, reservation_ids, deleted):
+        self.loading_indicator.hide()
+        description = describe_reservations(reservation_ids)
+        if deleted is None:
+            messagebox.showerror("Delete Error", f"Failed to delete {description}. Nothing was deleted.", parent=self)
+            self.status_label.config(text=f"Error deleting {description}.", foreground="red")
+            return
+        messagebox.showinfo("Success", f"Deleted {description}.", parent=self)
+        self.status_label.config(text=f"Deleted {description}.", foreground="green")
+        self.apply_batch_result({reservation_id: None for reservation_id in reservation_ids})
+
+    def on_delete_error(self, error):
+        self.loading_indicator.hide()
+        messagebox.showerror("Delete Error", f"An error occurred: {error}", parent=self)
+        self.status_label.config(text=f"Error: {error}", foreground="red")
+        print(f"Error deleting reservation: {error}")
+
+    def reschedule_selected_reservations(self):
+        reservation_ids = self.get_selected_reservation_ids()
+        if not reservation_ids:
+            return
+        date = simpledialog.askstring(
+            "Reschedule", f"New date (YYYY-MM-DD) for {describe_reservations(reservation_ids)}:", parent=self)
+        if date is None:
+            return
+        date = date.strip()
+        if database.date_to_day(date) is None:
+            messagebox.showerror("Input Error", f"'{date}' is not a date in YYYY-MM-DD format.", parent=self)
+            return
+        self.move_reservations(reservation_ids, date=date)
+
+    def move_selected_to_flight(self):
+        reservation_ids = self.get_selected_reservation_ids()
+        if not reservation_ids:
+            return
+        flight_number = simpledialog.askstring(
+            "Move to Flight", f"New flight number for {describe_reservations(reservation_ids)}:", parent=self)
+        if flight_number is None:
+            return
+        flight_number = flight_number.strip()
+        if not flight_number:
+            messagebox.showerror("Input Error", "Please enter a flight number.", parent=self)
+            return
+        self.move_reservations(reservation_ids, flight_number=flight_number)
+
+    def move_reservations(self, reservation_ids, flight_number=None, date=None):
+        # One transaction for the whole group: if any seat is unavailable on
+        # the new flight or date, no reservation is changed.
+        self.loading_indicator.show()
+        self.status_label.config(text=f"Moving {describe_reservations(reservation_ids)}...", foreground="black")
+        self.executor.submit(self, self.service.move_reservations, reservation_ids, flight_number, date,
+                             on_success=self.on_reservations_moved,
+                             on_error=self.on_move_error,
+                             cancellable=False)
+
+    def on_reservations_moved(self, rows):
+        self.loading_indicator.hide()
+        self.status_label.config(text=f"Moved {describe_reservations([row[0] for row in rows])}.",
+                                 foreground="green")
+        self.apply_batch_result({row[0]: row for row in rows})
+
+    def on_move_error(self, error):
+        self.loading_indicator.hide()
+        messagebox.showerror("Move Error", f"{error}\nNo reservations were changed.", parent=self)
+        self.status_label.config(text=f"Error: {error}", foreground="red")
+        print(f"Error moving reservations: {error}")
+
+    def apply_batch_result(self, changes):
+        # Patches only the rows a bulk operation touched instead of reloading
+        # the list. Virtual scrolling re-fetches just the rows in view.
+        if self.virtual_tree.active:
+            self.virtual_tree.selected_keys.difference_update(
+                reservation_id for reservation_id, row in changes.items() if row is None)
+            self.load_virtual_reservations()
+            return
+        self.apply_changes(changes, allow_insert=False)
+        self.update_pager()
+
+    def export_reservations(self):
+        export_filter = ExportFilterDialog(self, self.export_filter).result
+        if export_filter is None:
+            return
+        self.export_filter = export_filter
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export Reservations",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON lines", "*.jsonl")]
+        )
+        if not path:
+            return
+
+        self.export_button.config(state=tk.DISABLED)
+        self.loading_indicator.show()
+        self.status_label.config(text=f"Exporting {describe_export_filter(*export_filter)} to {path}...",
+                                 foreground="black")
+        self.executor.submit(self, self.service.export_reservations, path, None, *export_filter,
+                             on_success=lambda count: self.on_export_finished(path, count),
+                             on_error=self.on_export_error,
+                             cancellable=False)
+
+    def on_export_finished(self, path, count):
+        self.export_button.config(state=tk.NORMAL)
+        self.loading_indicator.hide()
+        self.status_label.config(text=f"Exported {count} reservations to {path}.", foreground="green")
+
+    def on_export_error(self, error):
+        self.export_button.config(state=tk.NORMAL)
+        self.loading_indicator.hide()
+        messagebox.showerror("Export Error", f"Failed to export reservations: {error}", parent=self)
+        self.status_label.config(text=f"Error exporting reservations: {error}", foreground="red")
+        print(f"Error exporting reservations: {error}")
 
     def on_show(self):
         print("ReservationsPage is now visible. Refreshing list.")
-        self.load_reservations()
+        self.active_search = self.search_var.get().strip()
+        if self.active_search:
+            self.virtual_tree.deactivate()
+        elif self.virtual_mode.get() and not self.virtual_tree.active:
+            self.activate_virtual_tree()
+            self.loaded_view = None
+        self.refresh_changes()
+
+    def on_hide(self):
+        if self.search_after_id is not None:
+            self.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        self.executor.cancel(self)
+        self.loading_indicator.hide()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -187,9 +784,9 @@ if __name__ == "__main__":
     root.geometry("900x600") 
 
     database.initialize_database()
-    test_db_conn = database.create_connection()
+    test_data_access = DataAccess()
 
-    if not test_db_conn:
+    if not test_data_access.check():
         print("Failed to connect to the database for testing. Exiting.")
         exit()
     
@@ -208,7 +805,9 @@ if __name__ == "__main__":
         edit_window.geometry("400x300")
         tk.Label(edit_window, text=f"This is the edit page for reservation ID: {res_id}.").pack(padx=20, pady=20)
 
-    reservations_page_frame = ReservationsPage(root, dummy_show_home, dummy_show_edit, test_db_conn)
+    test_executor = DatabaseExecutor(root)
+    reservations_page_frame = ReservationsPage(root, dummy_show_home, dummy_show_edit, test_data_access,
+                                               test_executor)
     reservations_page_frame.grid(row=0, column=0, sticky="nsew")
     root.grid_rowconfigure(0, weight=1)
     root.grid_columnconfigure(0, weight=1)
@@ -216,9 +815,9 @@ if __name__ == "__main__":
     reservations_page_frame.on_show() 
 
     def on_closing():
-        if test_db_conn:
-            test_db_conn.close()
-            print("Test database connection closed.")
+        test_executor.shutdown()
+        test_data_access.close()
+        print("Test database connections closed.")
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -0,0 +1,206 @@
+# seat_inventory.py
+import database
+from validation import normalize_seat, parse_seat
+
+DEFAULT_SEAT_ROWS = 30
+DEFAULT_SEAT_LETTERS = "ABCDEF"
+
+# Timed while instrumentation is on (see instrumentation.register_module).
+INSTRUMENTED_CALLS = ("load_seat_map", "claim_seat", "move_reservations", "write_claim", "write_move")
+
+class SeatUnavailableError(Exception):
+    pass
+
+class SeatMap:
+    # Occupancy of one flight on one date, kept as a single int bitmap with one
+    # bit per seat in row-major order.
+    def __init__(self, flight_number, date, seat_rows=DEFAULT_SEAT_ROWS, seat_letters=DEFAULT_SEAT_LETTERS):
+        self.flight_number = flight_number
+        self.date = date
+        self.seat_rows = seat_rows
+        self.seat_letters = seat_letters
+        self.occupied = 0
+
+    def capacity(self):
+        return self.seat_rows * len(self.seat_letters)
+
+    def seat_index(self, seat_number):
+        parsed = parse_seat(seat_number)
+        if parsed is None:
+            return None
+        row, letter = parsed
+        if not 1 <= row <= self.seat_rows or letter not in self.seat_letters:
+            return None
+        return (row - 1) * len(self.seat_letters) + self.seat_letters.index(letter)
+
+    def has_seat(self, seat_number):
+        return self.seat_index(seat_number) is not None
+
+    def is_occupied(self, seat_number):
+        index = self.seat_index(seat_number)
+        return index is not None and bool(self.occupied >> index & 1)
+
+    def occupy(self, seat_number):
+        index = self.seat_index(seat_number)
+        if index is not None:
+            self.occupied |= 1 << index
+
+    def release(self, seat_number):
+        index = self.seat_index(seat_number)
+        if index is not None:
+            self.occupied &= ~(1 << index)
+
+    def occupied_count(self):
+        return bin(self.occupied).count("1")
+
+    def available_count(self):
+        return self.capacity() - self.occupied_count()
+
+def get_seat_layout(conn, flight_number, date):
+    cursor = conn.cursor()
+    cursor.execute("SELECT seat_rows, seat_letters FROM seat_maps WHERE flight_number=? AND date=?",
+                   (flight_number, date))
+    row = cursor.fetchone()
+    if row is None:
+        return DEFAULT_SEAT_ROWS, DEFAULT_SEAT_LETTERS
+    return row
+
+def set_seat_layout(conn, flight_number, date, seat_rows, seat_letters):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("INSERT OR REPLACE INTO seat_maps(flight_number, date, seat_rows, seat_letters) "
+                       "VALUES(?,?,?,?)", (flight_number, date, seat_rows, seat_letters.upper()))
+        conn.commit()
+        return True
+    except database.Error as e:
+        print(f"Error setting seat layout: {e}")
+        return False
+
+def load_seat_map(conn, flight_number, date):
+    seat_map = SeatMap(flight_number, date, *get_seat_layout(conn, flight_number, date))
+    # Served entirely from the unique (flight_id, day, seat) index; seats are
+    # packed integers since schema version 3.
+    for seat_number in database.get_booked_seats(conn.cursor(), flight_number, date):
+        seat_map.occupy(seat_number)
+    return seat_map
+
+def write_claim(cursor, reservation_details, reservation_id=None):
+    # Checks the seat and writes the booking (or the change to one) with the
+    # caller's cursor, inside the caller's write transaction.
+    name, flight_number, departure, destination, date, seat_number = reservation_details
+    seat_number = normalize_seat(seat_number) or seat_number
+    reservation_details = (name, flight_number, departure, destination, date, seat_number)
+
+    unchanged = False
+    if reservation_id is not None:
+        cursor.execute("SELECT flight_number, date, seat_number FROM reservations WHERE id=?", (reservation_id,))
+        current = cursor.fetchone()
+        if current is None:
+            raise SeatUnavailableError(f"Reservation ID: {reservation_id} no longer exists.")
+        unchanged = current == (flight_number, date, seat_number)
+
+    if not unchanged:
+        seat_rows, seat_letters = get_seat_layout(cursor.connection, flight_number, date)
+        if SeatMap(flight_number, date, seat_rows, seat_letters).seat_index(seat_number) is None:
+            raise SeatUnavailableError(
+                f"Seat {seat_number} does not exist on flight {flight_number} "
+                f"(rows 1-{seat_rows}, seats {seat_letters}).")
+        holder = database.find_seat_holder(cursor, flight_number, date, seat_number)
+        if holder is not None and holder != reservation_id:
+            raise SeatUnavailableError(f"Seat {seat_number} on flight {flight_number} ({date}) is already booked.")
+
+    if reservation_id is None:
+        return database.insert_booking(cursor, reservation_details)
+    database.update_booking(cursor, reservation_id, reservation_details)
+    return reservation_id
+
+def claim_seat(conn, reservation_details, reservation_id=None):
+    # The check and the write share one BEGIN IMMEDIATE transaction, which
+    # takes SQLite's write lock before the check, so another connection or
+    # app instance cannot claim the same seat in between; it waits instead.
+    return database.run_write(conn, write_claim, reservation_details, reservation_id)
+
+def write_move(cursor, reservation_ids, flight_number=None, date=None):
+    # Every seat must exist on the new seat map and be free (or held by a
+    # booking that moves too); otherwise nothing is changed.
+    conn = cursor.connection
+    moving = set(reservation_ids)
+    rows = database.get_reservations_by_ids(conn, moving)
+    layouts = {}
+    claimed = set()
+    problems = []
+    for row in rows:
+        target_flight, target_date, seat_number = flight_number or row[2], date or row[5], row[6]
+        seat_map = layouts.get((target_flight, target_date))
+        if seat_map is None:
+            seat_map = SeatMap(target_flight, target_date, *get_seat_layout(conn, target_flight, target_date))
+            layouts[(target_flight, target_date)] = seat_map
+        if not seat_map.has_seat(seat_number):
+            problems.append(f"seat {seat_number} does not exist on flight {target_flight} ({target_date})")
+            continue
+        holder = database.find_seat_holder(cursor, target_flight, target_date, seat_number)
+        if (target_flight, target_date, seat_number) in claimed or (holder is not None and holder not in moving):
+            problems.append(f"seat {seat_number} on flight {target_flight} ({target_date}) is already booked")
+        claimed.add((target_flight, target_date, seat_number))
+    if problems:
+        more = f" and {len(problems) - 5} more" if len(problems) > 5 else ""
+        raise SeatUnavailableError(f"Cannot move {len(problems)} of {len(rows)} reservations: "
+                                   + "; ".join(problems[:5]) + more + ".")
+    return database.move_bookings(cursor, [row[0] for row in rows], flight_number, date)
+
+def move_reservations(conn, reservation_ids, flight_number=None, date=None):
+    # Moves a group of bookings to another flight and/or date, each keeping
+    # its seat, in one BEGIN IMMEDIATE transaction. Returns the number moved.
+    return database.run_write(conn, write_move, reservation_ids, flight_number, date)
+
+def book_seat(conn, reservation_details):
+    return claim_seat(conn, reservation_details)
+
+def change_reservation(conn, reservation_id, updated_details):
+    return claim_seat(conn, updated_details, reservation_id)
+
+class SeatInventory:
+    # Per-connection cache of seat maps for instant checks on the UI thread.
+    # PRAGMA data_version changes whenever any other connection (including
+    # other app instances) commits, which is when cached maps are dropped.
+    def __init__(self, conn):
+        self.conn = conn
+        self.seat_maps = {}
+        self.data_version = None
+
+    def current_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def get(self, flight_number, date):
+        data_version = self.current_data_version()
+        if data_version != self.data_version:
+            self.seat_maps.clear()
+            self.data_version = data_version
+        key = (flight_number, date)
+        seat_map = self.seat_maps.get(key)
+        if seat_map is None:
+            seat_map = load_seat_map(self.conn, flight_number, date)
+            self.seat_maps[key] = seat_map
+        return seat_map
+
+    def check(self, flight_number, date, seat_number, current_booking=None):
+        # Returns an error message, or None when the seat can be booked. The
+        # transaction in claim_seat stays the authority; this is only a hint.
+        # current_booking is the (flight_number, date, seat_number) the
+        # reservation being edited already holds, which it may keep.
+        if current_booking is not None:
+            current_flight, current_date, current_seat = current_booking
+            if (current_flight, current_date) == (flight_number, date) and \
+                    (normalize_seat(current_seat) or current_seat) == (normalize_seat(seat_number) or seat_number):
+                return None
+        seat_map = self.get(flight_number, date)
+        if not seat_map.has_seat(seat_number):
+            return (f"Seat {seat_number} does not exist on flight {flight_number} "
+                    f"(rows 1-{seat_map.seat_rows}, seats {seat_map.seat_letters}).")
+        if seat_map.is_occupied(seat_number):
+            return f"Seat {normalize_seat(seat_number)} on flight {flight_number} ({date}) is already booked."
+        return None
+
+    def describe(self, flight_number, date):
+        seat_map = self.get(flight_number, date)
+        return f"{seat_map.available_count()} of {seat_map.capacity()} seats free on {flight_number} ({date})."
@@ -0,0 +1,257 @@
+# service.py
+import queue
+import threading
+from contextlib import contextmanager
+import database
+import instrumentation
+import seat_inventory
+from cache import MISSING, ReservationCache
+
+class PoolTimeoutError(Exception):
+    pass
+
+class ConnectionPool:
+    # Bounded pool of connections shared by threads. Connections are opened
+    # lazily up to `size`; callers beyond that wait up to `timeout` seconds.
+    # An idle connection is health-checked before it is handed out and
+    # replaced by a fresh one if it no longer works.
+    def __init__(self, size=4, config=None, timeout=10.0):
+        self.size = size
+        self.config = config
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def acquire(self):
+        if self.closed:
+            raise database.Error("Connection pool is closed.")
+        try:
+            return self.checked(self.idle.get_nowait())
+        except queue.Empty:
+            pass
+        with self.lock:
+            if self.created < self.size:
+                conn = database.create_connection(self.config, check_same_thread=False)
+                if conn is None:
+                    raise database.Error("Cannot create the database connection.")
+                self.created += 1
+                return conn
+        try:
+            conn = self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeoutError(f"No database connection free after {self.timeout:.1f}s.")
+        return self.checked(conn)
+
+    def checked(self, conn):
+        if database.connection_is_usable(conn):
+            return conn
+        instrumentation.count("pool_reconnects")
+        try:
+            conn.close()
+        except database.Error:
+            pass
+        replacement = database.create_connection(self.config, check_same_thread=False)
+        if replacement is None:
+            with self.lock:
+                self.created -= 1
+            raise database.Error("Cannot reopen the database connection.")
+        return replacement
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self.closed:
+            conn.close()
+            return
+        self.idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        with instrumentation.timer("service.pool_acquire"):
+            conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class ReservationService:
+    # UI-independent entry point for every reservation operation. The Tk pages
+    # (through DatabaseExecutor) and the HTTP API in api_server.py both call
+    # these methods; each call borrows a pooled connection for its duration.
+    # Reads go through a ReservationCache, so revisiting a page or opening a
+    # row that was just listed is served from memory. Writes use `pool`, or
+    # the write_queue.WriteQueue when one is given (group commit); reads use
+    # `read_pool` when one is given (e.g. read-only connections).
+    def __init__(self, pool=None, cache=None, read_pool=None, write_queue=None):
+        self.pool = pool or ConnectionPool()
+        self.read_pool = read_pool or self.pool
+        self.cache = cache or ReservationCache()
+        self.write_queue = write_queue
+        # (sort column, descending) -> (change version, sampled sort keys).
+        self.window_samples = {}
+
+    def close(self):
+        if self.write_queue is not None:
+            self.write_queue.close()
+        self.pool.close()
+        if self.read_pool is not self.pool:
+            self.read_pool.close()
+
+    def write(self, write, *args):
+        # Runs write(cursor, *args) in its own transaction, retried while the
+        # database is locked (see database.run_write).
+        if self.write_queue is not None:
+            return self.write_queue.call(write, *args)
+        with self.pool.connection() as conn:
+            return database.run_write(conn, write, *args)
+
+    def read_through(self, key, load):
+        # Returns (version, value) from the cache, or from load(conn) on a miss.
+        # Past the cache's max age it first syncs with the change log, so
+        # writes made through other connections are seen.
+        if self.cache.is_fresh():
+            version, value = self.cache.lookup(key)
+            if value is not MISSING:
+                return version, value
+            with self.read_pool.connection() as conn:
+                return self.load_and_store(conn, key, load)
+        with self.read_pool.connection() as conn:
+            self.cache.sync(conn)
+            version, value = self.cache.lookup(key)
+            if value is not MISSING:
+                return version, value
+            return self.load_and_store(conn, key, load)
+
+    def load_and_store(self, conn, key, load):
+        version = database.get_change_version(conn)
+        value = load(conn)
+        self.cache.store(key, value, version)
+        return version, value
+
+    def add_reservation(self, reservation_details):
+        reservation_id = self.write(seat_inventory.write_claim, reservation_details)
+        self.cache.invalidate({reservation_id: (reservation_id,) + tuple(reservation_details)})
+        return reservation_id
+
+    def update_reservation(self, reservation_id, updated_details):
+        try:
+            result = self.write(seat_inventory.write_claim, updated_details, reservation_id)
+        except BaseException:
+            # The row is unchanged, or in an unknown state; either way the
+            # next read goes to the database.
+            self.cache.invalidate({reservation_id: None})
+            raise
+        self.cache.invalidate({reservation_id: (reservation_id,) + tuple(updated_details)})
+        return result
+
+    def delete_reservation(self, reservation_id):
+        try:
+            self.write(database.delete_booking, reservation_id)
+            deleted = True
+        except database.Error as e:
+            print(f"Error deleting reservation: {e}")
+            deleted = False
+        self.cache.invalidate({reservation_id: None})
+        return deleted
+
+    def delete_reservations(self, reservation_ids):
+        # How many existed, or None if nothing was deleted because of an error.
+        try:
+            deleted = self.write(database.delete_bookings, reservation_ids)
+        except database.Error as e:
+            print(f"Error deleting reservations: {e}")
+            deleted = None
+        self.cache.invalidate({reservation_id: None for reservation_id in reservation_ids})
+        return deleted
+
+    def move_reservations(self, reservation_ids, flight_number=None, date=None):
+        # Returns the moved rows as they are now, so a list can patch them in place.
+        self.write(seat_inventory.write_move, reservation_ids, flight_number, date)
+        with self.read_pool.connection() as conn:
+            rows = database.get_reservations_by_ids(conn, reservation_ids)
+        self.cache.invalidate({row[0]: row for row in rows})
+        return rows
+
+    def get_reservation(self, reservation_id):
+        return self.read_through(("record", reservation_id),
+                                 lambda conn: database.get_reservation_by_id(conn, reservation_id))[1]
+
+    # The list-style reads also return the change-log version, read before
+    # the rows, so a client can later ask for just the changes since then.
+    def list_reservations(self, page_size=database.DEFAULT_PAGE_SIZE, cursor=None):
+        version, (rows, next_cursor) = self.read_through(
+            ("page", page_size, cursor), lambda conn: database.get_reservations_page(conn, page_size, cursor))
+        return version, rows, next_cursor
+
+    def get_reservations_window(self, offset, limit, after_id=None):
+        if after_id is not None:
+            return self.list_reservations(limit, after_id)[1]
+        return self.read_through(("window", offset, limit), lambda conn: database.get_reservations_window(
+            conn, offset, limit, self.sort_samples(conn, "id", True)))[1]
+
+    def get_sorted_window(self, sort_column, descending, offset, limit, after_row=None):
+        # Rows in SQL index order (see database.SORT_KEYS): a keyset page after
+        # after_row when the caller has it, otherwise a window seeking from
+        # the sampled keys.
+        if after_row is not None:
+            key = ("window", sort_column, descending, tuple(after_row), limit)
+            load = lambda conn: database.get_sorted_reservations_page(conn, sort_column, descending, limit, after_row)
+        else:
+            key = ("window", sort_column, descending, offset, limit)
+            load = lambda conn: database.get_sorted_reservations_window(
+                conn, sort_column, descending, offset, limit, self.sort_samples(conn, sort_column, descending))
+        return self.read_through(key, load)[1]
+
+    def sort_samples(self, conn, sort_column, descending):
+        # Seek points for offset windows, sampled once and reused until
+        # WINDOW_SAMPLE_STEP changes have been logged since: until then a
+        # window lands at most about a step away from its exact position.
+        version = database.get_change_version(conn)
+        sampled = self.window_samples.get((sort_column, descending))
+        if sampled is None or not 0 <= version - sampled[0] < database.WINDOW_SAMPLE_STEP:
+            sampled = (version, database.sample_sort_keys(conn, sort_column, descending))
+            self.window_samples[(sort_column, descending)] = sampled
+        return sampled[1]
+
+    def count_reservations(self):
+        return self.read_through(("count",), database.count_reservations)
+
+    def search_reservations(self, text, limit=database.SEARCH_RESULT_LIMIT):
+        return self.read_through(("search", text, limit),
+                                 lambda conn: database.search_reservations(conn, text, limit))
+
+    def get_changes_since(self, version):
+        with self.read_pool.connection() as conn:
+            self.cache.sync(conn)
+            return database.get_changes_since(conn, version)
+
+    def load_store(self, date_from=None, date_to=None, flight_number=None):
+        # A compact_store.ReservationStore snapshot of the matching rows; not
+        # cached, since a snapshot is already a private copy.
+        import compact_store
+        with self.read_pool.connection() as conn:
+            return compact_store.load_store(conn, date_from, date_to, flight_number)
+
+    def seat_map(self, flight_number, date):
+        with self.read_pool.connection() as conn:
+            return seat_inventory.load_seat_map(conn, flight_number, date)
+
+    def reports_dashboard(self, date_from=None, date_to=None, flight_number=None):
+        import reporting
+        with self.read_pool.connection() as conn:
+            return reporting.dashboard(conn, date_from, date_to, flight_number)
+
+    def export_reservations(self, path, file_format=None, date_from=None, date_to=None, flight_number=None):
+        import export
+        with self.read_pool.connection() as conn:
+            return export.export_reservations(conn, path, file_format, date_from, date_to, flight_number)
@@ -0,0 +1,95 @@
+# test_api_server.py
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import database
+from api_server import MAX_BODY_BYTES, ApiServer
+from service import ConnectionPool, ReservationService
+
+JANE = {"name": "Jane Doe", "flight_number": "FL100", "departure": "Cairo", "destination": "London",
+        "date": "2025-01-01", "seat_number": "12C"}
+
+class ApiServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        config = database.DatabaseConfig(path=os.path.join(directory.name, "flights.db"))
+        database.initialize_database(config)
+        self.service = ReservationService(ConnectionPool(config=config))
+        self.server = ApiServer(self.service, port=0, workers=2)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        self.server.server.close()
+        await self.server.server.wait_closed()
+        self.server.close()
+        self.service.close()
+
+    async def send(self, head, body=b""):
+        # One request on its own connection; returns (status, JSON payload).
+        reader, writer = await asyncio.open_connection(self.server.host, self.server.port)
+        try:
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        status_line, _, rest = response.partition(b"\r\n")
+        return int(status_line.split()[1]), json.loads(rest.partition(b"\r\n\r\n")[2])
+
+    async def request(self, method, path, payload=None):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        return await self.send(f"{method} {path} HTTP/1.1\r\nConnection: close\r\n"
+                               f"Content-Length: {len(body)}\r\n\r\n", body)
+
+    async def test_create_and_read_back(self):
+        status, created = await self.request("POST", "/reservations", JANE)
+        self.assertEqual(status, 201)
+        self.assertEqual(created, dict(JANE, id=created["id"]))
+        self.assertEqual(await self.request("GET", f"/reservations/{created['id']}"), (200, created))
+
+    async def test_taken_seat_is_a_conflict(self):
+        await self.request("POST", "/reservations", JANE)
+        status, payload = await self.request("POST", "/reservations", dict(JANE, name="John Roe"))
+        self.assertEqual(status, 409)
+        self.assertIn("already booked", payload["error"])
+
+    async def test_invalid_details_are_rejected(self):
+        for payload in (dict(JANE, date="2025-02-30"), dict(JANE, seat_number="window"),
+                        {key: value for key, value in JANE.items() if key != "name"}, ["not", "an", "object"]):
+            with self.subTest(payload=payload):
+                self.assertEqual((await self.request("POST", "/reservations", payload))[0], 400)
+
+    async def test_status_codes(self):
+        cases = [
+            ("GET", "/reservations/999", 404),
+            ("GET", "/reservations/abc", 400),
+            ("PUT", "/reservations/999", 400),
+            ("DELETE", "/reservations/999", 404),
+            ("GET", "/nowhere", 404),
+            ("DELETE", "/reservations", 405),
+            ("GET", "/reservations?limit=0", 400),
+            ("GET", "/reservations?limit=1001", 400),
+            ("GET", "/reservations?limit=5", 200),
+            ("GET", "/search", 400),
+            ("GET", "/search?q=jane&limit=-1", 400),
+            ("GET", "/changes", 400),
+            ("GET", "/health", 200),
+        ]
+        for method, path, expected in cases:
+            with self.subTest(method=method, path=path):
+                self.assertEqual((await self.request(method, path))[0], expected)
+
+    async def test_malformed_requests(self):
+        self.assertEqual((await self.send("POST /reservations HTTP/1.1\r\nConnection: close\r\n"
+                                          "Content-Length: 3\r\n\r\n", b"{x}"))[0], 400)
+        self.assertEqual((await self.send("GET /health HTTP/1.1\r\nContent-Length: -1\r\n\r\n"))[0], 400)
+        self.assertEqual((await self.send("GET /health HTTP/1.1\r\nContent-Length: x\r\n\r\n"))[0], 400)
+        self.assertEqual((await self.send(f"POST /reservations HTTP/1.1\r\n"
+                                          f"Content-Length: {MAX_BODY_BYTES + 1}\r\n\r\n"))[0], 413)
+        self.assertEqual((await self.send("BROKEN\r\n\r\n"))[0], 400)
+
+if __name__ == "__main__":
+    unittest.main()
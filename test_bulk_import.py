@@ -0,0 +1,77 @@
+# test_bulk_import.py
+import io
+import os
+import tempfile
+import unittest
+import bulk_import
+import database
+
+HEADER = "name,flight_number,departure,destination,date,seat_number\n"
+
+class BulkImportTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "flights.db")
+        self.conn = database.create_connection(database.DatabaseConfig(path=path))
+        self.addCleanup(self.conn.close)
+        database.create_table(self.conn)
+
+    def import_text(self, text, file_format="csv", **kwargs):
+        records = bulk_import.READERS[file_format](io.StringIO(text))
+        return bulk_import.import_reservations(self.conn, records, **kwargs)
+
+    def test_valid_rows_are_imported(self):
+        report = self.import_text(HEADER + "Jane Doe,FL100,Cairo,London,2025-01-01,12c\n"
+                                           "John Roe,FL100,Cairo,London,2025-01-01,14A\n")
+        self.assertEqual((report.rows_read, report.rows_imported, report.errors), (2, 2, []))
+        self.assertEqual(database.get_reservations_page(self.conn)[0][1][1:],
+                         ("Jane Doe", "FL100", "Cairo", "London", "2025-01-01", "12C"))
+
+    def test_invalid_rows_are_rejected_with_their_line(self):
+        report = self.import_text(HEADER + "Jane Doe,FL100,Cairo,London,2025-01-01,12C\n"
+                                           "John Roe,FL100,Cairo,London,2025-13-01,14A\n"
+                                           "Ann Poe,FL100,Cairo,London,2025-01-01,window\n"
+                                           ",FL100,Cairo,London,2025-01-01,15A\n")
+        self.assertEqual(report.rows_imported, 1)
+        self.assertEqual([line_number for line_number, _ in report.errors], [3, 4, 5])
+        self.assertIn("Invalid date", report.errors[0][1])
+        self.assertIn("Invalid seat", report.errors[1][1])
+        self.assertIn("Missing value for 'name'", report.errors[2][1])
+
+    def test_taken_seats_only_reject_their_own_rows(self):
+        self.import_text(HEADER + "Jane Doe,FL100,Cairo,London,2025-01-01,12C\n")
+        report = self.import_text(HEADER + "John Roe,FL100,Cairo,London,2025-01-01,14A\n"
+                                           "Ann Poe,FL100,Cairo,London,2025-01-01,12C\n"
+                                           "Bob Low,FL100,Cairo,London,2025-01-01,14A\n"
+                                           "Eve Moe,FL100,Cairo,London,2025-01-01,15A\n", chunk_size=10)
+        self.assertEqual(report.rows_imported, 2)
+        self.assertEqual([line_number for line_number, _ in report.errors], [3, 4])
+        self.assertTrue(all("already booked" in message for _, message in report.errors))
+        self.assertEqual(database.count_reservations(self.conn), 3)
+
+    def test_missing_csv_columns_fail_the_import(self):
+        with self.assertRaisesRegex(ValueError, "seat_number"):
+            self.import_text("name,flight_number,departure,destination,date\nJane,FL1,A,B,2025-01-01\n")
+
+    def test_bad_json_lines_are_rejected(self):
+        report = self.import_text('{"name": "Jane Doe", "flight_number": "FL100", "departure": "Cairo", '
+                                  '"destination": "London", "date": "2025-01-01", "seat_number": "12C"}\n'
+                                  '{"name": \n'
+                                  '["a list"]\n', file_format="jsonl")
+        self.assertEqual(report.rows_imported, 1)
+        self.assertEqual([(line_number, message.split(":")[0]) for line_number, message in report.errors],
+                         [(2, "Invalid JSON"), (3, "Expected a JSON object")])
+
+    def test_large_imports_are_searchable_afterwards(self):
+        if not database.has_search_index(self.conn):
+            self.skipTest("SQLite built without FTS5")
+        rows = "".join(f"Passenger {number},FL100,Cairo,London,2025-01-01,{number + 1}A\n" for number in range(300))
+        report = self.import_text(HEADER + rows, chunk_size=50, defer_search_index_rows=100)
+        self.assertEqual(report.errors, [])
+        self.assertTrue(database.has_search_trigger(self.conn))
+        self.assertEqual([row[1] for row in database.search_reservations(self.conn, "Passenger 299")],
+                         ["Passenger 299"])
+
+if __name__ == "__main__":
+    unittest.main()
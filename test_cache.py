@@ -0,0 +1,36 @@
+# test_cache.py
+import unittest
+from cache import ReservationCache
+
+def row(reservation_id):
+    return (reservation_id, "Jane Doe", "FL100", "Cairo", "London", "2025-01-01", f"{reservation_id}A")
+
+class ReservationCacheTest(unittest.TestCase):
+    def test_queries_not_kept_leave_no_bookkeeping(self):
+        cache = ReservationCache(max_queries=0)
+        cache.version = 1
+        for number in range(1000):
+            cache.store(("search", f"text {number}", 10), [row(number + 1)], 1)
+        self.assertEqual(len(cache.queries), 0)
+        self.assertEqual(cache.query_ids, {})
+        self.assertEqual(cache.id_queries, {})
+
+    def test_evicted_queries_are_forgotten(self):
+        cache = ReservationCache(max_queries=2)
+        cache.version = 1
+        for number in range(5):
+            cache.store(("search", f"text {number}", 10), [row(number + 1)], 1)
+        self.assertEqual(set(cache.query_ids), set(cache.queries.keys()))
+        self.assertEqual(set(cache.id_queries), {4, 5})
+
+    def test_storing_a_query_again_replaces_its_ids(self):
+        cache = ReservationCache()
+        cache.version = 1
+        key = ("search", "jane", 10)
+        cache.store(key, [row(1), row(2)], 1)
+        cache.store(key, [row(3)], 1)
+        self.assertEqual(cache.query_ids, {key: [3]})
+        self.assertEqual(cache.id_queries, {3: {key}})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# test_compact_store.py
+import unittest
+from compact_store import ReservationStore
+
+ROWS = [
+    (1, "Jane Doe", "FL200", "Cairo", "London", "2025-03-01", "12C"),
+    (2, "bob Low", "FL100", "Paris", "Rome", "2025-01-15", "1A"),
+    (3, "Ann Poe", "FL100", "Cairo", "Rome", "2024-12-31", "2B"),
+    (4, "Jane Doe", "FL300", "Oslo", "London", "01/02/2025", "3D"),
+]
+
+class ReservationStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ReservationStore(ROWS)
+
+    def ids(self, indices):
+        return [self.store.ids[index] for index in indices]
+
+    def test_rows_round_trip(self):
+        self.assertEqual(list(self.store.rows()), ROWS)
+        self.assertEqual(len(self.store.names.values), 3)
+
+    def test_sort_by_string_column_ignores_case(self):
+        self.assertEqual(self.ids(self.store.sort_indices("name")), [3, 2, 1, 4])
+        self.assertEqual(self.ids(self.store.sort_indices("name", reverse=True)), [1, 4, 2, 3])
+
+    def test_sort_by_date_orders_days(self):
+        # Text that is not a date sorts before every date.
+        self.assertEqual(self.ids(self.store.sort_indices("date")), [4, 3, 2, 1])
+
+    def test_sort_keys_follow_changes(self):
+        self.store.sort_indices("flight_number")
+        self.store.update((2, "bob Low", "FL999", "Paris", "Rome", "2025-01-15", "1A"))
+        self.assertEqual(self.ids(self.store.sort_indices("flight_number")), [3, 1, 4, 2])
+        self.store.remove(3)
+        self.assertEqual(self.ids(self.store.sort_indices("flight_number")), [1, 4, 2])
+
+    def test_filter_indices_matches_substrings(self):
+        self.assertEqual(self.ids(self.store.filter_indices({"name": "JANE"})), [1, 4])
+        self.assertEqual(self.ids(self.store.filter_indices({"name": "jane", "destination": "lon",
+                                                             "date": "2025-03"})), [1])
+        self.assertEqual(self.ids(self.store.filter_indices({"id": "3"})), [3])
+        self.assertEqual(self.ids(self.store.filter_indices({"departure": "nowhere"})), [])
+
+    def test_select_combines_filters(self):
+        self.assertEqual(self.ids(self.store.select(flight_number="FL100")), [2, 3])
+        self.assertEqual(self.ids(self.store.select(date_from="2025-01-01", date_to="2025-01-31")), [2])
+        self.assertEqual(self.ids(self.store.select(departure="Cairo", text="rome")), [3])
+        self.assertEqual(self.ids(self.store.select(flight_number="FL404")), [])
+
+    def test_select_with_a_bad_bound_matches_nothing(self):
+        self.assertEqual(self.ids(self.store.select(date_from="garbage")), [])
+        self.assertNotIn("garbage", self.store.dates.ordinals)
+
+    def test_insert_and_find(self):
+        self.store.insert(0, (5, "Zed Ko", "FL100", "Rome", "Oslo", "2025-05-05", "4A"))
+        self.assertEqual(self.store.row(0)[0], 5)
+        self.assertEqual(self.store.find(4), 4)
+        self.assertIsNone(self.store.find(99))
+
+if __name__ == "__main__":
+    unittest.main()
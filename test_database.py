@@ -0,0 +1,77 @@
+# test_database.py
+import os
+import tempfile
+import unittest
+import database
+
+JANE = ("Jane Doe", "FL100", "Cairo", "London", "2025-01-01", "12C")
+
+class ReservationWindowTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "flights.db")
+        self.conn = database.create_connection(database.DatabaseConfig(path=path))
+        self.addCleanup(self.conn.close)
+        database.create_table(self.conn)
+        rows = [(f"Passenger {number % 7}", f"FL{number % 3}", "Cairo", "London",
+                 f"2025-01-{number % 28 + 1:02d}", f"{number // 3 + 1}{'ABC'[number % 3]}") for number in range(100)]
+        self.conn.executemany(database.INSERT_RESERVATION_SQL, rows)
+        self.conn.commit()
+
+    def offset_window(self, sort_column, descending, offset, limit):
+        sql, params = database.sorted_reservations_sql(sort_column, descending, None)
+        return self.conn.execute(sql + " LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+
+    def test_sampled_windows_match_offset_windows(self):
+        for sort_column in database.SORT_KEYS:
+            for descending in (False, True):
+                samples = database.sample_sort_keys(self.conn, sort_column, descending, step=8)
+                self.assertEqual(len(samples), 100 // 8)
+                for offset in (0, 7, 8, 9, 50, 95):
+                    with self.subTest(sort_column=sort_column, descending=descending, offset=offset):
+                        window = database.get_sorted_reservations_window(self.conn, sort_column, descending, offset,
+                                                                         10, samples, step=8)
+                        self.assertEqual(window, self.offset_window(sort_column, descending, offset, 10))
+
+    def test_window_is_newest_first(self):
+        samples = database.sample_sort_keys(self.conn, "id", True)
+        rows = database.get_reservations_window(self.conn, 10, 5, samples)
+        self.assertEqual([row[0] for row in rows], [90, 89, 88, 87, 86])
+
+class RunWriteTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "flights.db")
+        self.conn = database.create_connection(database.DatabaseConfig(path=path))
+        self.addCleanup(self.conn.close)
+        database.create_table(self.conn)
+
+    def count(self):
+        return database.count_reservations(self.conn)
+
+    def test_commits_the_write(self):
+        reservation_id = database.run_write(self.conn, database.insert_booking, JANE)
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(database.get_reservation_by_id(self.conn, reservation_id), (reservation_id,) + JANE)
+
+    def test_failed_write_is_rolled_back(self):
+        def insert_then_fail(cursor):
+            database.insert_booking(cursor, JANE)
+            raise ValueError("failed")
+        with self.assertRaises(ValueError):
+            database.run_write(self.conn, insert_then_fail)
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self.count(), 0)
+
+    def test_refuses_to_commit_the_callers_transaction(self):
+        self.conn.execute(database.INSERT_RESERVATION_SQL, JANE)
+        with self.assertRaises(database.Error):
+            database.run_write(self.conn, database.insert_booking, JANE[:5] + ("1A",))
+        self.assertTrue(self.conn.in_transaction)
+        self.conn.rollback()
+        self.assertEqual(self.count(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
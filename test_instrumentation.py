@@ -0,0 +1,50 @@
+# test_instrumentation.py
+import os
+import tempfile
+import unittest
+import database
+import instrumentation
+
+JANE = ("Jane Doe", "FL100", "Cairo", "London", "2025-01-01", "12C")
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "flights.db")
+        self.conn = database.create_connection(database.DatabaseConfig(path=path))
+        self.addCleanup(self.conn.close)
+        database.create_table(self.conn)
+        self.addCleanup(instrumentation.recorder.reset)
+        self.addCleanup(instrumentation.disable)
+        instrumentation.register_module(database, database.INSTRUMENTED_ROW_QUERIES, database.INSTRUMENTED_CALLS)
+        instrumentation.enable()
+
+    def counters(self):
+        return instrumentation.recorder.snapshot()["counters"]
+
+    def test_only_the_query_and_write_api_is_wrapped(self):
+        self.assertIsNot(database.get_reservations_page, instrumentation.originals[(database, "get_reservations_page")])
+        self.assertNotIn((database, "id_chunks"), instrumentation.originals)
+        self.assertNotIn((database, "backoff_delays"), instrumentation.originals)
+
+    def test_rows_fetched_counts_only_reservation_rows(self):
+        ids = [database.add_reservation(self.conn, JANE[:5] + (f"{row}A",)) for row in range(1, 4)]
+        database.delete_reservations(self.conn, ids[2:])
+        self.assertNotIn("rows_fetched", self.counters())
+        database.get_reservations_by_ids(self.conn, ids)
+        database.get_reservation_by_id(self.conn, ids[0])
+        list(database.stream_reservations(self.conn))
+        database.get_reservations_window(self.conn, 0, 10)
+        self.assertEqual(self.counters()["rows_fetched"], 2 + 1 + 2 + 2)
+        self.assertIn("database.run_write", instrumentation.recorder.snapshot()["timings"])
+
+    def test_disable_puts_the_originals_back(self):
+        wrapped = database.get_reservations_page
+        original = instrumentation.originals[(database, "get_reservations_page")]
+        instrumentation.disable()
+        self.assertIsNot(database.get_reservations_page, wrapped)
+        self.assertIs(database.get_reservations_page, original)
+
+if __name__ == "__main__":
+    unittest.main()
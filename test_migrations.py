@@ -0,0 +1,101 @@
+# test_migrations.py
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import database
+import migrations
+
+def legacy_database(path, rows):
+    # A version 1 file as the original app left it.
+    conn = database.create_connection(database.DatabaseConfig(path=path))
+    migrations.create_base_tables(conn)
+    database.set_schema_version(conn, 1)
+    conn.executemany(database.INSERT_RESERVATION_SQL, rows)
+    conn.commit()
+    return conn
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "flights.db")
+
+    def migrate(self, conn, batch_size=migrations.DEFAULT_BATCH_SIZE):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return migrations.migrate(conn, batch_size)
+
+    def reservations(self, conn):
+        return conn.execute("SELECT * FROM reservations ORDER BY id").fetchall()
+
+    def test_new_database_reaches_the_current_version(self):
+        conn = database.create_connection(database.DatabaseConfig(path=self.path))
+        self.addCleanup(conn.close)
+        self.assertTrue(self.migrate(conn))
+        self.assertEqual(database.get_schema_version(conn), database.SCHEMA_VERSION)
+        self.assertEqual(migrations.table_type(conn, "reservations"), "view")
+
+    def test_legacy_rows_survive_both_steps(self):
+        rows = [
+            ("Jane Doe", "FL100", "Cairo", "London", "2025-01-01", "12C"),
+            ("John Roe", "FL100", "Cairo", "London", "2025-01-01", "2A"),
+            ("Ann Poe", "FL200", "Paris", "Rome", "01/02/2025", "window"),
+            ("Bob Low", "FL200", "Paris", "Rome", "2025-02-30", "10B"),
+        ]
+        conn = legacy_database(self.path, rows)
+        self.addCleanup(conn.close)
+        self.assertTrue(self.migrate(conn, batch_size=2))
+        self.assertEqual(database.get_schema_version(conn), 3)
+        self.assertEqual(self.reservations(conn), [(index + 1,) + row for index, row in enumerate(rows)])
+        self.assertEqual(migrations.table_columns(conn, "bookings")[-1], "seat")
+
+    def test_double_booked_seats_are_kept_aside(self):
+        rows = [(f"Passenger {number}", "FL1", "Cairo", "London", "2025-01-01", "12A") for number in range(5)]
+        rows.append(("Other", "FL1", "Cairo", "London", "2025-01-01", "12B"))
+        conn = legacy_database(self.path, rows)
+        self.addCleanup(conn.close)
+        self.assertTrue(self.migrate(conn, batch_size=2))
+        self.assertEqual(database.get_schema_version(conn), 3)
+        self.assertEqual(self.reservations(conn), [(1,) + rows[0], (6,) + rows[5]])
+        kept = conn.execute("SELECT * FROM conflicting_reservations ORDER BY id").fetchall()
+        self.assertEqual(kept, [(index + 1,) + rows[index] for index in range(1, 5)])
+        # Ids of the rows set aside are not handed out again.
+        conn.execute(database.INSERT_RESERVATION_SQL,
+                     ("New", "FL1", "Cairo", "London", "2025-01-01", "12C"))
+        conn.commit()
+        self.assertEqual(conn.execute("SELECT MAX(id) FROM bookings").fetchone()[0], 7)
+
+    def test_seats_that_collide_once_packed_keep_their_text(self):
+        rows = [("Jane Doe", "FL1", "Cairo", "London", "2025-01-01", seat) for seat in ("12A", "12a", " 12A")]
+        conn = legacy_database(self.path, rows)
+        self.addCleanup(conn.close)
+        self.assertTrue(self.migrate(conn))
+        self.assertEqual(self.reservations(conn), [(index + 1,) + row for index, row in enumerate(rows)])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM bookings WHERE seat > 0").fetchone()[0], 1)
+
+    def test_interrupted_copy_carries_on(self):
+        rows = [(f"Passenger {number}", "FL1", "Cairo", "London", "2025-01-01", f"{number % 3 + 1}A")
+                for number in range(9)]
+        conn = legacy_database(self.path, rows)
+        self.addCleanup(conn.close)
+        # Stop after the first batch of version 2, as a crash would.
+        copy_batch = migrations.copy_batch
+        calls = []
+        def failing_copy_batch(conn, low, high):
+            if calls:
+                raise database.Error("interrupted")
+            calls.append(low)
+            return copy_batch(conn, low, high)
+        migrations.copy_batch = failing_copy_batch
+        try:
+            self.assertFalse(self.migrate(conn, batch_size=4))
+        finally:
+            migrations.copy_batch = copy_batch
+        self.assertEqual(database.get_schema_version(conn), 1)
+        self.assertTrue(self.migrate(conn, batch_size=4))
+        self.assertEqual([row[0] for row in self.reservations(conn)], [1, 2, 3])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM conflicting_reservations").fetchone()[0], 6)
+
+if __name__ == "__main__":
+    unittest.main()
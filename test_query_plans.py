@@ -0,0 +1,102 @@
+# test_query_plans.py
+import os
+import tempfile
+import types
+import unittest
+import database
+from database import DEFAULT_PAGE_SIZE
+
+def explain_query_plan(conn, sql, params=()):
+    cursor = conn.cursor()
+    cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+    return [row[3] for row in cursor.fetchall()]
+
+def plan_uses_index(plan):
+    # A bare "SCAN bookings" walks the whole table; SEARCH steps and scans
+    # that go through an index (or the rowid) are what we expect from lookups.
+    # Scans of an FTS index, of a LIMITed subquery we materialized ourselves,
+    # and of the schema catalog are fine too.
+    materialized = {detail.split()[1] for detail in plan if detail.startswith(("MATERIALIZE", "CO-ROUTINE"))}
+    for detail in plan:
+        if not detail.startswith("SCAN"):
+            continue
+        target = detail.split()[1]
+        if " USING " in detail or "VIRTUAL TABLE INDEX" in detail:
+            continue
+        if target in materialized or target.startswith("sqlite_"):
+            continue
+        return False
+    return bool(plan)
+
+def indexed_query_samples():
+    details = ("Jane Doe", "FL100", "Cairo", "London", "2025-01-01", "1A")
+    return [
+        (database.get_reservation_by_id, (1,)),
+        (database.get_reservations_by_ids, ([1, 2, 3],)),
+        (database.get_reservations_page, (DEFAULT_PAGE_SIZE, 1000)),
+        (database.get_sorted_reservations_page, ("name", False, DEFAULT_PAGE_SIZE, (1,) + details)),
+        (database.get_sorted_reservations_page, ("flight_number", True, DEFAULT_PAGE_SIZE, (1,) + details)),
+        (database.get_sorted_reservations_page, ("date", False, DEFAULT_PAGE_SIZE, (1,) + details)),
+        (database.get_sorted_reservations_window, ("date", True, 0, DEFAULT_PAGE_SIZE)),
+        (database.get_sorted_reservations_window, ("name", False, 1500, DEFAULT_PAGE_SIZE, [("Jane Doe", 1)])),
+        (database.get_reservations_window, (1500, DEFAULT_PAGE_SIZE, [(1,)])),
+        (database.find_reservations_by_flight, ("FL100", "2025-01-01")),
+        (database.find_reservations_by_date, ("2025-01-01",)),
+        (database.find_reservations_by_name, ("Jane Doe",)),
+        (database.is_seat_taken, ("FL100", "2025-01-01", "1A")),
+        (database.search_reservations, ("Jane Cai",)),
+        (database.get_changes_since, (0,)),
+        (database.stream_reservations, ("2025-01-01", "2025-01-31")),
+        (database.stream_reservations, ("2025-01-01", "2025-01-31", "FL100")),
+        (database.update_reservation, (1, details)),
+        (database.delete_reservation, (1,)),
+        (database.delete_reservations, ([1, 2, 3],)),
+    ]
+
+def check_query_plans(conn, samples=None):
+    # Runs each sample lookup, captures the SQL it actually sends, and
+    # returns (function name, sql, plan) triples.
+    statements = []
+    conn.set_trace_callback(statements.append)
+    results = []
+    try:
+        for function, args in samples or indexed_query_samples():
+            del statements[:]
+            result = function(conn, *args)
+            if isinstance(result, types.GeneratorType):
+                for _ in result:
+                    pass
+            for sql in statements:
+                if sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                    results.append((function.__name__, sql, explain_query_plan(conn, sql)))
+    finally:
+        conn.set_trace_callback(None)
+    return results
+
+def assert_queries_use_indexes(conn, samples=None):
+    failures = [f"{name}: {sql} -> {plan}"
+                for name, sql, plan in check_query_plans(conn, samples) if not plan_uses_index(plan)]
+    assert not failures, "Queries without an index:\n" + "\n".join(failures)
+
+class QueryPlanTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "flights.db")
+        self.conn = database.create_connection(database.DatabaseConfig(path=path))
+        self.addCleanup(self.conn.close)
+        self.assertTrue(database.create_table(self.conn))
+
+    def test_lookups_use_an_index(self):
+        for function, args in indexed_query_samples():
+            with self.subTest(function=function.__name__, args=args):
+                assert_queries_use_indexes(self.conn, [(function, args)])
+
+    def test_full_scan_is_reported(self):
+        sql = "SELECT * FROM bookings WHERE seat > 0"
+        self.assertFalse(plan_uses_index(explain_query_plan(self.conn, sql)))
+        with self.assertRaises(AssertionError):
+            assert_queries_use_indexes(self.conn, [(lambda conn: conn.execute(sql), ())])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# test_seat_inventory.py
+import os
+import tempfile
+import unittest
+import database
+import seat_inventory
+from seat_inventory import SeatUnavailableError
+
+JANE = ("Jane Doe", "FL100", "Cairo", "London", "2025-01-01", "12C")
+JOHN = ("John Roe", "FL100", "Cairo", "London", "2025-01-01", "14A")
+
+class SeatClaimTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "flights.db")
+        self.conn = database.create_connection(database.DatabaseConfig(path=path))
+        self.addCleanup(self.conn.close)
+        database.create_table(self.conn)
+
+    def book(self, details):
+        return database.run_write(self.conn, seat_inventory.write_claim, details)
+
+    def move(self, reservation_ids, flight_number=None, date=None):
+        return database.run_write(self.conn, seat_inventory.write_move, reservation_ids, flight_number, date)
+
+    def reservation(self, reservation_id):
+        return database.get_reservation_by_id(self.conn, reservation_id)
+
+    def test_claim_normalizes_the_seat(self):
+        reservation_id = self.book(JANE[:5] + (" 12c",))
+        self.assertEqual(self.reservation(reservation_id), (reservation_id,) + JANE)
+
+    def test_taken_seat_is_refused(self):
+        self.book(JANE)
+        with self.assertRaisesRegex(SeatUnavailableError, "already booked"):
+            self.book(JOHN[:5] + ("12c",))
+        self.assertEqual(database.count_reservations(self.conn), 1)
+
+    def test_seat_outside_the_seat_map_is_refused(self):
+        seat_inventory.set_seat_layout(self.conn, "FL100", "2025-01-01", 10, "ABCD")
+        for seat_number in ("11A", "3E"):
+            with self.subTest(seat_number=seat_number), self.assertRaisesRegex(SeatUnavailableError, "does not exist"):
+                self.book(JANE[:5] + (seat_number,))
+
+    def test_update_may_keep_its_own_seat_but_not_take_another(self):
+        jane_id = self.book(JANE)
+        self.book(JOHN)
+        database.run_write(self.conn, seat_inventory.write_claim, ("Jane Smith",) + JANE[1:], jane_id)
+        self.assertEqual(self.reservation(jane_id)[1], "Jane Smith")
+        with self.assertRaises(SeatUnavailableError):
+            database.run_write(self.conn, seat_inventory.write_claim, JOHN, jane_id)
+        self.assertEqual(self.reservation(jane_id)[6], "12C")
+
+    def test_update_of_a_deleted_reservation_is_refused(self):
+        with self.assertRaisesRegex(SeatUnavailableError, "no longer exists"):
+            database.run_write(self.conn, seat_inventory.write_claim, JANE, 42)
+
+    def test_move_keeps_the_seats(self):
+        ids = [self.book(JANE), self.book(JOHN)]
+        self.assertEqual(self.move(ids, "FL200", "2025-02-01"), 2)
+        self.assertEqual([self.reservation(reservation_id)[2:] for reservation_id in ids],
+                         [("FL200", "Cairo", "London", "2025-02-01", "12C"),
+                          ("FL200", "Cairo", "London", "2025-02-01", "14A")])
+
+    def test_move_onto_a_taken_seat_changes_nothing(self):
+        ids = [self.book(JANE), self.book(JOHN)]
+        holder = self.book(JOHN[:1] + ("FL200",) + JOHN[2:])
+        with self.assertRaisesRegex(SeatUnavailableError, "Cannot move 1 of 2"):
+            self.move(ids, "FL200")
+        self.assertEqual([self.reservation(reservation_id)[2] for reservation_id in ids], ["FL100", "FL100"])
+        self.assertEqual(self.reservation(holder)[2], "FL200")
+
+    def test_seats_held_by_the_moving_bookings_are_free(self):
+        ids = [self.book(JANE), self.book(JOHN)]
+        self.assertEqual(self.move(ids, date="2025-01-01"), 2)
+
+    def test_two_bookings_cannot_move_onto_one_seat(self):
+        ids = [self.book(JANE), self.book(JANE[:4] + ("2025-01-02", "12C"))]
+        with self.assertRaisesRegex(SeatUnavailableError, "already booked"):
+            self.move(ids, date="2025-01-03")
+
+    def test_move_onto_a_smaller_seat_map_changes_nothing(self):
+        ids = [self.book(JANE), self.book(JOHN[:5] + ("2A",))]
+        seat_inventory.set_seat_layout(self.conn, "FL300", "2025-01-01", 10, "ABC")
+        with self.assertRaisesRegex(SeatUnavailableError, "seat 12C does not exist"):
+            self.move(ids, "FL300")
+        self.assertEqual(self.reservation(ids[1])[2], "FL100")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# test_service.py
+import os
+import tempfile
+import unittest
+import database
+import seat_inventory
+from service import ConnectionPool, ReservationService
+
+JANE = ("Jane Doe", "FL100", "Cairo", "London", "2025-01-01", "12C")
+JOHN = ("John Roe", "FL100", "Cairo", "London", "2025-01-01", "14A")
+
+class ReservationServiceTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        config = database.DatabaseConfig(path=os.path.join(directory.name, "flights.db"))
+        conn = database.create_connection(config)
+        database.create_table(conn)
+        conn.close()
+        self.service = ReservationService(ConnectionPool(config=config))
+        self.addCleanup(self.service.close)
+
+    def test_failed_update_does_not_cache_the_new_details(self):
+        jane_id = self.service.add_reservation(JANE)
+        self.service.add_reservation(JOHN)
+        self.assertEqual(self.service.get_reservation(jane_id), (jane_id,) + JANE)
+        with self.assertRaises(seat_inventory.SeatUnavailableError):
+            self.service.update_reservation(jane_id, JANE[:5] + ("14A",))
+        self.assertEqual(self.service.get_reservation(jane_id), (jane_id,) + JANE)
+
+    def test_update_is_read_back(self):
+        jane_id = self.service.add_reservation(JANE)
+        self.service.get_reservation(jane_id)
+        self.service.update_reservation(jane_id, JANE[:5] + ("3B",))
+        self.assertEqual(self.service.get_reservation(jane_id), (jane_id,) + JANE[:5] + ("3B",))
+
+    def test_export_applies_the_date_and_flight_filters(self):
+        self.service.add_reservation(JANE)
+        self.service.add_reservation(JOHN)
+        self.service.add_reservation(JANE[:1] + ("FL200",) + JANE[2:4] + ("2025-02-01", "1A"))
+        path = os.path.join(self.directory, "export.csv")
+        self.assertEqual(self.service.export_reservations(path, None, "2025-01-01", "2025-01-31"), 2)
+        self.assertEqual(self.service.export_reservations(path, None, flight_number="FL200"), 1)
+        with open(path, encoding="utf-8") as file_obj:
+            self.assertEqual(file_obj.read().splitlines()[1:], ["3,Jane Doe,FL200,Cairo,London,2025-02-01,1A"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# validation.py
+import datetime
+import re
+
+# Seats are stored as one integer, the row shifted past five letter bits
+# (12C -> 12 << 5 | 2), so ordering by it is row order, then letter order
+# (2A before 10A, unlike the text). migrations.seat_code_sql is the SQL twin
+# of seat_code below and must accept exactly the same text.
+SEAT_LETTER_BITS = 5
+SEAT_LETTER_MASK = (1 << SEAT_LETTER_BITS) - 1
+# ASCII whitespace only: SQL's trim() knows nothing else.
+WHITESPACE = " \t\n\r\f\v"
+SEAT_PATTERN = re.compile(f"^[{WHITESPACE}]*([0-9]{{1,3}})[{WHITESPACE}]*([A-Za-z])[{WHITESPACE}]*$")
+
+def date_to_day(text):
+    # Day number of a YYYY-MM-DD date, or None for anything else (including
+    # dates like 2025-02-30 that SQLite's date() would quietly roll over).
+    try:
+        day = datetime.date.fromisoformat(text)
+    except (TypeError, ValueError):
+        return None
+    return day.toordinal() if day.isoformat() == text else None
+
+def parse_seat(seat_number):
+    # (row, LETTER) for seats like "12C" or " 12 c", rows 1-999; else None.
+    match = SEAT_PATTERN.match(seat_number or "")
+    if not match or int(match.group(1)) == 0:
+        return None
+    return int(match.group(1)), match.group(2).upper()
+
+def normalize_seat(seat_number):
+    parsed = parse_seat(seat_number)
+    if parsed is None:
+        return None
+    return f"{parsed[0]}{parsed[1]}"
+
+def pack_seat(row, letter):
+    return row << SEAT_LETTER_BITS | (ord(letter) - ord("A"))
+
+def seat_code(seat_number):
+    parsed = parse_seat(seat_number)
+    return pack_seat(*parsed) if parsed else None
+
+def validate_reservation(details):
+    # Shared by the booking and edit pages, bulk import and the API:
+    # (name, flight_number, departure, destination, date, seat_number) with
+    # every field stripped and the seat written as 12C, plus None; or None
+    # and the reason the details cannot be stored.
+    values = tuple("" if value is None else str(value).strip() for value in details)
+    if not all(values):
+        return None, "All fields are required"
+    name, flight_number, departure, destination, date, seat_number = values
+    if date_to_day(date) is None:
+        return None, f"Invalid date '{date}', expected YYYY-MM-DD"
+    seat = normalize_seat(seat_number)
+    if seat is None:
+        return None, f"Invalid seat '{seat_number}', expected a row number and a letter like 12C"
+    return (name, flight_number, departure, destination, date, seat), None
@@ -0,0 +1,207 @@
+# virtual_tree.py
+import tkinter as tk
+from tkinter import ttk
+import instrumentation
+
+class VirtualTreeview:
+    # Drives an existing Treeview/Scrollbar pair so that only the rows in the
+    # viewport exist as Tk items. Rows are pulled from fetch_rows in windows of
+    # visible_rows + 2 * buffer_rows and the same item ids are reused on scroll.
+    def __init__(self, tree, scrollbar, count_rows, fetch_rows, buffer_rows=20):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.count_rows = count_rows
+        self.fetch_rows = fetch_rows
+        self.buffer_rows = buffer_rows
+
+        self.active = False
+        self.total_rows = 0
+        self.offset = 0
+        self.visible_rows = 1
+        self.cache_offset = 0
+        self.cache_rows = []
+        self.item_ids = []
+        # Keys (row[0]) of the selected rows, including ones scrolled out of view.
+        self.selected_keys = set()
+        # "replace" or "extend" while a click or key press changes the selection.
+        self.pending_select = None
+
+    def activate(self):
+        if self.active:
+            return
+        self.active = True
+        self.tree.delete(*self.tree.get_children())
+        self.item_ids = []
+        self.tree.configure(yscrollcommand="")
+        self.scrollbar.configure(command=self.on_scrollbar)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", self.on_mousewheel)
+        self.tree.bind("<Button-5>", self.on_mousewheel)
+        self.tree.bind("<Up>", self.on_key_up)
+        self.tree.bind("<Down>", self.on_key_down)
+        self.tree.bind("<Prior>", lambda event: self.scroll_by(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.scroll_by(self.visible_rows))
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<ButtonPress-1>", self.on_click)
+        self.visible_rows = self.compute_visible_rows(self.tree.winfo_height())
+
+    def deactivate(self):
+        if not self.active:
+            return
+        self.active = False
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>", "<Up>", "<Down>",
+                         "<Prior>", "<Next>", "<Configure>", "<<TreeviewSelect>>", "<ButtonPress-1>"):
+            self.tree.unbind(sequence)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.configure(command=self.tree.yview)
+        self.tree.delete(*self.tree.get_children())
+        self.item_ids = []
+        self.cache_rows = []
+        self.selected_keys = set()
+
+    def reload(self, total_rows=None):
+        self.total_rows = self.count_rows() if total_rows is None else total_rows
+        self.cache_rows = []
+        self.cache_offset = 0
+        self.render()
+        return self.total_rows
+
+    def compute_visible_rows(self, height):
+        style = ttk.Style(self.tree)
+        try:
+            row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            row_height = 20
+        heading_height = row_height + 5
+        return max(1, (height - heading_height) // row_height)
+
+    def ensure_window(self):
+        cache_end = self.cache_offset + len(self.cache_rows)
+        wanted_end = min(self.offset + self.visible_rows, self.total_rows)
+        if self.cache_offset <= self.offset and wanted_end <= cache_end:
+            return
+
+        start = max(0, self.offset - self.buffer_rows)
+        limit = self.visible_rows + 2 * self.buffer_rows
+        # When the new window starts right after a row we already hold, seek
+        # from that row's key instead of making SQLite skip `start` rows.
+        after_row = None
+        if self.cache_offset < start <= cache_end:
+            after_row = self.cache_rows[start - 1 - self.cache_offset]
+        self.cache_rows = self.fetch_rows(start, limit, after_row)
+        self.cache_offset = start
+
+    def render(self):
+        max_offset = max(0, self.total_rows - self.visible_rows)
+        self.offset = min(max(0, self.offset), max_offset)
+        self.ensure_window()
+
+        start = self.offset - self.cache_offset
+        rows = self.cache_rows[start:start + self.visible_rows]
+
+        while len(self.item_ids) < len(rows):
+            self.item_ids.append(self.tree.insert("", tk.END, values=()))
+            instrumentation.count("treeview_inserts")
+        while len(self.item_ids) > len(rows):
+            self.tree.delete(self.item_ids.pop())
+
+        selected_items = []
+        for item_id, row in zip(self.item_ids, rows):
+            self.tree.item(item_id, values=row)
+            if row[0] in self.selected_keys:
+                selected_items.append(item_id)
+
+        instrumentation.count("treeview_updates", len(rows))
+        if selected_items:
+            self.tree.selection_set(*selected_items)
+            self.tree.focus(selected_items[0])
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+            self.tree.focus("")
+        self.tree.yview_moveto(0)
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        if self.total_rows == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = self.offset / self.total_rows
+        last = min(1.0, (self.offset + self.visible_rows) / self.total_rows)
+        self.scrollbar.set(first, last)
+
+    def scroll_by(self, rows):
+        if not self.active:
+            return None
+        self.offset += rows
+        self.render()
+        return "break"
+
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.total_rows)
+            self.render()
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible_rows
+            self.scroll_by(amount)
+
+    def on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            return self.scroll_by(-3)
+        return self.scroll_by(3)
+
+    def on_key_up(self, event):
+        self.pending_select = "extend" if event.state & 0x0001 else "replace"
+        if self.item_ids and self.tree.focus() == self.item_ids[0]:
+            return self.step_selection(self.offset - 1)
+        return None
+
+    def on_key_down(self, event):
+        self.pending_select = "extend" if event.state & 0x0001 else "replace"
+        if self.item_ids and self.tree.focus() == self.item_ids[-1]:
+            return self.step_selection(self.offset + len(self.item_ids))
+        return None
+
+    def step_selection(self, row_index):
+        # Keyboard navigation past the edge of the viewport: scroll one row and
+        # keep the selection on the row that just came into view.
+        if row_index < 0 or row_index >= self.total_rows:
+            return "break"
+        self.offset += 1 if row_index >= self.offset else -1
+        self.offset = min(max(0, self.offset), max(0, self.total_rows - self.visible_rows))
+        self.ensure_window()
+        self.selected_keys = {self.cache_rows[row_index - self.cache_offset][0]}
+        self.render()
+        return "break"
+
+    def on_resize(self, event):
+        visible_rows = self.compute_visible_rows(event.height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render()
+
+    def on_click(self, event):
+        # A plain click replaces the selection, including selected rows that
+        # are scrolled out of view; Shift/Control clicks only change this view.
+        if self.tree.identify_region(event.x, event.y) in ("cell", "tree"):
+            self.pending_select = "extend" if event.state & 0x0005 else "replace"
+
+    def on_select(self, event):
+        # Selections made by render() (restoring the selected rows in view, or
+        # clearing them when they scroll out) must not change the selected keys.
+        mode, self.pending_select = self.pending_select, None
+        if mode is None:
+            return
+        selection = self.tree.selection()
+        first = self.offset - self.cache_offset
+        shown = {}
+        for position, item_id in enumerate(self.item_ids):
+            if first + position < len(self.cache_rows):
+                shown[item_id] = self.cache_rows[first + position][0]
+        selected = {shown[item_id] for item_id in selection if item_id in shown}
+        if mode == "replace":
+            self.selected_keys = selected
+        else:
+            self.selected_keys = (self.selected_keys - set(shown.values())) | selected
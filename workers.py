@@ -0,0 +1,140 @@
+# workers.py
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+class DatabaseTask:
+    def __init__(self, owner, fn, args, on_success, on_error, cancellable):
+        self.owner = owner
+        self.fn = fn
+        self.args = args
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancellable = cancellable
+        self.cancelled = False
+
+class DatabaseExecutor:
+    # Runs service calls on a small pool of threads; connections come from the
+    # ReservationService's pool. Results are queued by the workers and handed
+    # back on the Tk thread by an after() poll, so callbacks can touch widgets.
+    def __init__(self, root, max_workers=2, poll_interval_ms=30):
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.in_flight = {}
+        self.poll_id = None
+        self.closed = False
+
+        self.threads = []
+        for i in range(max_workers):
+            thread = threading.Thread(target=self.worker_loop, name=f"db-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, owner, fn, *args, on_success=None, on_error=None, cancellable=True):
+        # fn is called on a worker thread as fn(*args).
+        if self.closed:
+            raise RuntimeError("DatabaseExecutor has been shut down.")
+        task = DatabaseTask(owner, fn, args, on_success, on_error, cancellable)
+        self.in_flight.setdefault(owner, set()).add(task)
+        self.tasks.put(task)
+        if self.poll_id is None:
+            self.poll_id = self.root.after(self.poll_interval_ms, self.poll_results)
+        return task
+
+    def cancel(self, owner):
+        # Queued tasks are skipped and results of running ones are dropped.
+        # Writes are submitted with cancellable=False so they always report back.
+        for task in self.in_flight.get(owner, ()):
+            if task.cancellable:
+                task.cancelled = True
+
+    def is_busy(self, owner):
+        return any(not task.cancelled for task in self.in_flight.get(owner, ()))
+
+    def worker_loop(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            result, error = None, None
+            if not task.cancelled:
+                try:
+                    result = task.fn(*task.args)
+                except Exception as e:
+                    error = e
+            self.results.put((task, result, error))
+
+    def poll_results(self):
+        self.poll_id = None
+        while True:
+            try:
+                task, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            owner_tasks = self.in_flight.get(task.owner)
+            if owner_tasks is not None:
+                owner_tasks.discard(task)
+                if not owner_tasks:
+                    del self.in_flight[task.owner]
+
+            if task.cancelled:
+                continue
+            try:
+                if error is not None:
+                    if task.on_error:
+                        task.on_error(error)
+                    else:
+                        print(f"Unhandled error in background task {task.fn.__name__}: {error}")
+                elif task.on_success:
+                    task.on_success(result)
+            except Exception as e:
+                print(f"Error in callback for background task {task.fn.__name__}: {e}")
+
+        if self.in_flight and not self.closed:
+            self.poll_id = self.root.after(self.poll_interval_ms, self.poll_results)
+
+    def shutdown(self, timeout=2.0):
+        if self.closed:
+            return
+        self.closed = True
+        if self.poll_id is not None:
+            try:
+                self.root.after_cancel(self.poll_id)
+            except tk.TclError:
+                pass
+            self.poll_id = None
+        for owner in list(self.in_flight):
+            for task in self.in_flight[owner]:
+                task.cancelled = True
+        for _ in self.threads:
+            self.tasks.put(None)
+        for thread in self.threads:
+            thread.join(timeout)
+
+class LoadingIndicator(ttk.Progressbar):
+    # Indeterminate progress bar shown in place while a page waits on the
+    # executor; packed just before `anchor` so it sits above the status line.
+    def __init__(self, master, anchor, **kwargs):
+        super().__init__(master, mode="indeterminate", length=200, **kwargs)
+        self.anchor = anchor
+        self.visible = False
+
+    def show(self):
+        if self.visible:
+            return
+        self.visible = True
+        self.pack(before=self.anchor, pady=(0, 5))
+        self.start(15)
+        self.winfo_toplevel().config(cursor="watch")
+
+    def hide(self):
+        if not self.visible:
+            return
+        self.visible = False
+        self.stop()
+        self.pack_forget()
+        self.winfo_toplevel().config(cursor="")
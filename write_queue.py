@@ -0,0 +1,117 @@
+# write_queue.py
+import queue
+import threading
+from concurrent.futures import Future
+import database
+import instrumentation
+
+DEFAULT_MAX_BATCH = 64
+
+class WriteQueue:
+    # One writer thread owning the only write connection. Callers hand it
+    # cursor-level writes (write(cursor, *args), as database.run_write takes)
+    # and wait for the result. Writes that queue up while a transaction is
+    # being committed go into the next one together ("group commit"), so N
+    # concurrent bookings cost one lock acquisition and one commit instead of
+    # N lock waits. Each write runs under its own SAVEPOINT: one that fails
+    # (a seat already taken) is undone alone and its exception is raised to
+    # its caller, and the others still commit.
+    def __init__(self, config=None, max_batch=DEFAULT_MAX_BATCH, deadline_s=database.WRITE_RETRY_DEADLINE_S):
+        self.config = config
+        self.max_batch = max_batch
+        self.deadline_s = deadline_s
+        self.requests = queue.Queue()
+        self.conn = None
+        self.closed = False
+        self.thread = threading.Thread(target=self.writer_loop, name="db-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, write, *args):
+        if self.closed:
+            raise database.Error("Write queue is closed.")
+        future = Future()
+        self.requests.put((write, args, future))
+        return future
+
+    def call(self, write, *args):
+        # Blocks until the write's transaction has committed.
+        return self.submit(write, *args).result()
+
+    def writer_loop(self):
+        stopping = False
+        while not stopping:
+            batch = [self.requests.get()]
+            while batch[-1] is not None and len(batch) < self.max_batch:
+                try:
+                    batch.append(self.requests.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is None
+            if stopping:
+                batch.pop()
+            if batch:
+                self.run_batch(batch)
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        # Anything submitted while the queue was closing.
+        while True:
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request[2].set_exception(database.Error("Write queue is closed."))
+
+    def run_batch(self, batch):
+        # Results are handed out only after the commit, so no caller is told
+        # a write is done that a failed commit then undid.
+        try:
+            outcomes = database.run_write(self.connection(), self.apply_batch, batch, deadline_s=self.deadline_s)
+        except BaseException as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        instrumentation.count("group_commits")
+        instrumentation.count("group_commit_writes", len(batch))
+        for (_, _, future), (succeeded, value) in zip(batch, outcomes):
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def apply_batch(self, cursor, batch):
+        outcomes = []
+        for write, args, _ in batch:
+            cursor.execute("SAVEPOINT queued_write")
+            try:
+                outcomes.append((True, write(cursor, *args)))
+            except Exception as e:
+                # A lock error is for the whole transaction: run_write retries it.
+                if isinstance(e, database.Error) and database.is_busy_error(e):
+                    raise
+                cursor.execute("ROLLBACK TO queued_write")
+                outcomes.append((False, e))
+            cursor.execute("RELEASE queued_write")
+        return outcomes
+
+    def connection(self):
+        if self.conn is not None and not database.connection_is_usable(self.conn):
+            instrumentation.count("writer_reconnects")
+            try:
+                self.conn.close()
+            except database.Error:
+                pass
+            self.conn = None
+        if self.conn is None:
+            self.conn = database.create_connection(self.config)
+            if self.conn is None:
+                raise database.Error("Cannot open the database connection.")
+        return self.conn
+
+    def close(self, timeout=5.0):
+        if self.closed:
+            return
+        self.closed = True
+        self.requests.put(None)
+        self.thread.join(timeout)